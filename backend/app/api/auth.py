@@ -1,38 +1,67 @@
+from collections.abc import Awaitable
+from typing import TypeVar
+
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from ..core.auth_cache import get_token_cache
 from ..core.config import get_settings
-from ..core.security import create_access_token, get_password_hash, verify_password
+from ..core.hashing import HashingBusyError, get_password_hasher
+from ..core.security import create_access_token
 from ..models.entities import User
 from ..schemas.user import Token, UserCreate, UserLogin, UserRead
-from .dependencies import get_db
+from .dependencies import get_async_db
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+T = TypeVar("T")
+
+
+async def _hash_or_503(call: Awaitable[T]) -> T:
+    try:
+        return await call
+    except HashingBusyError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc), headers={"Retry-After": "5"}
+        ) from exc
+
 
 @router.post("/signup", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def signup(payload: UserCreate, db: Session = Depends(get_db)) -> UserRead:
+async def signup(payload: UserCreate, db: AsyncSession = Depends(get_async_db)) -> UserRead:
     settings = get_settings()
     if not settings.allow_registration:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Registration is disabled")
 
-    existing = db.exec(select(User).where(User.email == payload.email)).first()
+    existing = (await db.exec(select(User).where(User.email == payload.email))).first()
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
 
-    user = User(email=payload.email, password_hash=get_password_hash(payload.password))
+    password_hash = await _hash_or_503(get_password_hasher().hash(payload.password))
+    user = User(email=payload.email, password_hash=password_hash)
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return UserRead.model_validate(user, from_attributes=True)
 
 
 @router.post("/login", response_model=Token)
-def login(payload: UserLogin, db: Session = Depends(get_db)) -> Token:
-    user = db.exec(select(User).where(User.email == payload.email)).first()
-    if not user or not verify_password(payload.password, user.password_hash):
+async def login(payload: UserLogin, db: AsyncSession = Depends(get_async_db)) -> Token:
+    user = (await db.exec(select(User).where(User.email == payload.email))).first()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
+    verified, new_hash = await _hash_or_503(get_password_hasher().verify(payload.password, user.password_hash))
+    if not verified:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
+    if new_hash is not None:
+        # Stored with an outdated work factor; upgrade it while the plaintext is at hand.
+        user.password_hash = new_hash
+        db.add(user)
+        await db.commit()
+        # Credentials changed: tokens cached for this user are verified afresh on their next use.
+        get_token_cache().invalidate_user(user.id)
 
-    token = create_access_token(subject=str(user.id))
+    email = user.email if get_settings().auth_trust_token_claims else None
+    token = create_access_token(subject=str(user.id), email=email)
     return Token(access_token=token)
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.auth_cache import AuthenticatedUser
+from ..core.config import get_settings
+from ..models.entities import Project, ProjectDocument, ProjectStatus
+from ..schemas.project import BatchCreateResult, BatchItemResult
+from ..services.documents import encode_document
+from ..services.jobs import available_slots, get_synthesis_worker, new_job
+from ..services.voices import VoiceCatalog
+from ..utils.text_extraction import expand_zip, extract_text_from_path, extract_text_from_upload, spool_upload
+from .dependencies import check_voice, flush_projects, get_async_db, get_catalog, get_current_user, parse_audio_options
+from .projects import project_to_read
+
+
+router = APIRouter(prefix="/projects", tags=["projects"])
+
+# Batch items queue behind interactive requests (priority 0) unless the caller asks otherwise.
+BATCH_PRIORITY = 1
+
+
+@dataclass
+class _BatchItem:
+    title: str
+    filename: str | None = None
+    text: str | None = None
+    upload: UploadFile | None = None
+    path: Path | None = None
+    document: ProjectDocument | None = None
+    project: Project | None = None
+    error: str | None = None
+    rejected: bool = False
+
+    @property
+    def status(self) -> str:
+        if self.project is not None:
+            return "queued"
+        return "rejected" if self.rejected else "failed"
+
+
+async def _prepare(item: _BatchItem, semaphore: asyncio.Semaphore, max_chars: int) -> None:
+    """Extract and encode one item's text, recording failures on the item instead of raising."""
+
+    async with semaphore:
+        try:
+            if item.upload is not None:
+                text = await extract_text_from_upload(item.upload)
+            elif item.path is not None:
+                text = await run_in_threadpool(extract_text_from_path, item.path, item.path.suffix)
+            else:
+                text = item.text or ""
+        except HTTPException as exc:
+            item.error = str(exc.detail)
+            return
+        text = text.strip()
+        if not text:
+            item.error = "No text provided for narration"
+        elif len(text) > max_chars:
+            item.error = "Document text is too long"
+        else:
+            item.document = await run_in_threadpool(encode_document, text)
+
+
+@router.post("/batch", response_model=BatchCreateResult)
+async def create_projects_batch(
+    texts: list[str] = Form(default=[]),
+    titles: list[str] = Form(default=[]),
+    files: list[UploadFile] = File(default=[]),
+    voice_id: int | None = Form(default=None),
+    language: str | None = Form(default=None),
+    style: str | None = Form(default=None),
+    audio_options: str | None = Form(default=None, description="JSON object of post-processing options"),
+    priority: int = Form(default=BATCH_PRIORITY, ge=0),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    catalog: VoiceCatalog = Depends(get_catalog),
+) -> BatchCreateResult:
+    """Create many projects at once from ``texts`` (titled by ``titles``), documents, or zip archives.
+
+    Documents are extracted concurrently, every accepted project is inserted in one transaction,
+    and the projects are queued in item order. Items that fail extraction, or that do not fit in
+    the user's queue allowance, are reported per item rather than failing the whole request.
+    """
+
+    check_voice(catalog, voice_id)
+    options = parse_audio_options(audio_options)
+    settings = get_settings()
+    items = [
+        _BatchItem(title=(titles[index].strip() if index < len(titles) else "") or f"Script {index + 1}", text=text)
+        for index, text in enumerate(texts)
+    ]
+    too_many = HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Too many items in batch")
+    scratch: list[Path] = []
+    # Shared by every archive of the request, so many small archives cannot add up past the limit.
+    expanded = 0
+    try:
+        for upload in files:
+            if len(items) >= settings.max_batch_items:
+                raise too_many
+            name = upload.filename or ""
+            if Path(name).suffix.lower() != ".zip":
+                title = Path(name).stem or f"Script {len(items) + 1}"
+                items.append(_BatchItem(title=title, filename=name, upload=upload))
+                continue
+            archive = await spool_upload(upload, settings.max_upload_bytes)
+            scratch.append(archive)
+            members, inflated = await run_in_threadpool(
+                expand_zip,
+                archive,
+                settings.max_batch_items - len(items),
+                settings.max_upload_bytes,
+                settings.max_archive_expanded_bytes - expanded,
+            )
+            expanded += inflated
+            for member_name, member_path in members:
+                item = _BatchItem(title=Path(member_name).stem, filename=member_name, path=member_path)
+                if member_path is None:
+                    item.error = "Uploaded file is too large"
+                else:
+                    scratch.append(member_path)
+                items.append(item)
+
+        if not items:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No texts or files provided")
+        if len(items) > settings.max_batch_items:
+            raise too_many
+
+        semaphore = asyncio.Semaphore(settings.batch_extraction_concurrency)
+        await asyncio.gather(*(_prepare(item, semaphore, settings.max_document_chars) for item in items))
+    finally:
+        for path in scratch:
+            path.unlink(missing_ok=True)
+
+    ready = [item for item in items if item.document is not None]
+    slots = await available_slots(db, current_user.id)
+    for item in ready[slots:]:
+        item.document, item.error, item.rejected = None, "Synthesis queue is full", True
+    accepted = ready[:slots]
+
+    projects = [
+        Project(
+            title=item.title,
+            source_filename=item.filename,
+            voice_id=voice_id,
+            language=language,
+            style=style,
+            audio_options=options,
+            status=ProjectStatus.PENDING,
+            user_id=current_user.id,
+        )
+        for item in accepted
+    ]
+    if projects:
+        db.add_all(projects)
+        await flush_projects(db)
+        for item, project in zip(accepted, projects):
+            item.document.project_id = project.id
+        db.add_all([item.document for item in accepted])
+        db.add_all([new_job(project.id, current_user.id, priority=priority) for project in projects])
+        await db.commit()
+        get_synthesis_worker().notify()
+
+        for item, project in zip(accepted, projects):
+            item.project = project
+
+    results = [
+        BatchItemResult(
+            index=index,
+            title=item.title,
+            filename=item.filename,
+            status=item.status,
+            project=project_to_read(item.project) if item.project is not None else None,
+            error=item.error,
+        )
+        for index, item in enumerate(items)
+    ]
+    return BatchCreateResult(
+        queued=sum(result.status == "queued" for result in results),
+        failed=sum(result.status == "failed" for result in results),
+        rejected=sum(result.status == "rejected" for result in results),
+        items=results,
+    )
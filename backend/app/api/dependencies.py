@@ -1,25 +1,95 @@
+from collections.abc import AsyncGenerator
+
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from sqlmodel import Session
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..core.database import get_session
-from ..core.security import decode_access_token
+from ..core.auth_cache import AuthenticatedUser, get_token_cache
+from ..core.config import get_settings
+from ..core.database import get_async_session
+from ..core.security import decode_access_token_claims
 from ..models.entities import User
+from ..schemas.project import AudioOptions
+from ..services.voices import VoiceCatalog, get_voice_catalog, invalidate_voice_catalog, peek_voice_catalog
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
-def get_db() -> Session:
-    with get_session() as session:
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with get_async_session() as session:
         yield session
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    user_id = decode_access_token(token)
-    if not user_id:
+async def get_catalog() -> VoiceCatalog:
+    """Return the voice catalog, reloading it off the event loop only after it was invalidated."""
+
+    catalog = peek_voice_catalog()
+    return catalog if catalog is not None else await run_in_threadpool(get_voice_catalog)
+
+
+def check_voice(catalog: VoiceCatalog, voice_id: int | None) -> None:
+    if voice_id is not None and voice_id not in catalog:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown voice")
+
+
+async def flush_projects(db: AsyncSession) -> None:
+    """Flush new or edited projects, reporting a voice deleted since the catalog was loaded as a ``400``.
+
+    ``check_voice`` reads a per-process snapshot, so the ``voice_id`` foreign key is the final check.
+    """
+
+    try:
+        await db.flush()
+    except IntegrityError as exc:
+        await db.rollback()
+        invalidate_voice_catalog()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown voice") from exc
+
+
+def parse_audio_options(raw: str | None) -> dict | None:
+    """Validate the JSON ``audio_options`` form field and return the options it sets, if any."""
+
+    if not raw:
+        return None
+    try:
+        options = AudioOptions.model_validate_json(raw)
+    except ValidationError as exc:
+        error = exc.errors(include_url=False)[0]
+        location = ".".join(str(part) for part in error["loc"])
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid audio_options: {location} {error['msg']}".strip()
+        ) from exc
+    return options.model_dump(exclude_none=True) or None
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> AuthenticatedUser:
+    return await authenticate_token(token, db)
+
+
+async def authenticate_token(token: str, db: AsyncSession) -> AuthenticatedUser:
+    """Resolve the caller from an access token, skipping JWT decoding and the user lookup on cache hits."""
+
+    cache = get_token_cache()
+    principal = cache.get(token)
+    if principal is not None:
+        return principal
+
+    claims = decode_access_token_claims(token)
+    if not claims or not str(claims.get("sub", "")).isdigit():
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
-    user = db.get(User, int(user_id))
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+    user_id = int(claims["sub"])
+    if get_settings().auth_trust_token_claims and claims.get("email"):
+        principal = AuthenticatedUser(id=user_id, email=claims["email"])
+    else:
+        user = await db.get(User, user_id)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        principal = AuthenticatedUser(id=user.id, email=user.email)
+    cache.put(token, principal, claims.get("exp"))
+    return principal
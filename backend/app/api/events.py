@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.auth_cache import AuthenticatedUser
+from ..core.database import get_async_session
+from ..models.entities import Project, ProjectStatus
+from ..services.events import EventBroker, Subscription, get_event_broker, project_event
+from .dependencies import authenticate_token, get_async_db, get_current_user
+
+
+router = APIRouter(prefix="/projects", tags=["events"])
+
+HEARTBEAT_SECONDS = 15.0
+TERMINAL_STATUSES = {ProjectStatus.COMPLETED.value, ProjectStatus.FAILED.value}
+
+
+def _format_sse(event: dict[str, Any]) -> str:
+    return f"data: {json.dumps(event)}\n\n"
+
+
+async def _sse_stream(
+    broker: EventBroker, subscription: Subscription, snapshot: dict[str, Any]
+) -> AsyncIterator[str]:
+    try:
+        yield _format_sse(snapshot)
+        if snapshot["status"] in TERMINAL_STATUSES:
+            return
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield _format_sse(event)
+            if event["status"] in TERMINAL_STATUSES:
+                return
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@router.get("/{project_id}/events")
+async def project_events(
+    project_id: int,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> StreamingResponse:
+    """Stream a project's status and progress as Server-Sent Events until it completes or fails."""
+
+    project = await db.get(Project, project_id)
+    if not project or project.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+
+    broker = get_event_broker()
+    # Subscribe before taking the snapshot so no transition falls between the two.
+    subscription = broker.subscribe(current_user.id, project_id)
+    await db.refresh(project)
+    return StreamingResponse(
+        _sse_stream(broker, subscription, project_event(project)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/events")
+async def project_events_socket(websocket: WebSocket, token: str = Query(...)) -> None:
+    """Push events for all of the caller's projects; browsers pass the access token as ``?token=``."""
+
+    try:
+        async with get_async_session() as db:
+            principal = await authenticate_token(token, db)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    broker = get_event_broker()
+    subscription = broker.subscribe(principal.id)
+    await websocket.accept()
+
+    async def drain() -> None:
+        # Clients send nothing meaningful; reading is how a disconnect is noticed.
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    receiver = asyncio.create_task(drain())
+    try:
+        while True:
+            next_event = asyncio.create_task(subscription.get())
+            done, _ = await asyncio.wait({next_event, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if next_event not in done:
+                next_event.cancel()
+                return
+            await websocket.send_json(next_event.result())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        broker.unsubscribe(subscription)
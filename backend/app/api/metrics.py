@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import hmac
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from fastapi import APIRouter, HTTPException, Request, Response, status
+
+from ..core.auth_cache import get_token_cache
+from ..core.config import get_settings
+from ..core.hashing import get_password_hasher
+from ..core.metrics import CONTENT_TYPE, REGISTRY, LabelValues
+from ..services.audio_cache import get_audio_cache, get_segment_cache
+from ..services.events import get_event_broker
+from ..services.jobs import get_synthesis_worker
+
+
+router = APIRouter(tags=["metrics"])
+
+T = TypeVar("T")
+
+
+def _existing(getter: Callable[[], T]) -> T | None:
+    """Return a process-wide singleton only if something already created it; scraping must not."""
+
+    return getter() if getter.cache_info().currsize else None  # type: ignore[attr-defined]
+
+
+def _cache_stats() -> dict[str, dict[str, Any]]:
+    stats = {}
+    for name, getter in (("audio", get_audio_cache), ("segment", get_segment_cache), ("auth_token", get_token_cache)):
+        cache = _existing(getter)
+        if cache is not None:
+            stats[name] = cache.stats()
+    return stats
+
+
+def _per_cache(field: str) -> Callable[[], dict[LabelValues, float]]:
+    return lambda: {(name,): stats[field] for name, stats in _cache_stats().items() if field in stats}
+
+
+def _hit_ratio() -> dict[LabelValues, float]:
+    ratios = {}
+    for name, stats in _cache_stats().items():
+        lookups = stats["hits"] + stats["misses"]
+        ratios[(name,)] = stats["hits"] / lookups if lookups else 0.0
+    return ratios
+
+
+def _single(getter: Callable[[], Any], read: Callable[[Any], float]) -> Callable[[], dict[LabelValues, float]]:
+    def collect() -> dict[LabelValues, float]:
+        instance = _existing(getter)
+        return {(): read(instance)} if instance is not None else {}
+
+    return collect
+
+
+def _hasher_stat(field: str) -> Callable[[], dict[LabelValues, float]]:
+    return _single(get_password_hasher, lambda hasher: hasher.stats()[field])
+
+
+REGISTRY.callback("cache_hits_total", "Cache hits per cache.", "counter", _per_cache("hits"), ("cache",))
+REGISTRY.callback("cache_misses_total", "Cache misses per cache.", "counter", _per_cache("misses"), ("cache",))
+REGISTRY.callback("cache_evictions_total", "Cache evictions per cache.", "counter", _per_cache("evictions"), ("cache",))
+REGISTRY.callback("cache_entries", "Entries held by each cache.", "gauge", _per_cache("entries"), ("cache",))
+REGISTRY.callback("cache_size_bytes", "Bytes held by each file cache.", "gauge", _per_cache("size_bytes"), ("cache",))
+REGISTRY.callback("cache_hit_ratio", "Hits divided by lookups since start, per cache.", "gauge", _hit_ratio, ("cache",))
+REGISTRY.callback(
+    "synthesis_queue_depth",
+    "Synthesis jobs waiting to run on any worker.",
+    "gauge",
+    _single(get_synthesis_worker, lambda worker: worker.depth),
+)
+REGISTRY.callback(
+    "synthesis_jobs_running",
+    "Synthesis jobs rendering in this process.",
+    "gauge",
+    _single(get_synthesis_worker, lambda worker: worker.running),
+)
+REGISTRY.callback("password_hash_running", "Password hashes computing now.", "gauge", _hasher_stat("running"))
+REGISTRY.callback("password_hash_queued", "Password hashes waiting for a thread.", "gauge", _hasher_stat("queued"))
+REGISTRY.callback(
+    "password_hash_rejected_total", "Password hashes rejected by a full backlog.", "counter", _hasher_stat("rejected")
+)
+REGISTRY.callback(
+    "password_hash_wait_seconds_total", "Time hashes waited for a thread.", "counter", _hasher_stat("wait_seconds")
+)
+REGISTRY.callback(
+    "password_hash_seconds_total", "Time spent computing password hashes.", "counter", _hasher_stat("hash_seconds")
+)
+REGISTRY.callback(
+    "event_subscribers",
+    "Open SSE and WebSocket event subscriptions.",
+    "gauge",
+    _single(get_event_broker, lambda broker: broker.subscriber_count()),
+)
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics(request: Request) -> Response:
+    settings = get_settings()
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if settings.metrics_token:
+        scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(credentials.encode(), settings.metrics_token.encode()):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid metrics token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -1,32 +1,79 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import json
+import os
+from collections.abc import AsyncIterator, Iterator
 from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile, status
-from fastapi.responses import FileResponse
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..core.config import get_settings
-from ..core.database import get_session
-from ..models.entities import Project, ProjectStatus, User
-from ..schemas.project import ProjectDetail, ProjectRead
-from ..services.audio import generate_audio_file
+from ..core.auth_cache import AuthenticatedUser
+from ..core.database import get_async_session
+from ..models.entities import Project, ProjectDocument, ProjectStatus
+from ..schemas.project import ProjectDetail, ProjectRead, ProjectUpdate
+from ..services.audio_cache import AudioCache, get_audio_cache, get_segment_cache
+from ..services.documents import decode_document, encode_document, replace_document, text_digest
+from ..services.events import get_event_broker, project_event
+from ..services.jobs import QueueFullError, check_capacity, get_synthesis_worker, needs_new_job, new_job
+from ..services.voices import VoiceCatalog
+from ..utils.file_responses import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, file_response, not_modified
 from ..utils.text_extraction import extract_text_from_upload
-from .dependencies import get_current_user, get_db
+from .dependencies import check_voice, flush_projects, get_async_db, get_catalog, get_current_user, parse_audio_options
+
+if TYPE_CHECKING:
+    from ..services.narration import Segment
 
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
+DEFAULT_PAGE_SIZE = 50
+STREAM_POLL_SECONDS = 0.5
+STREAM_CHUNK_BYTES = 1 << 20
+MAX_PAGE_SIZE = 200
+# Everything ProjectRead needs.
+LISTING_COLUMNS = (
+    Project.id,
+    Project.title,
+    Project.status,
+    Project.language,
+    Project.style,
+    Project.audio_options,
+    Project.voice_id,
+    Project.audio_path,
+    Project.audio_hash,
+    Project.error_message,
+    Project.created_at,
+    Project.updated_at,
+)
+
+
+def _audio_version(project: Project) -> str | None:
+    return project.audio_hash[:16] if project.audio_hash else None
+
 
-def _project_to_read(project: Project) -> ProjectRead:
-    audio_url = f"/projects/{project.id}/audio" if project.audio_path else None
+def project_to_read(project: Project) -> ProjectRead:
+    """Serialize a project, or a listing row, the way every project endpoint returns it."""
+
+    audio_url = None
+    if project.audio_path:
+        version = _audio_version(project)
+        audio_url = f"/projects/{project.id}/audio" + (f"?v={version}" if version else "")
     return ProjectRead(
         id=project.id,
         title=project.title,
         status=project.status,
         language=project.language,
         style=project.style,
+        audio_options=project.audio_options,
         voice_id=project.voice_id,
         audio_url=audio_url,
         error_message=project.error_message,
@@ -35,49 +82,46 @@ def _project_to_read(project: Project) -> ProjectRead:
     )
 
 
-def _project_to_detail(project: Project) -> ProjectDetail:
-    base = _project_to_read(project)
-    return ProjectDetail(**base.model_dump(), source_text=project.source_text, source_filename=project.source_filename)
+def _encode_cursor(created_at: datetime, project_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), project_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
 
 
-async def _queue_audio_generation(project_id: int) -> None:
-    settings = get_settings()
-    with get_session() as session:
-        project = session.get(Project, project_id)
-        if not project:
-            return
-        try:
-            project.status = ProjectStatus.PROCESSING
-            session.add(project)
-            session.commit()
-            session.refresh(project)
-
-            filename = f"project_{project.id}.wav"
-            audio_path = generate_audio_file(project.source_text, settings.storage_dir, filename)
-            project.audio_path = str(audio_path)
-            project.status = ProjectStatus.COMPLETED
-            project.updated_at = datetime.utcnow()
-        except Exception as exc:  # pragma: no cover - defensive
-            project.status = ProjectStatus.FAILED
-            project.error_message = str(exc)
-        finally:
-            project.updated_at = datetime.utcnow()
-            session.add(project)
-            session.commit()
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, project_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), int(project_id)
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+
+def _project_to_detail(project: Project, source_text: str) -> ProjectDetail:
+    base = project_to_read(project)
+    return ProjectDetail(**base.model_dump(), source_text=source_text, source_filename=project.source_filename)
+
+
+async def _load_source_text(db: AsyncSession, project_id: int) -> str:
+    document = await db.get(ProjectDocument, project_id)
+    if document is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project text not found")
+    return await run_in_threadpool(decode_document, document)
 
 
 @router.post("", response_model=ProjectDetail, status_code=status.HTTP_201_CREATED)
 async def create_project(
-    background_tasks: BackgroundTasks,
     title: str = Form(...),
     voice_id: int | None = Form(default=None),
     language: str | None = Form(default=None),
     style: str | None = Form(default=None),
+    audio_options: str | None = Form(default=None, description="JSON object of post-processing options"),
     text: str | None = Form(default=None),
     file: UploadFile | None = File(default=None),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    catalog: VoiceCatalog = Depends(get_catalog),
 ) -> ProjectDetail:
+    check_voice(catalog, voice_id)
+    options = parse_audio_options(audio_options)
     extracted_text = text.strip() if text else ""
     source_filename = None
     if file is not None:
@@ -87,49 +131,315 @@ async def create_project(
     if not extracted_text:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No text provided for narration")
 
+    # Encoded before the capacity check, which holds the user's queue reservation until the commit.
+    document = await run_in_threadpool(encode_document, extracted_text)
+    try:
+        await check_capacity(db, current_user.id)
+    except QueueFullError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(exc), headers={"Retry-After": "30"}
+        ) from exc
+
     project = Project(
         title=title,
-        source_text=extracted_text,
         source_filename=source_filename,
         voice_id=voice_id,
         language=language,
         style=style,
+        audio_options=options,
         status=ProjectStatus.PENDING,
         user_id=current_user.id,
     )
     db.add(project)
-    db.commit()
-    db.refresh(project)
+    await flush_projects(db)
+    document.project_id = project.id
+    db.add(document)
+    # Queued in the same transaction, so a project never exists without the job that renders it.
+    db.add(new_job(project.id, current_user.id))
+    await db.commit()
+    await db.refresh(project)
+    get_synthesis_worker().notify()
 
-    background_tasks.add_task(_queue_audio_generation, project.id)
-
-    return _project_to_detail(project)
+    return _project_to_detail(project, extracted_text)
 
 
 @router.get("", response_model=list[ProjectRead])
-def list_projects(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)) -> list[ProjectRead]:
-    projects = db.exec(select(Project).where(Project.user_id == current_user.id).order_by(Project.created_at.desc())).all()
-    return [_project_to_read(project) for project in projects]
+async def list_projects(
+    request: Request,
+    response: Response,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None),
+    status_filter: ProjectStatus | None = Query(default=None, alias="status"),
+    language: str | None = Query(default=None),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> list[ProjectRead]:
+    """List the user's projects newest first, one keyset page at a time.
+
+    The next page's cursor is returned in the ``X-Next-Cursor`` header (and a ``Link`` header),
+    so the body stays a plain list.
+    """
+
+    query = select(*LISTING_COLUMNS).where(Project.user_id == current_user.id)
+    if status_filter is not None:
+        query = query.where(Project.status == status_filter)
+    if language is not None:
+        query = query.where(Project.language == language)
+    if cursor is not None:
+        created_at, last_id = _decode_cursor(cursor)
+        query = query.where(
+            or_(Project.created_at < created_at, and_(Project.created_at == created_at, Project.id < last_id))
+        )
+    query = query.order_by(Project.created_at.desc(), Project.id.desc()).limit(limit + 1)
+
+    rows = (await db.exec(query)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id)
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    return [project_to_read(row) for row in rows]
 
 
 @router.get("/{project_id}", response_model=ProjectDetail)
-def get_project(project_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)) -> ProjectDetail:
-    project = db.get(Project, project_id)
+async def get_project(
+    project_id: int,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> ProjectDetail:
+    project = await db.get(Project, project_id)
+    if not project or project.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    return _project_to_detail(project, await _load_source_text(db, project_id))
+
+
+@router.patch("/{project_id}", response_model=ProjectDetail)
+async def update_project(
+    project_id: int,
+    payload: ProjectUpdate,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    catalog: VoiceCatalog = Depends(get_catalog),
+) -> ProjectDetail:
+    project = await db.get(Project, project_id)
     if not project or project.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    return _project_to_detail(project)
+
+    changes = payload.model_dump(exclude_unset=True)
+    if "voice_id" in changes:
+        check_voice(catalog, changes["voice_id"])
+    if changes.get("audio_options") is not None:
+        changes["audio_options"] = payload.audio_options.model_dump(exclude_none=True) or None
+    text = changes.pop("text", None)
+    document = await db.get(ProjectDocument, project_id)
+    if document is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project text not found")
+    text_changed = False
+    if "text" in payload.model_fields_set:
+        text = (text or "").strip()
+        if not text:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No text provided for narration")
+        text_changed = text_digest(text) != document.digest
+    if changes.get("title") is None:
+        changes.pop("title", None)
+
+    inputs = ("voice_id", "language", "style", "audio_options")
+    rerender = text_changed or any(field in changes and changes[field] != getattr(project, field) for field in inputs)
+
+    if text_changed:
+        await run_in_threadpool(replace_document, document, text)
+        db.add(document)
+    # A job that is still queued picks up the edit when it runs; one already claimed may have read the old inputs.
+    needs_job = rerender and await needs_new_job(db, project.id, current_user.id)
+    if needs_job:
+        try:
+            await check_capacity(db, current_user.id)
+        except QueueFullError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(exc), headers={"Retry-After": "30"}
+            ) from exc
+
+    for field, value in changes.items():
+        setattr(project, field, value)
+    if rerender:
+        project.status = ProjectStatus.PENDING
+        project.audio_path = None
+        project.audio_hash = None
+        project.error_message = None
+    project.updated_at = datetime.utcnow()
+    db.add(project)
+    await flush_projects(db)
+    if needs_job:
+        db.add(new_job(project.id, current_user.id))
+    await db.commit()
+    await db.refresh(project)
+
+    if rerender:
+        get_event_broker().publish(current_user.id, project_event(project))
+    if needs_job:
+        get_synthesis_worker().notify()
+
+    return _project_to_detail(project, text if text_changed else await run_in_threadpool(decode_document, document))
+
+
+async def _rerender_evicted(db: AsyncSession, project: Project) -> None:
+    """Queue a fresh render of a project whose audio the cache evicted, and mark it pending.
+
+    The update only matches while the project still points at the missing file, so concurrent
+    downloads of the same project queue a single job between them.
+    """
+
+    result = await db.exec(
+        update(Project)
+        .where(Project.id == project.id, Project.audio_path == project.audio_path)
+        .values(
+            status=ProjectStatus.PENDING,
+            audio_path=None,
+            audio_hash=None,
+            error_message=None,
+            updated_at=datetime.utcnow(),
+        )
+    )
+    if result.rowcount != 1:
+        await db.rollback()
+        return
+    db.add(new_job(project.id, project.user_id))
+    await db.commit()
+    await db.refresh(project)
+    get_event_broker().publish(project.user_id, project_event(project))
+    get_synthesis_worker().notify()
 
 
 @router.get("/{project_id}/audio")
-def download_audio(project_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)) -> FileResponse:
-    project = db.get(Project, project_id)
+async def download_audio(
+    project_id: int,
+    request: Request,
+    format: str | None = Query(default=None),
+    v: str | None = Query(default=None),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    from ..services.audio_codecs import UnsupportedFormatError, ensure_variant, negotiate_format
+
+    project = await db.get(Project, project_id)
     if not project or project.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     if not project.audio_path:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Audio not available yet")
 
-    audio_path = Path(project.audio_path)
-    if not audio_path.exists():
-        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Audio file missing")
+    try:
+        audio_format = negotiate_format(format, request.headers.get("accept"))
+    except UnsupportedFormatError as exc:
+        raise HTTPException(status_code=status.HTTP_406_NOT_ACCEPTABLE, detail=str(exc)) from exc
+
+    # Only a URL pinned to the current content hash may be cached forever; the bare URL changes
+    # content whenever the project is re-rendered, so it is revalidated through the ETag.
+    cache_control = REVALIDATE_CACHE_CONTROL
+    if project.audio_hash and v == _audio_version(project):
+        cache_control = IMMUTABLE_CACHE_CONTROL
+    headers = {"Vary": "Accept", "Cache-Control": cache_control}
+
+    etag = f'"{project.audio_hash}.{audio_format.name}"' if project.audio_hash else None
+    if etag is not None and not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={**headers, "ETag": etag})
+
+    try:
+        audio_path, transcoded = await run_in_threadpool(ensure_variant, Path(project.audio_path), audio_format)
+        # Served through this file: an eviction from here on unlinks the name, not the audio being sent.
+        audio_file = await run_in_threadpool(open, audio_path, "rb")
+    except FileNotFoundError as exc:
+        await _rerender_evicted(db, project)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Audio was evicted from the cache and is being rendered again",
+            headers={"Retry-After": "30"},
+        ) from exc
+    stat = os.fstat(audio_file.fileno())
+    if transcoded and project.audio_hash:
+        get_audio_cache().add_variant(project.audio_hash, audio_path)
+
+    return file_response(
+        request,
+        audio_file,
+        stat,
+        media_type=audio_format.media_type,
+        etag=etag or f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"',
+        filename=f"project_{project.id}.{audio_format.extension}",
+        headers=headers,
+    )
+
+
+def _read_stored(path: Path, offset: int) -> Iterator[bytes]:
+    try:
+        fh = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with fh:
+        fh.seek(offset)
+        while chunk := fh.read(STREAM_CHUNK_BYTES):
+            yield chunk
+
+
+async def _stream_narration(
+    project_id: int, key: str, segments: list[Segment], cache: AudioCache
+) -> AsyncIterator[bytes]:
+    """Yield a narration's WAV as its segments land in ``cache``, waiting on the project's job for the rest.
+
+    Nothing is rendered here. Once the job has stored the narration, the remainder is read from that
+    file. If the job fails, or the project was edited since, the stream ends early.
+    """
+
+    from ..services.audio import WAV_HEADER_BYTES
+    from ..services.narration import narration_header, open_cached_segment
+
+    yield narration_header(segments)
+    sent = 0
+    for segment in segments:
+        while (pcm := await run_in_threadpool(open_cached_segment, segment, cache)) is None:
+            async with get_async_session() as db:
+                project = await db.get(Project, project_id)
+            if project is None or project.status == ProjectStatus.FAILED:
+                return
+            if project.status == ProjectStatus.COMPLETED:
+                if project.audio_hash == key and project.audio_path:
+                    async for chunk in iterate_in_threadpool(
+                        _read_stored(Path(project.audio_path), WAV_HEADER_BYTES + sent)
+                    ):
+                        yield chunk
+                return
+            await asyncio.sleep(STREAM_POLL_SECONDS)
+        async for chunk in iterate_in_threadpool(pcm):
+            sent += len(chunk)
+            yield chunk
 
-    return FileResponse(path=audio_path, filename=audio_path.name, media_type="audio/wav")
+
+@router.get("/{project_id}/audio/stream")
+async def stream_audio(
+    project_id: int,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    catalog: VoiceCatalog = Depends(get_catalog),
+) -> StreamingResponse:
+    from ..services.audio_processing import resolve_processing
+    from ..services.narration import narration_key, plan_segments
+    from ..services.providers import ProviderNotFoundError
+
+    project = await db.get(Project, project_id)
+    if not project or project.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    if project.status == ProjectStatus.FAILED:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Audio not available: synthesis failed")
+
+    # Stream segments as the project's job renders them, so playback starts before the stored file is finished.
+    source_text = await _load_source_text(db, project_id)
+    voice = catalog.get(project.voice_id)
+    processing = resolve_processing(project.style, project.audio_options)
+    inputs = (source_text, project.voice_id, project.language, project.style)
+    try:
+        segments = await run_in_threadpool(plan_segments, *inputs, voice and voice.provider, processing)
+    except ProviderNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    key = narration_key(*inputs, processing)
+    return StreamingResponse(
+        _stream_narration(project.id, key, segments, get_segment_cache()), media_type="audio/wav"
+    )
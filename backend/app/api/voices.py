@@ -1,19 +1,31 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 
-from ..models.entities import Voice
 from ..schemas.voice import VoiceRead
-from ..services.voices import ensure_default_voices
-from .dependencies import get_db
+from ..services.voices import VoiceCatalog, render_voices
+from ..utils.file_responses import REVALIDATE_CACHE_CONTROL, not_modified
+from .dependencies import get_catalog
 
 
 router = APIRouter(prefix="/voices", tags=["voices"])
 
 
 @router.get("", response_model=List[VoiceRead])
-def list_voices(db: Session = Depends(get_db)) -> list[VoiceRead]:
-    ensure_default_voices(db)
-    voices = db.exec(select(Voice)).all()
-    return [VoiceRead.model_validate(voice, from_attributes=True) for voice in voices]
+async def list_voices(
+    request: Request,
+    language: str | None = Query(default=None),
+    provider: str | None = Query(default=None),
+    style: str | None = Query(default=None),
+    catalog: VoiceCatalog = Depends(get_catalog),
+) -> Response:
+    """List voices from the in-memory catalog; the unfiltered body is pre-rendered with its ETag."""
+
+    if language is None and provider is None and style is None:
+        body, etag = catalog.body, catalog.etag
+    else:
+        body, etag = render_voices(catalog.filter(language=language, provider=provider, style=style))
+    headers = {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+    if not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
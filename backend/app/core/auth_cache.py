@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from .config import get_settings
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """The caller of a request, as resolved from a verified access token."""
+
+    id: int
+    email: str
+
+
+class TokenCache:
+    """Bounded LRU of verified access tokens, each valid for a short TTL and never past its ``exp``."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[AuthenticatedUser, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, token: str) -> AuthenticatedUser | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, token: str, principal: AuthenticatedUser, expires_at: float | None = None) -> None:
+        """Cache ``principal`` for ``token``; ``expires_at`` is the token's ``exp`` as a Unix timestamp."""
+
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        lifetime = self.ttl_seconds
+        if expires_at is not None:
+            lifetime = min(lifetime, expires_at - time.time())
+        if lifetime <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (principal, time.monotonic() + lifetime)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached token of ``user_id``; call it whenever the user's account or credentials change.
+
+        Only this process's cache is cleared; other processes drop their entries within the TTL.
+        """
+
+        with self._lock:
+            for token in [token for token, (principal, _) in self._entries.items() if principal.id == user_id]:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+@lru_cache
+def get_token_cache() -> TokenCache:
+    """Return the process-wide cache of verified access tokens."""
+
+    settings = get_settings()
+    return TokenCache(max_entries=settings.auth_cache_max_entries, ttl_seconds=settings.auth_cache_ttl_seconds)
@@ -1,5 +1,7 @@
+import os
 from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -16,9 +18,48 @@ class Settings(BaseSettings):
     app_name: str = Field(default="AI Voiceover Easy")
     secret_key: str = Field(default="change-me")
     access_token_expire_minutes: int = Field(default=60 * 24)
+    bcrypt_rounds: int = Field(default=12)
+    password_hash_workers: int = Field(default_factory=lambda: min(4, os.cpu_count() or 1))
+    password_hash_queue_size: int = Field(default=64)
+    metrics_enabled: bool = Field(default=False)
+    metrics_token: Optional[str] = Field(default=None)
+    auth_cache_ttl_seconds: float = Field(default=60.0)
+    auth_cache_max_entries: int = Field(default=10_000)
+    auth_trust_token_claims: bool = Field(default=False)
     database_url: str = Field(default=DEFAULT_DATABASE_URL)
+    async_database_url: Optional[str] = Field(default=None)
+    db_pool_size: int = Field(default=10)
+    db_max_overflow: int = Field(default=20)
+    db_pool_recycle: int = Field(default=1800)
+    db_pool_timeout: float = Field(default=30.0)
+    sqlite_wal: bool = Field(default=True)
+    db_fast_boot: bool = Field(default=True)
     storage_dir: Path = Field(default=DEFAULT_STORAGE_DIR)
     allow_registration: bool = Field(default=True)
+    synthesis_workers: int = Field(default_factory=lambda: os.cpu_count() or 1)
+    synthesis_queue_size: int = Field(default=100)
+    synthesis_max_jobs_per_user: int = Field(default=2)
+    synthesis_max_queued_per_user: int = Field(default=20)
+    synthesis_embedded_workers: bool = Field(default=True)
+    job_lease_seconds: float = Field(default=60.0)
+    job_heartbeat_seconds: float = Field(default=2.0)
+    job_poll_seconds: float = Field(default=1.0)
+    job_max_attempts: int = Field(default=3)
+    job_retry_backoff_seconds: float = Field(default=10.0)
+    job_retry_backoff_max_seconds: float = Field(default=600.0)
+    tts_provider_modules: str = Field(default="")
+    audio_cache_max_bytes: int = Field(default=2 * 1024**3)
+    segment_cache_max_bytes: int = Field(default=2 * 1024**3)
+    max_upload_bytes: int = Field(default=50 * 1024**2)
+    max_document_pages: int = Field(default=2000)
+    max_document_chars: int = Field(default=5_000_000)
+    max_batch_items: int = Field(default=500)
+    max_archive_expanded_bytes: int = Field(default=200 * 1024**2)
+    batch_extraction_concurrency: int = Field(default=4)
+    document_compression: str = Field(default="zlib")
+    document_compression_min_bytes: int = Field(default=1024)
+    pdf_extraction_workers: int = Field(default_factory=lambda: os.cpu_count() or 1)
+    pdf_parallel_min_pages: int = Field(default=32)
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -1,32 +1,170 @@
-from collections.abc import Generator
-from contextlib import contextmanager
+import hashlib
+from collections.abc import AsyncGenerator, Callable, Generator
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
 
+from sqlalchemy import event
+from sqlalchemy.engine import Dialect, Engine, make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.schema import CreateIndex, CreateTable
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from .config import get_settings
+from ..models.entities import SchemaVersion
+from .config import Settings, get_settings
+from .metrics import REGISTRY
+from .migrations import migrate
 
 
-settings = get_settings()
-connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
-engine = create_engine(settings.database_url, echo=False, connect_args=connect_args)
+DB_SESSION_DURATION = REGISTRY.histogram(
+    "db_session_duration_seconds", "Lifetime of a database session, from open to commit or rollback.", ("kind",)
+)
 
 
-def init_db() -> None:
-    """Create database tables."""
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+}
 
-    SQLModel.metadata.create_all(bind=engine)
+
+def to_async_url(database_url: str) -> str:
+    """Map a synchronous SQLAlchemy URL onto the matching asyncio driver."""
+
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.drivername)
+    return url.set(drivername=driver).render_as_string(hide_password=False) if driver else database_url
+
+
+def _engine_options(database_url: str, settings: Settings) -> dict[str, Any]:
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        options: dict[str, Any] = {"connect_args": {"check_same_thread": False}}
+        if url.database in (None, "", ":memory:"):
+            # In-memory databases use a static pool that must not be sized.
+            return options
+    else:
+        options = {"pool_pre_ping": True}
+    options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle=settings.db_pool_recycle,
+        pool_timeout=settings.db_pool_timeout,
+    )
+    return options
+
+
+def _configure_sqlite(sync_engine: Any, settings: Settings) -> None:
+    if sync_engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        if settings.sqlite_wal:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.db_pool_timeout * 1000)}")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+@lru_cache
+def get_engine() -> Engine:
+    """Return the synchronous engine, created from the settings on first use rather than at import."""
+
+    settings = get_settings()
+    engine = create_engine(settings.database_url, echo=False, **_engine_options(settings.database_url, settings))
+    _configure_sqlite(engine, settings)
+    return engine
+
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    settings = get_settings()
+    url = settings.async_database_url or to_async_url(settings.database_url)
+    engine = create_async_engine(url, echo=False, **_engine_options(url, settings))
+    _configure_sqlite(engine.sync_engine, settings)
+    return engine
+
+
+def schema_fingerprint(dialect: Dialect) -> str:
+    """Hash the DDL of every table and index, so any change to the models changes the fingerprint."""
+
+    digest = hashlib.sha256()
+    for table in SQLModel.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    return digest.hexdigest()
+
+
+def _recorded_fingerprint(engine: Engine) -> str | None:
+    try:
+        with Session(engine) as session:
+            version = session.get(SchemaVersion, 1)
+            return version.fingerprint if version is not None else None
+    except DBAPIError:
+        # A database created before fingerprints were recorded, or not created at all.
+        return None
+
+
+def init_db(seed: Callable[[Session], None] | None = None, fast_boot: bool = False) -> bool:
+    """Create missing tables, migrate existing ones, run ``seed`` and record the schema fingerprint.
+
+    With ``fast_boot``, a database whose recorded fingerprint matches the models is left as it is:
+    one primary-key lookup instead of inspecting every table. Otherwise the migrations run and a
+    schema they cannot bring in line with the models raises ``SchemaMismatchError`` before any
+    fingerprint is recorded. The fingerprint is committed after ``seed``, so an interrupted first
+    boot is redone in full. Returns whether the schema was applied.
+    """
+
+    engine = get_engine()
+    fingerprint = schema_fingerprint(engine.dialect)
+    if fast_boot and _recorded_fingerprint(engine) == fingerprint:
+        return False
+    with engine.begin() as connection:
+        migrate(connection)
+    with get_session() as session:
+        if seed is not None:
+            seed(session)
+        session.merge(SchemaVersion(id=1, fingerprint=fingerprint, applied_at=datetime.utcnow()))
+    return True
 
 
 @contextmanager
 def get_session() -> Generator[Session, None, None]:
     """Provide a transactional scope around a series of operations."""
 
-    session = Session(bind=engine)
+    session = Session(bind=get_engine())
     try:
-        yield session
-        session.commit()
+        with DB_SESSION_DURATION.time(kind="sync"):
+            yield session
+            session.commit()
     except Exception:
         session.rollback()
         raise
     finally:
         session.close()
+
+
+@asynccontextmanager
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Provide an asyncio transactional scope; objects stay readable after commit."""
+
+    session = AsyncSession(get_async_engine(), expire_on_commit=False)
+    try:
+        with DB_SESSION_DURATION.time(kind="async"):
+            yield session
+            await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
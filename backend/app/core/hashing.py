@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, TypeVar
+
+from .config import get_settings
+from .security import get_password_hash, verify_and_update_password
+
+
+T = TypeVar("T")
+
+
+class HashingBusyError(RuntimeError):
+    """Raised when the password hashing pool already has its maximum backlog."""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated, bounded thread pool.
+
+    bcrypt releases the GIL, so a few threads use the CPU fully while the shared threadpool stays
+    free for other blocking work. Calls beyond ``workers + max_queue`` are rejected instead of
+    queueing without bound, so a login storm fails fast rather than stalling every request.
+    """
+
+    def __init__(self, workers: int, max_queue: int) -> None:
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._outstanding = 0
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.hash_seconds = 0.0
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self._outstanding >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HashingBusyError("Too many concurrent sign-ins; please retry shortly")
+            self._outstanding += 1
+        enqueued = time.perf_counter()
+
+        def timed() -> T:
+            started = time.perf_counter()
+            with self._lock:
+                self._running += 1
+                self.wait_seconds += started - enqueued
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self.hash_seconds += time.perf_counter() - started
+
+        try:
+            return await asyncio.wrap_future(self._executor.submit(timed))
+        finally:
+            with self._lock:
+                self._outstanding -= 1
+                self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> tuple[bool, str | None]:
+        """Return whether ``password`` matches and, if the hash is outdated, its replacement."""
+
+        return await self._run(verify_and_update_password, password, password_hash)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": self._running,
+                "queued": self._outstanding - self._running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_seconds": self.wait_seconds,
+                "hash_seconds": self.hash_seconds,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache
+def get_password_hasher() -> PasswordHasher:
+    """Return the process-wide password hashing pool."""
+
+    settings = get_settings()
+    return PasswordHasher(workers=settings.password_hash_workers, max_queue=settings.password_hash_queue_size)
+
+
+def shutdown_password_hasher() -> None:
+    if get_password_hasher.cache_info().currsize:
+        get_password_hasher().shutdown()
+        get_password_hasher.cache_clear()
@@ -0,0 +1,131 @@
+"""Bring databases created by earlier versions of the models up to date.
+
+``create_all`` only creates missing tables; it never changes a table that already exists. The
+migrations below do, in the order the models changed. Each one inspects the live schema first, so
+the whole list runs on every schema change and a migration that has already been applied is a no-op.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+from sqlalchemy import Connection, bindparam, inspect, text
+from sqlalchemy.schema import CreateColumn
+from sqlmodel import SQLModel
+
+from ..models.entities import ProjectDocument
+from ..services.documents import encode_document
+
+
+Migration = Callable[[Connection], None]
+MIGRATIONS: list[Migration] = []
+BACKFILL_BATCH_ROWS = 500
+
+
+class SchemaMismatchError(RuntimeError):
+    """Raised when an existing database still differs from the models after every migration ran."""
+
+
+def migration(func: Migration) -> Migration:
+    MIGRATIONS.append(func)
+    return func
+
+
+def _quote(connection: Connection, name: str) -> str:
+    return connection.dialect.identifier_preparer.quote(name)
+
+
+def column_names(connection: Connection, table_name: str) -> set[str]:
+    return {column["name"] for column in inspect(connection).get_columns(table_name)}
+
+
+def add_column(connection: Connection, table_name: str, column_name: str) -> None:
+    """Add a model column that an existing table lacks; existing rows get its server default or NULL."""
+
+    if column_name in column_names(connection, table_name):
+        return
+    column = SQLModel.metadata.tables[table_name].c[column_name]
+    definition = CreateColumn(column).compile(dialect=connection.dialect)
+    connection.exec_driver_sql(f"ALTER TABLE {_quote(connection, table_name)} ADD COLUMN {definition}")
+
+
+def create_indexes(connection: Connection, table_name: str, *index_names: str) -> None:
+    """Create the named model indexes of ``table_name`` that the database does not have yet."""
+
+    existing = {index["name"] for index in inspect(connection).get_indexes(table_name)}
+    for index in SQLModel.metadata.tables[table_name].indexes:
+        if index.name in index_names and index.name not in existing:
+            index.create(connection)
+
+
+def schema_drift(connection: Connection) -> list[str]:
+    """Describe how the live schema falls short of the models.
+
+    Reports missing tables, columns and indexes, and leftover NOT NULL columns without a default,
+    which inserts built from the models would violate.
+    """
+
+    inspector = inspect(connection)
+    problems = []
+    for table in SQLModel.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            problems.append(f"missing table {table.name}")
+            continue
+        live = {column["name"]: column for column in inspector.get_columns(table.name)}
+        problems.extend(f"missing column {table.name}.{name}" for name in table.columns.keys() if name not in live)
+        problems.extend(
+            f"unmapped NOT NULL column {table.name}.{name}"
+            for name, column in live.items()
+            if name not in table.columns and not column["nullable"] and column.get("default") is None
+        )
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        problems.extend(f"missing index {index.name}" for index in table.indexes if index.name not in indexes)
+    return problems
+
+
+def migrate(connection: Connection) -> None:
+    """Create missing tables, run every migration, and fail if the schema still differs from the models."""
+
+    SQLModel.metadata.create_all(bind=connection)
+    for step in MIGRATIONS:
+        step(connection)
+    drift = schema_drift(connection)
+    if drift:
+        raise SchemaMismatchError(
+            "The database schema does not match the models and no migration covers it: " + "; ".join(drift)
+        )
+
+
+@migration
+def add_project_audio_hash(connection: Connection) -> None:
+    add_column(connection, "project", "audio_hash")
+    create_indexes(connection, "project", "ix_project_audio_hash")
+
+
+@migration
+def add_project_listing_indexes(connection: Connection) -> None:
+    create_indexes(connection, "project", "ix_project_user_created", "ix_project_user_status_created")
+
+
+@migration
+def move_project_source_text(connection: Connection) -> None:
+    """Copy ``project.source_text`` into ``projectdocument`` (encoded as new documents are), then drop it."""
+
+    if "source_text" not in column_names(connection, "project"):
+        return
+    missing = connection.execute(
+        text("SELECT id FROM project WHERE id NOT IN (SELECT project_id FROM projectdocument) ORDER BY id")
+    ).scalars().all()
+    select_texts = text("SELECT id, source_text FROM project WHERE id IN :ids").bindparams(
+        bindparam("ids", expanding=True)
+    )
+    for start in range(0, len(missing), BACKFILL_BATCH_ROWS):
+        rows = connection.execute(select_texts, {"ids": missing[start : start + BACKFILL_BATCH_ROWS]}).all()
+        documents = [encode_document(source_text or "", project_id).model_dump() for project_id, source_text in rows]
+        connection.execute(ProjectDocument.__table__.insert(), documents)
+    connection.exec_driver_sql(f"ALTER TABLE project DROP COLUMN {_quote(connection, 'source_text')}")
+
+
+@migration
+def add_project_audio_options(connection: Connection) -> None:
+    add_column(connection, "project", "audio_options")
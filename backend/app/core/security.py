@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -7,30 +8,47 @@ from passlib.context import CryptContext
 from .config import get_settings
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-settings = get_settings()
 ALGORITHM = "HS256"
 
 
+@lru_cache
+def get_password_context() -> CryptContext:
+    # Hashes made with a different work factor are flagged by ``needs_update`` and upgraded at login.
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=get_settings().bcrypt_rounds)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_password_context().verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a replacement hash when the stored one uses outdated settings."""
+
+    return get_password_context().verify_and_update(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_password_context().hash(password)
 
 
-def create_access_token(subject: str, expires_delta: Optional[int] = None) -> str:
+def create_access_token(subject: str, expires_delta: Optional[int] = None, email: Optional[str] = None) -> str:
+    settings = get_settings()
     expire = datetime.now(timezone.utc) + timedelta(minutes=expires_delta or settings.access_token_expire_minutes)
     to_encode: Dict[str, Any] = {"sub": subject, "exp": expire}
+    if email is not None:
+        to_encode["email"] = email
 
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=ALGORITHM)
     return encoded_jwt
 
 
-def decode_access_token(token: str) -> Optional[str]:
+def decode_access_token_claims(token: str) -> Optional[Dict[str, Any]]:
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[ALGORITHM])
-        return str(payload.get("sub"))
+        return jwt.decode(token, get_settings().secret_key, algorithms=[ALGORITHM])
     except JWTError:
         return None
+
+
+def decode_access_token(token: str) -> Optional[str]:
+    payload = decode_access_token_claims(token)
+    return str(payload.get("sub")) if payload is not None else None
@@ -3,14 +3,17 @@ from __future__ import annotations
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .api import auth, projects, voices
+from .api import auth, batch, events, metrics, projects, voices
 from .core.config import get_settings
-from .core.database import get_session, init_db
-from .services.voices import ensure_default_voices
+from .core.database import init_db
+from .core.hashing import shutdown_password_hasher
+from .core.metrics import RequestMetricsMiddleware
+from .services.jobs import get_job_event_relay, get_synthesis_worker
+from .services.voices import ensure_default_voices, get_voice_catalog
+from .utils.pdf_extraction import shutdown_pdf_executor
 
 
-settings = get_settings()
-app = FastAPI(title=settings.app_name)
+app = FastAPI()
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,19 +21,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Link"],
 )
+app.add_middleware(RequestMetricsMiddleware)
 
 
 @app.on_event("startup")
 def startup_event() -> None:
-    init_db()
-    with get_session() as session:
-        ensure_default_voices(session)
+    settings = get_settings()
+    # Set before the first request, which is when the OpenAPI schema that carries it is built.
+    app.title = settings.app_name
+    if settings.tts_provider_modules:
+        # Imported here: the providers pull in the synthesis engine, which API-only processes never load otherwise.
+        from .services.providers import import_provider_modules
+
+        import_provider_modules(settings.tts_provider_modules)
+    init_db(seed=ensure_default_voices, fast_boot=settings.db_fast_boot)
+    get_voice_catalog()
+    worker = get_synthesis_worker()
+    worker.recover()
+    if settings.synthesis_embedded_workers:
+        worker.start()
+    get_job_event_relay().start()
+
+
+@app.on_event("shutdown")
+def shutdown_event() -> None:
+    get_job_event_relay().stop()
+    get_synthesis_worker().shutdown()
+    shutdown_pdf_executor()
+    shutdown_password_hasher()
 
 
 app.include_router(auth.router)
 app.include_router(voices.router)
 app.include_router(projects.router)
+app.include_router(batch.router)
+app.include_router(events.router)
+app.include_router(metrics.router)
 
 
 @app.get("/")
@@ -4,6 +4,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
+from sqlalchemy import JSON, Column, Index, LargeBinary
 from sqlmodel import Field, SQLModel
 
 
@@ -14,6 +15,13 @@ class ProjectStatus(str, Enum):
     FAILED = "failed"
 
 
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
 class User(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     email: str = Field(index=True, unique=True)
@@ -32,17 +40,69 @@ class Voice(SQLModel, table=True):
     provider: Optional[str] = None
 
 class Project(SQLModel, table=True):
+    __table_args__ = (
+        # Find and order a user's listing page (newest first, optionally by status). They are not covering:
+        # the listed columns are read from the table rows the index points at.
+        Index("ix_project_user_created", "user_id", "created_at", "id"),
+        Index("ix_project_user_status_created", "user_id", "status", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     voice_id: Optional[int] = Field(default=None, foreign_key="voice.id")
     title: str
-    source_text: str
     source_filename: Optional[str] = None
     language: Optional[str] = None
     style: Optional[str] = None
+    # Post-processing overrides on top of the style's preset (see services/audio_processing.py).
+    audio_options: Optional[dict] = Field(default=None, sa_column=Column(JSON))
     status: ProjectStatus = Field(default=ProjectStatus.PENDING)
     audio_path: Optional[str] = None
+    audio_hash: Optional[str] = Field(default=None, index=True)
     error_message: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+
+class ProjectDocument(SQLModel, table=True):
+    """Source text of a project, kept out of the ``project`` row and optionally compressed."""
+
+    project_id: int = Field(foreign_key="project.id", primary_key=True)
+    codec: str = Field(default="none")
+    size: int
+    digest: str
+    body: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+
+
+class Job(SQLModel, table=True):
+    """One synthesis attempt series for a project, claimed by workers under a renewable lease."""
+
+    __table_args__ = (
+        # Back the claim query (next queued job by priority, then age) and the per-user counts.
+        Index("ix_job_claim", "status", "priority", "available_at", "id"),
+        Index("ix_job_user_status", "user_id", "status"),
+        Index("ix_job_updated", "updated_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    project_id: int = Field(foreign_key="project.id", index=True)
+    user_id: int = Field(foreign_key="user.id")
+    priority: int = Field(default=0)
+    status: JobStatus = Field(default=JobStatus.QUEUED)
+    attempts: int = Field(default=0)
+    max_attempts: int = Field(default=3)
+    available_at: datetime = Field(default_factory=datetime.utcnow)
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    progress: Optional[float] = None
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class SchemaVersion(SQLModel, table=True):
+    """Fingerprint of the schema the database was last initialised with; lets startup skip migrating it."""
+
+    id: int = Field(default=1, primary_key=True)
+    fingerprint: str
+    applied_at: datetime = Field(default_factory=datetime.utcnow)
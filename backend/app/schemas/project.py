@@ -1,15 +1,37 @@
 from datetime import datetime
+from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from ..models.entities import ProjectStatus
 
 
+class AudioOptions(BaseModel):
+    """Post-processing of a project's narration; unset fields fall back to the preset of its ``style``."""
+
+    normalize: Literal["peak", "rms"] | None = None
+    level_db: float | None = Field(default=None, ge=-60, le=0)
+    trim_silence: bool | None = None
+    fade_ms: float | None = Field(default=None, ge=0, le=500)
+    sample_rate: Literal[8000, 16000, 22050, 24000, 44100, 48000] | None = None
+    speed: float | None = Field(default=None, ge=0.5, le=2.0)
+
+
 class ProjectCreate(BaseModel):
     title: str
     voice_id: int | None = None
     language: str | None = None
     style: str | None = None
+    audio_options: AudioOptions | None = None
+    text: str | None = None
+
+
+class ProjectUpdate(BaseModel):
+    title: str | None = None
+    voice_id: int | None = None
+    language: str | None = None
+    style: str | None = None
+    audio_options: AudioOptions | None = None
     text: str | None = None
 
 
@@ -19,6 +41,7 @@ class ProjectRead(BaseModel):
     status: ProjectStatus
     language: str | None = None
     style: str | None = None
+    audio_options: AudioOptions | None = None
     voice_id: int | None = None
     audio_url: str | None = None
     error_message: str | None = None
@@ -29,3 +52,19 @@ class ProjectRead(BaseModel):
 class ProjectDetail(ProjectRead):
     source_text: str
     source_filename: str | None = None
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    title: str
+    filename: str | None = None
+    status: Literal["queued", "failed", "rejected"]
+    project: ProjectRead | None = None
+    error: str | None = None
+
+
+class BatchCreateResult(BaseModel):
+    queued: int
+    failed: int
+    rejected: int
+    items: list[BatchItemResult]
@@ -1,40 +1,110 @@
 from __future__ import annotations
 
-import math
 import struct
+from collections.abc import Iterator
 from pathlib import Path
 
+import numpy as np
 
-def synthesize_placeholder_audio(text: str, output_path: Path, sample_rate: int = 22050) -> Path:
-    """Generate a simple sine wave to act as placeholder narration audio."""
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    duration_seconds = min(60.0, max(2.0, len(text) / 25))
-    total_frames = int(sample_rate * duration_seconds)
-    amplitude = 12000
-    base_frequency = 220.0
+SAMPLE_WIDTH = 2
+WAV_HEADER_BYTES = 44
+AMPLITUDE = 12000
+BASE_FREQUENCY = 220.0
+BLOCK_FRAMES = 1 << 16
+STREAM_CHUNK_FRAMES = 1 << 13
 
-    with open(output_path, "wb") as fh:
-        import wave
 
-        with wave.open(fh, "w") as wav_file:
-            wav_file.setnchannels(1)
-            wav_file.setsampwidth(2)
-            wav_file.setframerate(sample_rate)
+def placeholder_total_frames(text: str, sample_rate: int = 22050) -> int:
+    """Return the number of frames the placeholder synthesizer renders for ``text``."""
 
-            for frame in range(total_frames):
-                # Vary the pitch slightly using the text content to make each file unique
-                char = text[frame % len(text)] if text else "A"
-                frequency = base_frequency + (ord(char) % 60)
-                value = int(amplitude * math.sin(2 * math.pi * frequency * frame / sample_rate))
-                wav_file.writeframesraw(struct.pack("<h", value))
+    duration_seconds = max(2.0, len(text) / 25)
+    return int(sample_rate * duration_seconds)
 
-    return output_path
+
+def segment_total_frames(text: str, sample_rate: int = 22050) -> int:
+    """Return the number of frames rendered for one narration segment (25 characters per second)."""
+
+    return max(1, int(sample_rate * len(text) / 25))
+
+
+def _frequency_table(text: str, limit: int) -> np.ndarray:
+    """Map each character that can be reached within ``limit`` frames to its oscillator frequency."""
+
+    if not text:
+        text = "A"
+    # Only the first ``limit`` characters are ever indexed, so huge documents stay cheap.
+    codepoints = np.frombuffer(text[:limit].encode("utf-32-le"), dtype="<u4")
+    return BASE_FREQUENCY + (codepoints % 60).astype(np.float64)
+
+
+def iter_placeholder_pcm(
+    text: str,
+    total_frames: int,
+    sample_rate: int = 22050,
+    block_frames: int = BLOCK_FRAMES,
+) -> Iterator[bytes]:
+    """Yield little-endian 16-bit PCM for the placeholder waveform in blocks of ``block_frames``."""
+
+    frequencies = _frequency_table(text, total_frames)
+    two_pi_frequencies = 2 * np.pi * frequencies
+    table_size = len(frequencies)
+
+    for start in range(0, total_frames, block_frames):
+        frames = np.arange(start, min(start + block_frames, total_frames), dtype=np.int64)
+        # Same operation order as the scalar ``2 * pi * f * n / sr`` so the samples match bit for bit.
+        phase = two_pi_frequencies[frames % table_size] * frames / sample_rate
+        samples = np.trunc(AMPLITUDE * np.sin(phase)).astype("<i2")
+        yield samples.tobytes()
 
 
-def generate_audio_file(text: str, storage_dir: Path, filename: str) -> Path:
-    """Generate placeholder audio and return the file path."""
+def wav_header(total_frames: int, sample_rate: int = 22050) -> bytes:
+    """Build the ``WAV_HEADER_BYTES``-long header of a mono 16-bit PCM WAV file holding ``total_frames`` frames."""
+
+    data_size = total_frames * SAMPLE_WIDTH
+    byte_rate = sample_rate * SAMPLE_WIDTH
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + data_size,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,
+        1,
+        sample_rate,
+        byte_rate,
+        SAMPLE_WIDTH,
+        SAMPLE_WIDTH * 8,
+        b"data",
+        data_size,
+    )
+
+
+def iter_placeholder_wav(
+    text: str,
+    sample_rate: int = 22050,
+    chunk_frames: int = STREAM_CHUNK_FRAMES,
+) -> Iterator[bytes]:
+    """Yield a complete placeholder WAV file as a header followed by fixed-size PCM chunks.
+
+    The frame count is known up front, so the header carries the final sizes and the stream
+    is byte-identical to the file written by :func:`synthesize_placeholder_audio`.
+    """
+
+    total_frames = placeholder_total_frames(text, sample_rate)
+    yield wav_header(total_frames, sample_rate)
+    yield from iter_placeholder_pcm(text, total_frames, sample_rate, block_frames=chunk_frames)
+
+
+def synthesize_placeholder_audio(text: str, output_path: Path, sample_rate: int = 22050) -> Path:
+    """Generate a simple sine wave to act as placeholder narration audio."""
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(output_path, "wb") as fh:
+        for chunk in iter_placeholder_wav(text, sample_rate, chunk_frames=BLOCK_FRAMES):
+            fh.write(chunk)
 
-    output_path = storage_dir / filename
-    synthesize_placeholder_audio(text=text or "Generated audio", output_path=output_path)
     return output_path
+
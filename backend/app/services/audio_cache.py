@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Mapping
+from functools import lru_cache
+from pathlib import Path
+
+from ..core.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Normalise line endings and surrounding whitespace so equivalent scripts share a key."""
+
+    return text.replace("\r\n", "\n").replace("\r", "\n").strip()
+
+
+def synthesis_key(
+    text: str,
+    voice_id: int | None,
+    language: str | None,
+    style: str | None,
+    processing: Mapping[str, object] | None = None,
+) -> str:
+    """Return the content address of the audio rendered for the given synthesis inputs.
+
+    ``processing`` describes post-processing applied on top; unprocessed audio keeps its old keys.
+    """
+
+    payload = {
+        "text": normalize_text(text),
+        "voice_id": voice_id,
+        "language": (language or "").strip().lower(),
+        "style": (style or "").strip().lower(),
+    }
+    if processing:
+        payload["processing"] = dict(processing)
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class AudioCache:
+    """Content-addressed file store with a total size limit and LRU eviction.
+
+    Entries live at ``<root>/<key[:2]>/<key><suffix>``. Recency is mirrored into file mtimes so
+    the eviction order survives restarts.
+    """
+
+    def __init__(self, root: Path, max_bytes: int, suffix: str = ".wav") -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._load_index()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}{self.suffix}"
+
+    def temp_path(self, key: str) -> Path:
+        """Return a unique scratch path on the cache's filesystem for rendering ``key``."""
+
+        scratch = self.root / "tmp"
+        scratch.mkdir(parents=True, exist_ok=True)
+        return scratch / f"{key}.{uuid.uuid4().hex}{self.suffix}"
+
+    def get(self, key: str) -> Path | None:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            path = self.path_for(key)
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                self._size -= self._entries.pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return path
+
+    def put(self, key: str, source: Path) -> Path:
+        """Move ``source`` into the store under ``key`` and evict old entries if over budget."""
+
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        size = source.stat().st_size
+        os.replace(source, path)
+        with self._lock:
+            self._size -= self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._size += size
+            self._evict(keep=key)
+        return path
+
+    def add_variant(self, key: str, path: Path) -> None:
+        """Account a derived file stored next to ``key`` (such as a transcoded copy) to its entry."""
+
+        size = path.stat().st_size
+        with self._lock:
+            if key not in self._entries:
+                return
+            self._entries[key] += size
+            self._size += size
+            self._evict(keep=key)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _evict(self, keep: str) -> None:
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            key, size = next(iter(self._entries.items()))
+            if key == keep:
+                break
+            del self._entries[key]
+            self._size -= size
+            self.evictions += 1
+            path = self.path_for(key)
+            path.unlink(missing_ok=True)
+            for variant in path.parent.glob(f"{key}.*"):
+                variant.unlink(missing_ok=True)
+            logger.debug("Evicted cached audio %s (%d bytes)", key, size)
+
+    def _load_index(self) -> None:
+        if not self.root.exists():
+            return
+        found = []
+        for path in self.root.glob(f"??/*{self.suffix}"):
+            stat = path.stat()
+            key = path.name[: -len(self.suffix)]
+            size = stat.st_size + sum(variant.stat().st_size for variant in path.parent.glob(f"{key}.*") if variant != path)
+            found.append((stat.st_mtime, key, size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._size += size
+
+
+@lru_cache
+def get_audio_cache() -> AudioCache:
+    """Return the process-wide cache of rendered narrations."""
+
+    settings = get_settings()
+    return AudioCache(settings.storage_dir / "cache", max_bytes=settings.audio_cache_max_bytes)
+
+
+@lru_cache
+def get_segment_cache() -> AudioCache:
+    """Return the process-wide cache of rendered narration segments."""
+
+    settings = get_settings()
+    return AudioCache(settings.storage_dir / "segments", max_bytes=settings.segment_cache_max_bytes, suffix=".pcm")
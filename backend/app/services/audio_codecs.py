@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import os
+import struct
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .audio_storage import iter_pcm_blocks, map_pcm, read_wav_layout
+
+try:  # Optional: FLAC output is offered only when libsndfile bindings are installed.
+    import soundfile
+except ImportError:  # pragma: no cover - depends on the environment
+    soundfile = None
+
+
+# IMA ADPCM (WAVE_FORMAT_DVI_ADPCM): 4-byte block header plus 2 samples per byte.
+ADPCM_BLOCK_ALIGN = 1024
+ADPCM_SAMPLES_PER_BLOCK = (ADPCM_BLOCK_ALIGN - 4) * 2 + 1
+ADPCM_BLOCKS_PER_BATCH = 256
+IMA_STEP_TABLE = np.array(
+    [
+        7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41, 45, 50, 55, 60, 66, 73, 80, 88,
+        97, 107, 118, 130, 143, 157, 173, 190, 209, 230, 253, 279, 307, 337, 371, 408, 449, 494, 544, 598, 658,
+        724, 796, 876, 963, 1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066, 2272, 2499, 2749, 3024, 3327, 3660,
+        4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630, 9493, 10442, 11487, 12635, 13899, 15289, 16818,
+        18500, 20350, 22385, 24623, 27086, 29794, 32767,
+    ],
+    dtype=np.int32,
+)
+IMA_INDEX_TABLE = np.array([-1, -1, -1, -1, 2, 4, 6, 8] * 2, dtype=np.int32)
+
+MULAW_BIAS = 0x84
+MULAW_CLIP = 32635
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    name: str
+    media_type: str
+    extension: str
+    accept_types: tuple[str, ...]
+    encoder: Callable[[Path, Path], None] | None = None
+
+
+def _wav_header(
+    format_tag: int,
+    sample_rate: int,
+    byte_rate: int,
+    block_align: int,
+    bits: int,
+    extra: bytes,
+    frames: int,
+    data_size: int,
+) -> bytes:
+    """Build a non-PCM WAV header with a ``fact`` chunk, as compressed WAV formats require."""
+
+    fmt = struct.pack("<HHIIHHH", format_tag, 1, sample_rate, byte_rate, block_align, bits, len(extra)) + extra
+    riff_size = 4 + (8 + len(fmt)) + (8 + 4) + (8 + data_size)
+    return (
+        struct.pack("<4sI4s", b"RIFF", riff_size, b"WAVE")
+        + struct.pack("<4sI", b"fmt ", len(fmt))
+        + fmt
+        + struct.pack("<4sII", b"fact", 4, frames)
+        + struct.pack("<4sI", b"data", data_size)
+    )
+
+
+def mulaw_encode(samples: np.ndarray) -> np.ndarray:
+    """Encode 16-bit PCM samples as G.711 µ-law bytes."""
+
+    pcm = samples.astype(np.int32)
+    sign = (pcm < 0).astype(np.int32) << 7
+    magnitude = np.minimum(np.abs(pcm), MULAW_CLIP) + MULAW_BIAS
+    exponent = np.floor(np.log2(magnitude)).astype(np.int32) - 7
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+
+def encode_mulaw_wav(master: Path, output: Path) -> None:
+    _, frames, sample_rate = read_wav_layout(master)
+    with open(output, "wb") as fh:
+        fh.write(_wav_header(7, sample_rate, sample_rate, 1, 8, b"", frames, frames))
+        for samples, _ in iter_pcm_blocks(master):
+            fh.write(mulaw_encode(samples).tobytes())
+
+
+def _initial_step_index(first_deltas: np.ndarray) -> np.ndarray:
+    """Pick a starting step index per block so each block can be encoded independently."""
+
+    return np.clip(np.searchsorted(IMA_STEP_TABLE, np.abs(first_deltas)) - 1, 0, 88).astype(np.int32)
+
+
+def ima_adpcm_encode_blocks(blocks: np.ndarray) -> np.ndarray:
+    """Encode a ``(n_blocks, ADPCM_SAMPLES_PER_BLOCK)`` array of PCM into IMA ADPCM blocks.
+
+    Every block starts from its own header, so all blocks are encoded together and the Python
+    loop runs once per sample position rather than once per sample.
+    """
+
+    blocks = blocks.astype(np.int32)
+    predictor = blocks[:, 0].copy()
+    index = _initial_step_index(blocks[:, 1] - blocks[:, 0])
+    header_index = index.copy()
+    codes = np.empty((blocks.shape[0], ADPCM_SAMPLES_PER_BLOCK - 1), dtype=np.uint8)
+
+    for position in range(1, ADPCM_SAMPLES_PER_BLOCK):
+        step = IMA_STEP_TABLE[index]
+        diff = blocks[:, position] - predictor
+        code = np.where(diff < 0, 8, 0)
+        diff = np.abs(diff)
+        delta = step >> 3
+        for bit, shift in ((4, 0), (2, 1), (1, 2)):
+            threshold = step >> shift
+            hit = diff >= threshold
+            code = np.where(hit, code | bit, code)
+            diff = np.where(hit, diff - threshold, diff)
+            delta = np.where(hit, delta + threshold, delta)
+        predictor = np.clip(np.where(code & 8, predictor - delta, predictor + delta), -32768, 32767)
+        index = np.clip(index + IMA_INDEX_TABLE[code], 0, 88)
+        codes[:, position - 1] = code
+
+    packed = (codes[:, 0::2] | (codes[:, 1::2] << 4)).astype(np.uint8)
+    headers = np.zeros((blocks.shape[0], 4), dtype=np.uint8)
+    headers[:, 0:2] = blocks[:, 0].astype("<i2").view(np.uint8).reshape(-1, 2)
+    headers[:, 2] = header_index
+    return np.concatenate([headers, packed], axis=1)
+
+
+def encode_ima_adpcm_wav(master: Path, output: Path) -> None:
+    samples, sample_rate = map_pcm(master)
+    frames = len(samples)
+    block_count = -(-frames // ADPCM_SAMPLES_PER_BLOCK)
+    batch_samples = ADPCM_SAMPLES_PER_BLOCK * ADPCM_BLOCKS_PER_BATCH
+    byte_rate = sample_rate * ADPCM_BLOCK_ALIGN // ADPCM_SAMPLES_PER_BLOCK
+    extra = struct.pack("<H", ADPCM_SAMPLES_PER_BLOCK)
+
+    with open(output, "wb") as fh:
+        data_size = block_count * ADPCM_BLOCK_ALIGN
+        fh.write(_wav_header(0x11, sample_rate, byte_rate, ADPCM_BLOCK_ALIGN, 4, extra, frames, data_size))
+        # Whole batches are reshaped straight out of the mapped master; only the tail is copied for padding.
+        usable = frames - frames % batch_samples
+        for start in range(0, usable, batch_samples):
+            blocks = samples[start : start + batch_samples].reshape(-1, ADPCM_SAMPLES_PER_BLOCK)
+            fh.write(ima_adpcm_encode_blocks(blocks).tobytes())
+        pending = samples[usable:]
+        if len(pending):
+            padded = np.zeros(-(-len(pending) // ADPCM_SAMPLES_PER_BLOCK) * ADPCM_SAMPLES_PER_BLOCK, dtype=np.int16)
+            padded[: len(pending)] = pending
+            fh.write(ima_adpcm_encode_blocks(padded.reshape(-1, ADPCM_SAMPLES_PER_BLOCK)).tobytes())
+
+
+def encode_flac(master: Path, output: Path) -> None:
+    _, _, sample_rate = read_wav_layout(master)
+    with soundfile.SoundFile(output, "w", samplerate=sample_rate, channels=1, format="FLAC", subtype="PCM_16") as fh:
+        for samples, _ in iter_pcm_blocks(master):
+            fh.write(samples)
+
+
+FORMATS: dict[str, AudioFormat] = {
+    "wav": AudioFormat("wav", "audio/wav", "wav", ("audio/wav", "audio/x-wav", "audio/wave")),
+    # µ-law is served in a WAVE container, not as headerless 8 kHz ``audio/basic``, so it is only
+    # selectable through ``?format=ulaw``.
+    "ulaw": AudioFormat("ulaw", "audio/wav", "ulaw.wav", (), encode_mulaw_wav),
+    "adpcm": AudioFormat("adpcm", "audio/wav", "adpcm.wav", ("audio/x-ima-adpcm",), encode_ima_adpcm_wav),
+}
+if soundfile is not None:  # pragma: no cover - depends on the environment
+    FORMATS["flac"] = AudioFormat("flac", "audio/flac", "flac", ("audio/flac", "audio/x-flac"), encode_flac)
+
+
+class UnsupportedFormatError(ValueError):
+    """Raised when neither the requested nor any acceptable format is available."""
+
+
+def negotiate_format(requested: str | None, accept: str | None) -> AudioFormat:
+    """Pick the output format from an explicit ``?format=`` value or the ``Accept`` header."""
+
+    if requested:
+        try:
+            return FORMATS[requested.lower()]
+        except KeyError:
+            raise UnsupportedFormatError(f"Unsupported audio format: {requested}") from None
+    if not accept:
+        return FORMATS["wav"]
+
+    preferences: list[tuple[float, int, str]] = []
+    for position, item in enumerate(accept.split(",")):
+        media_type, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            preferences.append((-quality, position, media_type.lower()))
+
+    for _, _, media_type in sorted(preferences):
+        if media_type in {"*/*", "audio/*"}:
+            return FORMATS["wav"]
+        for audio_format in FORMATS.values():
+            if media_type in audio_format.accept_types:
+                return audio_format
+    raise UnsupportedFormatError("None of the acceptable audio formats is available")
+
+
+def variant_path(master: Path, audio_format: AudioFormat) -> Path:
+    """Return where the ``audio_format`` encoding of ``master`` is cached, next to the master."""
+
+    return master.with_name(f"{master.name.split('.')[0]}.{audio_format.name}")
+
+
+def ensure_variant(master: Path, audio_format: AudioFormat) -> tuple[Path, bool]:
+    """Return the encoded variant of ``master`` and whether it had to be transcoded now."""
+
+    if audio_format.encoder is None:
+        return master, False
+    path = variant_path(master, audio_format)
+    if path.exists():
+        return path, False
+    scratch = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        audio_format.encoder(master, scratch)
+        os.replace(scratch, path)
+    finally:
+        scratch.unlink(missing_ok=True)
+    return path, True
@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+import math
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import asdict, dataclass, fields, replace
+from fractions import Fraction
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+PROCESS_BLOCK_FRAMES = 1 << 15
+FULL_SCALE = 32767.0
+SILENCE_THRESHOLD_DB = -50.0
+TRIM_PAD_MS = 50.0
+DEFAULT_LEVELS_DB = {"peak": -1.0, "rms": -20.0}
+# Speeds are rounded to a fraction with a small denominator, which keeps the polyphase filter bank small.
+MAX_SPEED_DENOMINATOR = 20
+RESAMPLER_ZERO_CROSSINGS = 16
+RESAMPLER_ROLLOFF = 0.94
+RESAMPLER_KAISER_BETA = 8.6
+RESAMPLER_CHUNK_FRAMES = 1 << 13
+
+_EMPTY = np.empty(0, dtype=np.float32)
+
+
+def db_to_amplitude(level_db: float) -> float:
+    return 10 ** (level_db / 20)
+
+
+def _tail(samples: np.ndarray, frames: int) -> np.ndarray:
+    return samples[max(0, len(samples) - frames) :]
+
+
+class Stage(ABC):
+    """One step of a :class:`Pipeline`, fed consecutive float32 blocks of a single signal.
+
+    Stages keep whatever state crosses block boundaries, so the output does not depend on how
+    the signal was split into blocks. :meth:`flush` ends the signal and resets the stage.
+    """
+
+    @abstractmethod
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Consume ``block`` and return the output that is final so far (possibly empty)."""
+
+    def flush(self) -> np.ndarray:
+        return _EMPTY
+
+    def frames_for(self, frames: int | None) -> int | None:
+        """Return the output length for ``frames`` input frames, or ``None`` if it depends on the samples."""
+
+        return frames
+
+
+class Gain(Stage):
+    def __init__(self, gain: float) -> None:
+        self.gain = np.float32(gain)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        return block * self.gain
+
+
+class TrimSilence(Stage):
+    """Drop leading and trailing silence, keeping ``pad_frames`` of it at either end.
+
+    Only the silence seen since the last loud sample is held back, because it may turn out to
+    be the trailing silence.
+    """
+
+    def __init__(self, threshold: float, pad_frames: int) -> None:
+        self.threshold = threshold
+        self.pad_frames = pad_frames
+        self._started = False
+        self._pending: list[np.ndarray] = []
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        loud = np.flatnonzero(np.abs(block) > self.threshold)
+        if not loud.size:
+            self._pending.append(block)
+            if not self._started:
+                self._pending = [_tail(np.concatenate(self._pending), self.pad_frames)]
+            return _EMPTY
+        first, last = int(loud[0]), int(loud[-1])
+        pending = np.concatenate([*self._pending, block[:first]])
+        if not self._started:
+            pending = _tail(pending, self.pad_frames)
+            self._started = True
+        self._pending = [block[last + 1 :]]
+        return np.concatenate((pending, block[first : last + 1]))
+
+    def flush(self) -> np.ndarray:
+        tail = np.concatenate(self._pending)[: self.pad_frames] if self._started else _EMPTY
+        self._started, self._pending = False, []
+        return tail
+
+    def frames_for(self, frames: int | None) -> int | None:
+        return None
+
+
+class Fade(Stage):
+    """Raised-cosine fade-in over the first and fade-out over the last ``frames`` frames."""
+
+    def __init__(self, frames: int) -> None:
+        self.ramp = (0.5 - 0.5 * np.cos(np.pi * (np.arange(frames) + 0.5) / frames)).astype(np.float32)
+        self._position = 0
+        self._held = _EMPTY
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        length = len(self.ramp)
+        held = np.concatenate((self._held, block))
+        if self._position < length:
+            head = min(length - self._position, len(block))
+            start = len(self._held)
+            held[start : start + head] *= self.ramp[self._position : self._position + head]
+        self._position += len(block)
+        # The last ``length`` frames may be the end of the signal, so they wait for the next block.
+        cut = max(0, len(held) - length)
+        self._held = held[cut:]
+        return held[:cut]
+
+    def flush(self) -> np.ndarray:
+        held = self._held * self.ramp[::-1][len(self.ramp) - len(self._held) :]
+        self._position, self._held = 0, _EMPTY
+        return held
+
+
+@lru_cache(maxsize=16)
+def _filter_bank(up: int, down: int) -> tuple[np.ndarray, int]:
+    """Design the Kaiser-windowed sinc low-pass for ``up``/``down`` resampling, split into ``up`` phases.
+
+    Row ``p`` holds the taps applied to the inputs of output samples of phase ``p``, newest input
+    last. Also returns the filter's delay in upsampled frames.
+    """
+
+    half = RESAMPLER_ZERO_CROSSINGS * max(up, down)
+    length = 2 * half + 1
+    cutoff = RESAMPLER_ROLLOFF * 0.5 / max(up, down)
+    offsets = np.arange(length) - half
+    taps = 2 * cutoff * np.sinc(2 * cutoff * offsets) * np.kaiser(length, RESAMPLER_KAISER_BETA)
+    taps *= up / taps.sum()
+    per_phase = -(-length // up)
+    taps = np.pad(taps, (0, per_phase * up - length))
+    bank = taps.reshape(per_phase, up).T[:, ::-1]
+    return np.ascontiguousarray(bank, dtype=np.float32), half
+
+
+class Resample(Stage):
+    """Polyphase rational resampler: ``up`` output frames for every ``down`` input frames.
+
+    Each output sample is one dot product with the filter phase it falls on, computed for whole
+    blocks at once; only the last few inputs are kept between blocks.
+    """
+
+    def __init__(self, up: int, down: int) -> None:
+        divisor = math.gcd(up, down)
+        self.up, self.down = up // divisor, down // divisor
+        self._bank, self._delay = _filter_bank(self.up, self.down)
+        self._taps = self._bank.shape[1]
+        self._reset()
+
+    def _reset(self) -> None:
+        # Start with the zeros that precede the signal, so the first outputs see a full window.
+        self._buffer = np.zeros(self._taps - 1, dtype=np.float32)
+        self._base = -(self._taps - 1)
+        self._next = 0
+        self._count = 0
+
+    def frames_for(self, frames: int | None) -> int | None:
+        return None if frames is None else -(-frames * self.up // self.down)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        self._buffer = np.concatenate((self._buffer, block.astype(np.float32, copy=False)))
+        self._count += len(block)
+        return self._drain()
+
+    def flush(self) -> np.ndarray:
+        total = self.frames_for(self._count)
+        if total:
+            newest = ((total - 1) * self.down + self._delay) // self.up
+            missing = newest + 1 - (self._base + len(self._buffer))
+            if missing > 0:
+                self._buffer = np.concatenate((self._buffer, np.zeros(missing, dtype=np.float32)))
+        out = self._drain(limit=total)
+        self._reset()
+        return out
+
+    def _drain(self, limit: int | None = None) -> np.ndarray:
+        end = self._base + len(self._buffer)
+        # The last output whose newest input has arrived.
+        last = (end * self.up - 1 - self._delay) // self.down
+        if limit is not None:
+            last = min(last, limit - 1)
+        if last < self._next:
+            return _EMPTY
+        positions = np.arange(self._next, last + 1, dtype=np.int64) * self.down + self._delay
+        starts = positions // self.up - self._base - self._taps + 1
+        phases = positions % self.up
+        windows = sliding_window_view(self._buffer, self._taps)
+        out = np.empty(len(positions), dtype=np.float32)
+        for start in range(0, len(positions), RESAMPLER_CHUNK_FRAMES):
+            part = slice(start, start + RESAMPLER_CHUNK_FRAMES)
+            out[part] = np.einsum("nq,nq->n", windows[starts[part]], self._bank[phases[part]])
+        self._next = last + 1
+        keep_from = (self._next * self.down + self._delay) // self.up - self._base - self._taps + 1
+        keep_from = min(max(keep_from, 0), len(self._buffer))
+        self._buffer = self._buffer[keep_from:]
+        self._base += keep_from
+        return out
+
+
+class Pipeline:
+    def __init__(self, stages: Iterable[Stage]) -> None:
+        self.stages = list(stages)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        for stage in self.stages:
+            if not len(block):
+                return _EMPTY
+            block = stage.process(block)
+        return block
+
+    def flush(self) -> np.ndarray:
+        carried = _EMPTY
+        for stage in self.stages:
+            head = stage.process(carried) if len(carried) else _EMPTY
+            carried = np.concatenate((head, stage.flush()))
+        return carried
+
+    def frames_for(self, frames: int | None) -> int | None:
+        for stage in self.stages:
+            frames = stage.frames_for(frames)
+        return frames
+
+
+def _to_pcm(samples: np.ndarray) -> Iterator[bytes]:
+    if len(samples):
+        yield np.clip(np.rint(samples), -32768, 32767).astype("<i2").tobytes()
+
+
+@dataclass(frozen=True)
+class ProcessingOptions:
+    """Post-processing applied to every narration segment after synthesis; the defaults change nothing.
+
+    Stages run in this order: silence trimming, normalization, resampling (which also applies the
+    speed change, like playing the audio faster) and fades at the segment edges. Normalization
+    levels each segment on its own, so stored and streamed narrations come out identical.
+    """
+
+    normalize: str | None = None
+    level_db: float | None = None
+    trim_silence: bool = False
+    fade_ms: float = 0.0
+    sample_rate: int | None = None
+    speed: float = 1.0
+
+    def __post_init__(self) -> None:
+        if self.normalize not in (None, *DEFAULT_LEVELS_DB):
+            raise ValueError(f"Unknown normalization {self.normalize!r}")
+        if self.speed <= 0 or self.fade_ms < 0 or (self.sample_rate is not None and self.sample_rate <= 0):
+            raise ValueError("Speed and sample rate must be positive and fades non-negative")
+
+    def output_rate(self, source_rate: int) -> int:
+        return self.sample_rate or source_rate
+
+    def is_identity(self, source_rate: int) -> bool:
+        return not self.pipeline(source_rate).stages and self.normalize is None
+
+    def cache_token(self, source_rate: int) -> dict[str, object] | None:
+        """Return what distinguishes this processing in cache keys, or ``None`` if it changes nothing."""
+
+        if self.is_identity(source_rate):
+            return None
+        token = asdict(self)
+        token.update(sample_rate=self.output_rate(source_rate), level_db=self._level_db())
+        return token
+
+    def _level_db(self) -> float | None:
+        if self.normalize is None:
+            return None
+        return self.level_db if self.level_db is not None else DEFAULT_LEVELS_DB[self.normalize]
+
+    def _trim(self, source_rate: int) -> TrimSilence:
+        return TrimSilence(FULL_SCALE * db_to_amplitude(SILENCE_THRESHOLD_DB), int(source_rate * TRIM_PAD_MS / 1000))
+
+    def pipeline(self, source_rate: int, gain: float = 1.0) -> Pipeline:
+        stages: list[Stage] = []
+        if self.trim_silence:
+            stages.append(self._trim(source_rate))
+        if gain != 1.0:
+            stages.append(Gain(gain))
+        ratio = Fraction(self.output_rate(source_rate), source_rate) / Fraction(self.speed).limit_denominator(
+            MAX_SPEED_DENOMINATOR
+        )
+        if ratio != 1:
+            stages.append(Resample(ratio.numerator, ratio.denominator))
+        fade_frames = int(self.output_rate(source_rate) * self.fade_ms / 1000)
+        if fade_frames:
+            stages.append(Fade(fade_frames))
+        return Pipeline(stages)
+
+    def frames_for(self, frames: int | None, source_rate: int) -> int | None:
+        return self.pipeline(source_rate).frames_for(frames)
+
+    def normalization_gain(self, blocks: Iterable[np.ndarray], source_rate: int) -> float:
+        """Measure ``blocks`` (after trimming, if enabled) and return the gain that brings them to the target level.
+
+        RMS normalization never raises the peak above full scale, and silence is left as it is.
+        """
+
+        trim = self._trim(source_rate) if self.trim_silence else None
+        peak, energy, frames = 0.0, 0.0, 0
+
+        def measure(block: np.ndarray) -> None:
+            nonlocal peak, energy, frames
+            if len(block):
+                peak = max(peak, float(np.max(np.abs(block))))
+                # Squares of 16-bit samples are exact in float64, so the sum (and the gain) does not
+                # depend on how the segment was split into blocks; float32 drifts by an LSB.
+                wide = block.astype(np.float64)
+                energy += float(np.dot(wide, wide))
+                frames += len(block)
+
+        for block in blocks:
+            measure(trim.process(block) if trim is not None else block)
+        if trim is not None:
+            measure(trim.flush())
+
+        level = peak if self.normalize == "peak" else math.sqrt(energy / frames) if frames else 0.0
+        if level <= FULL_SCALE * db_to_amplitude(SILENCE_THRESHOLD_DB):
+            return 1.0
+        gain = FULL_SCALE * db_to_amplitude(self._level_db()) / level
+        return min(gain, FULL_SCALE / peak)
+
+    def process_pcm(
+        self, samples: np.ndarray, source_rate: int, block_frames: int = PROCESS_BLOCK_FRAMES
+    ) -> Iterator[bytes]:
+        """Yield the processed 16-bit PCM of one segment, ``block_frames`` input frames at a time.
+
+        ``samples`` may be a memory map; it is read twice when normalizing (once to measure it).
+        """
+
+        def blocks() -> Iterator[np.ndarray]:
+            for start in range(0, len(samples), block_frames):
+                yield samples[start : start + block_frames].astype(np.float32)
+
+        gain = self.normalization_gain(blocks(), source_rate) if self.normalize else 1.0
+        pipeline = self.pipeline(source_rate, gain)
+        for block in blocks():
+            yield from _to_pcm(pipeline.process(block))
+        yield from _to_pcm(pipeline.flush())
+
+
+NO_PROCESSING = ProcessingOptions()
+
+STYLE_PRESETS: Mapping[str, ProcessingOptions] = {
+    "audiobook": ProcessingOptions(normalize="rms", level_db=-20.0, trim_silence=True, fade_ms=5.0, sample_rate=44100),
+    "podcast": ProcessingOptions(normalize="rms", level_db=-16.0, trim_silence=True, fade_ms=5.0, sample_rate=44100),
+    "broadcast": ProcessingOptions(normalize="peak", level_db=-1.0, fade_ms=5.0, sample_rate=48000),
+    "telephone": ProcessingOptions(normalize="peak", level_db=-3.0, trim_silence=True, sample_rate=8000),
+}
+
+
+def resolve_processing(style: str | None, options: Mapping[str, object] | None = None) -> ProcessingOptions:
+    """Return the processing for a project: its style's preset, overridden by the options it sets."""
+
+    preset = STYLE_PRESETS.get((style or "").strip().lower(), NO_PROCESSING)
+    names = {field.name for field in fields(ProcessingOptions)}
+    overrides = {name: value for name, value in (options or {}).items() if name in names and value is not None}
+    return replace(preset, **overrides) if overrides else preset
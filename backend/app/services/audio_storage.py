@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+
+from .audio import SAMPLE_WIDTH, WAV_HEADER_BYTES, wav_header
+
+
+READ_BLOCK_FRAMES = 1 << 18
+
+
+def preallocate(path: Path, size: int) -> None:
+    """Create ``path`` with exactly ``size`` bytes, reserving the blocks up front where the OS allows."""
+
+    with open(path, "wb") as fh:
+        fh.truncate(size)
+        if hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(fh.fileno(), 0, size)
+            except OSError:  # pragma: no cover - filesystems without fallocate keep the sparse file
+                pass
+
+
+class MappedWav:
+    """A preallocated mono 16-bit WAV file whose PCM is written in place through ``mmap``.
+
+    Writes at distinct frame offsets touch disjoint regions of the map, so several threads can fill
+    one file at once; :meth:`write_pcm_file` reads segment files straight into the mapped pages.
+    """
+
+    def __init__(self, path: Path, total_frames: int, sample_rate: int) -> None:
+        self.path = path
+        self.total_frames = total_frames
+        self.sample_rate = sample_rate
+        preallocate(path, WAV_HEADER_BYTES + total_frames * SAMPLE_WIDTH)
+        self._file = open(path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def __enter__(self) -> MappedWav:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _region(self, frame_offset: int, frames: int) -> tuple[int, int]:
+        if frame_offset < 0 or frame_offset + frames > self.total_frames:
+            raise ValueError(f"Frames {frame_offset}..{frame_offset + frames} are outside the file")
+        start = WAV_HEADER_BYTES + frame_offset * SAMPLE_WIDTH
+        return start, start + frames * SAMPLE_WIDTH
+
+    def write_pcm(self, frame_offset: int, data: bytes) -> None:
+        start, end = self._region(frame_offset, len(data) // SAMPLE_WIDTH)
+        self._map[start:end] = data
+
+    def write_pcm_file(self, frame_offset: int, source: Path, frames: int) -> None:
+        """Copy ``frames`` frames of headerless PCM from ``source`` into the file at ``frame_offset``."""
+
+        start, end = self._region(frame_offset, frames)
+        with open(source, "rb", buffering=0) as fh, memoryview(self._map) as view:
+            position = start
+            while position < end:
+                read = fh.readinto(view[position:end])
+                if not read:
+                    raise ValueError(f"{source} holds fewer than {frames} frames")
+                position += read
+
+    def finalize(self) -> None:
+        """Write the header and flush the mapped pages to the file."""
+
+        self._map[:WAV_HEADER_BYTES] = wav_header(self.total_frames, self.sample_rate)
+        self._map.flush()
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+
+def read_wav_layout(path: Path) -> tuple[int, int, int]:
+    """Return ``(data offset, frames, sample rate)`` of a mono 16-bit PCM WAV file by walking its chunks."""
+
+    with open(path, "rb") as fh:
+        riff, _, wave_id = struct.unpack("<4sI4s", fh.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"{path} is not a WAV file")
+        sample_rate = None
+        while header := fh.read(8):
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                format_tag, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", fh.read(16))
+                if (format_tag, channels, bits) != (1, 1, SAMPLE_WIDTH * 8):
+                    raise ValueError(f"{path} is not mono 16-bit PCM")
+                fh.seek(size - 16 + size % 2, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if sample_rate is None:
+                    raise ValueError(f"{path} has no fmt chunk before its data")
+                data_offset = fh.tell()
+                available = os.fstat(fh.fileno()).st_size - data_offset
+                return data_offset, min(size, available) // SAMPLE_WIDTH, sample_rate
+            else:
+                fh.seek(size + size % 2, os.SEEK_CUR)
+    raise ValueError(f"{path} has no data chunk")
+
+
+def map_pcm(path: Path) -> tuple[np.ndarray, int]:
+    """Map the samples of a mono 16-bit PCM WAV file read-only, without reading them into memory."""
+
+    data_offset, frames, sample_rate = read_wav_layout(path)
+    if not frames:
+        return np.empty(0, dtype="<i2"), sample_rate
+    return np.memmap(path, dtype="<i2", mode="r", offset=data_offset, shape=(frames,)), sample_rate
+
+
+def iter_pcm_blocks(path: Path, block_frames: int = READ_BLOCK_FRAMES) -> Iterator[tuple[np.ndarray, int]]:
+    """Yield ``(samples, sample_rate)`` views over consecutive blocks of a mapped WAV file."""
+
+    samples, sample_rate = map_pcm(path)
+    for start in range(0, len(samples), block_frames):
+        yield samples[start : start + block_frames], sample_rate
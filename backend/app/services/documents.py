@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import hashlib
+import zlib
+
+from sqlmodel import Session, select
+
+from ..core.config import get_settings
+from ..models.entities import ProjectDocument
+
+try:  # Optional: zstd compresses faster and smaller than zlib when the bindings are installed.
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def _compress(codec: str, data: bytes) -> bytes:
+    if codec == "zlib":
+        return zlib.compress(data, ZLIB_LEVEL)
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return data
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Document is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "none":
+        return data
+    raise ValueError(f"Unknown document codec: {codec}")
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def encode_document(text: str, project_id: int | None = None) -> ProjectDocument:
+    """Build the stored form of ``text``, compressing it with the configured codec.
+
+    CPU-bound for large documents, so request handlers call it in a worker thread.
+    """
+
+    settings = get_settings()
+    raw = text.encode("utf-8")
+    codec = settings.document_compression.lower()
+    if codec == "zstd" and zstandard is None:
+        codec = "zlib"
+    if codec not in {"zlib", "zstd"} or len(raw) < settings.document_compression_min_bytes:
+        codec = "none"
+    body = _compress(codec, raw)
+    if len(body) >= len(raw):
+        codec, body = "none", raw
+    return ProjectDocument(
+        project_id=project_id, codec=codec, size=len(raw), digest=hashlib.sha256(raw).hexdigest(), body=body
+    )
+
+
+def decode_document(document: ProjectDocument) -> str:
+    return _decompress(document.codec, document.body).decode("utf-8")
+
+
+def replace_document(document: ProjectDocument, text: str) -> None:
+    """Overwrite ``document`` in place with the stored form of ``text``."""
+
+    fresh = encode_document(text, document.project_id)
+    document.codec, document.size, document.digest, document.body = fresh.codec, fresh.size, fresh.digest, fresh.body
+
+
+def load_document_text(session: Session, project_id: int) -> str:
+    """Load and decompress a project's source text; only callers that need the text pay for it."""
+
+    document = session.get(ProjectDocument, project_id)
+    if document is None:
+        raise LookupError(f"Project {project_id} has no source document")
+    return decode_document(document)
+
+
+def document_digest(session: Session, project_id: int) -> str | None:
+    """Return the digest of a project's text without reading the (possibly large) body."""
+
+    return session.exec(select(ProjectDocument.digest).where(ProjectDocument.project_id == project_id)).first()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any
+
+from ..models.entities import Project, ProjectStatus
+
+
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+class Subscription:
+    """One listener's bounded event queue, bound to the event loop it was created on."""
+
+    def __init__(self, user_id: int, project_id: int | None, max_size: int = SUBSCRIBER_QUEUE_SIZE) -> None:
+        self.user_id = user_id
+        self.project_id = project_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=max_size)
+        self.dropped = 0
+
+    def wants(self, event: dict[str, Any]) -> bool:
+        return self.project_id is None or event.get("project_id") == self.project_id
+
+    def deliver(self, event: dict[str, Any]) -> None:
+        """Enqueue ``event``; on the subscriber's loop. A slow reader loses its oldest events."""
+
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> dict[str, Any]:
+        return await self.queue.get()
+
+
+class EventBroker:
+    """In-process pub/sub of project events, keyed by user.
+
+    ``publish`` may be called from any thread (synthesis runs on dispatcher threads); events are
+    handed to each subscriber's loop with ``call_soon_threadsafe``.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: dict[int, set[Subscription]] = defaultdict(set)
+        self.published = 0
+
+    def subscribe(self, user_id: int, project_id: int | None = None) -> Subscription:
+        subscription = Subscription(user_id, project_id)
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id: int, event: dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = [sub for sub in self._subscribers.get(user_id, ()) if sub.wants(event)]
+            self.published += 1
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:  # the subscriber's loop has closed
+                self.unsubscribe(subscription)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+def project_event(project: Project, **progress: Any) -> dict[str, Any]:
+    """Build the event describing ``project``'s current state, plus optional progress fields."""
+
+    return {
+        "project_id": project.id,
+        "status": ProjectStatus(project.status).value,
+        "error_message": project.error_message,
+        **progress,
+    }
+
+
+@lru_cache
+def get_event_broker() -> EventBroker:
+    """Return the process-wide event broker."""
+
+    return EventBroker()
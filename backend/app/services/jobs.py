@@ -0,0 +1,666 @@
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from sqlalchemy import case, func, update
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.config import Settings, get_settings
+from ..core.database import get_session
+from ..core.metrics import REGISTRY
+from ..models.entities import Job, JobStatus, Project, ProjectStatus, User
+from .audio_cache import get_audio_cache, get_segment_cache
+from .documents import document_digest, load_document_text, text_digest
+from .events import EventBroker, get_event_broker, project_event
+from .voices import get_voice_catalog, invalidate_voice_catalog
+
+if TYPE_CHECKING:
+    from .providers import ProviderPools
+
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_INTERVAL_SECONDS = 0.25
+# Dialects whose claim query can skip rows locked by other workers; the rest claim by compare-and-set.
+SKIP_LOCKED_DIALECTS = {"postgresql", "mysql", "mariadb"}
+CLAIM_CANDIDATES = 8
+# Re-read this much of the relay window so rows committed with a slightly older timestamp are not missed.
+RELAY_OVERLAP_SECONDS = 5.0
+ACTIVE_JOB_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+QUEUE_WAIT = REGISTRY.histogram("synthesis_queue_wait_seconds", "Time a synthesis job waited in the queue.")
+SYNTHESIS_DURATION = REGISTRY.histogram("synthesis_duration_seconds", "Wall time to render a narration.")
+SYNTHESIS_REALTIME_FACTOR = REGISTRY.histogram(
+    "synthesis_realtime_factor",
+    "Seconds of audio produced per second of rendering.",
+    buckets=(0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0, 200.0, 500.0, 1000.0, 5000.0),
+)
+SYNTHESIS_JOBS = REGISTRY.counter("synthesis_jobs_total", "Finished synthesis jobs by outcome.", ("outcome",))
+EXPIRED_LEASES = REGISTRY.counter("synthesis_expired_leases_total", "Job leases reclaimed from unresponsive workers.")
+
+
+class QueueFullError(Exception):
+    """Raised when a synthesis job cannot be accepted without exceeding a queue limit."""
+
+
+class LeaseLostError(Exception):
+    """Raised inside a running job once another worker has taken over its expired lease."""
+
+
+def new_job(project_id: int, user_id: int, priority: int = 0) -> Job:
+    """Build the queued job for a project; callers add it in the transaction that creates or edits the project."""
+
+    return Job(project_id=project_id, user_id=user_id, priority=priority, max_attempts=get_settings().job_max_attempts)
+
+
+async def _queued_counts(db: AsyncSession, user_id: int) -> tuple[int, int]:
+    """Return the number of queued jobs overall and of ``user_id``, in one query."""
+
+    by_user = func.coalesce(func.sum(case((Job.user_id == user_id, 1), else_=0)), 0)
+    total, queued_by_user = (await db.exec(select(func.count(), by_user).where(Job.status == JobStatus.QUEUED))).one()
+    return total, queued_by_user
+
+
+async def _lock_user_queue(db: AsyncSession, user_id: int) -> None:
+    # A no-op write to the user's row holds its row lock (the database write lock on SQLite) until the
+    # caller commits, so concurrent enqueues of one user take turns between the check and the insert.
+    await db.exec(update(User).where(User.id == user_id).values(id=User.id))
+
+
+async def needs_new_job(db: AsyncSession, project_id: int, user_id: int) -> bool:
+    """Whether an edit of ``project_id`` must queue a job to render it: yes, unless one is still waiting.
+
+    Decided from the job table under the user's queue lock, which claims of the user's jobs also wait
+    for (on SQLite, the database write lock), so a job claimed, and its inputs read, just before the edit
+    commits is never taken for one that will pick the edit up.
+    """
+
+    await _lock_user_queue(db, user_id)
+    waiting = await db.exec(
+        select(Job.id).where(Job.project_id == project_id, Job.status == JobStatus.QUEUED).limit(1)
+    )
+    return waiting.first() is None
+
+
+async def available_slots(db: AsyncSession, user_id: int) -> int:
+    """Return how many more jobs of ``user_id`` the queue accepts, reserving them until ``db`` commits."""
+
+    settings = get_settings()
+    await _lock_user_queue(db, user_id)
+    total, queued_by_user = await _queued_counts(db, user_id)
+    return max(0, min(settings.synthesis_queue_size - total, settings.synthesis_max_queued_per_user - queued_by_user))
+
+
+async def check_capacity(db: AsyncSession, user_id: int) -> None:
+    """Raise :class:`QueueFullError` if a job of ``user_id`` would be rejected; else reserve it until ``db`` commits."""
+
+    settings = get_settings()
+    await _lock_user_queue(db, user_id)
+    total, queued_by_user = await _queued_counts(db, user_id)
+    if total >= settings.synthesis_queue_size:
+        raise QueueFullError("Synthesis queue is full")
+    if queued_by_user >= settings.synthesis_max_queued_per_user:
+        raise QueueFullError("Too many narrations queued for this user")
+
+
+@dataclass(frozen=True)
+class ClaimedJob:
+    id: int
+    project_id: int
+    user_id: int
+    attempts: int
+    max_attempts: int
+    available_at: datetime
+
+
+def retry_delay(attempts: int, base_seconds: float, max_seconds: float) -> float:
+    """Exponential backoff after the ``attempts``-th failed attempt."""
+
+    return min(max_seconds, base_seconds * 2 ** max(attempts - 1, 0))
+
+
+def _retry_at(attempts: int, settings: Settings) -> datetime:
+    delay = retry_delay(attempts, settings.job_retry_backoff_seconds, settings.job_retry_backoff_max_seconds)
+    return datetime.utcnow() + timedelta(seconds=delay)
+
+
+def _busy_users(max_jobs_per_user: int):  # noqa: ANN202 - a SQL subquery
+    return (
+        select(Job.user_id)
+        .where(Job.status == JobStatus.RUNNING)
+        .group_by(Job.user_id)
+        .having(func.count() >= max_jobs_per_user)
+    )
+
+
+def claim_job(session: Session, owner: str, lease_seconds: float, max_jobs_per_user: int) -> ClaimedJob | None:
+    """Move the best runnable job to ``running`` under a lease held by ``owner``, and its project to ``processing``.
+
+    Jobs run by priority, then age, skipping users already running ``max_jobs_per_user`` jobs.
+    Where the database supports ``FOR UPDATE SKIP LOCKED``, concurrent workers pass over each
+    other's candidate rows and take turns on the candidate's user row; elsewhere (SQLite) each
+    candidate is taken with a compare-and-set ``UPDATE`` that exactly one worker wins. Either way
+    the claiming ``UPDATE`` re-checks the user's running jobs.
+    """
+
+    now = datetime.utcnow()
+    runnable = (
+        select(Job.id, Job.user_id)
+        .where(
+            Job.status == JobStatus.QUEUED,
+            Job.available_at <= now,
+            Job.user_id.not_in(_busy_users(max_jobs_per_user)),
+        )
+        .order_by(Job.priority, Job.id)
+    )
+    skip_locked = session.get_bind().dialect.name in SKIP_LOCKED_DIALECTS
+    if skip_locked:
+        candidates = session.exec(runnable.limit(1).with_for_update(skip_locked=True)).all()
+    else:
+        candidates = session.exec(runnable.limit(CLAIM_CANDIDATES)).all()
+
+    for job_id, user_id in candidates:
+        if skip_locked:
+            # Claims of one user's jobs queue here, so each one's re-check sees the others' committed claims.
+            session.exec(select(User.id).where(User.id == user_id).with_for_update()).one()
+        claimed = session.exec(
+            update(Job)
+            .where(
+                Job.id == job_id,
+                Job.status == JobStatus.QUEUED,
+                # Re-checked inside the write so two claimers cannot both take a user's last slot.
+                Job.user_id.not_in(_busy_users(max_jobs_per_user)),
+            )
+            .values(
+                status=JobStatus.RUNNING,
+                attempts=Job.attempts + 1,
+                lease_owner=owner,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+                progress=None,
+                updated_at=now,
+            )
+        )
+        if claimed.rowcount == 1:
+            job = session.get(Job, job_id)
+            # Committed with the claim, so starting a job costs one write transaction, not two.
+            session.exec(
+                update(Project)
+                .where(Project.id == job.project_id)
+                .values(status=ProjectStatus.PROCESSING, updated_at=now)
+            )
+            claim = ClaimedJob(job.id, job.project_id, job.user_id, job.attempts, job.max_attempts, job.available_at)
+            session.commit()
+            return claim
+    session.commit()
+    return None
+
+
+def renew_lease(
+    session: Session, job_id: int, owner: str, lease_seconds: float, progress: float | None = None
+) -> bool:
+    """Extend ``owner``'s lease on a running job, recording its progress; ``False`` if the lease was lost."""
+
+    now = datetime.utcnow()
+    values = {"lease_expires_at": now + timedelta(seconds=lease_seconds), "updated_at": now}
+    if progress is not None:
+        values["progress"] = progress
+    renewed = session.exec(
+        update(Job)
+        .where(Job.id == job_id, Job.lease_owner == owner, Job.status == JobStatus.RUNNING)
+        .values(**values)
+    )
+    session.commit()
+    return renewed.rowcount == 1
+
+
+def settle_job(
+    session: Session,
+    job_id: int,
+    owner: str,
+    status: JobStatus,
+    error: str | None = None,
+    retry_at: datetime | None = None,
+) -> bool:
+    """End ``owner``'s attempt at a job, requeueing it for ``retry_at`` if given; ``False`` if the lease was lost.
+
+    The caller commits, so the project's matching update lands in the same transaction.
+    """
+
+    now = datetime.utcnow()
+    values = {"status": status, "lease_expires_at": None, "last_error": error, "updated_at": now}
+    if status == JobStatus.SUCCEEDED:
+        values["progress"] = 1.0
+    if retry_at is not None:
+        values["available_at"] = retry_at
+    settled = session.exec(
+        update(Job)
+        .where(Job.id == job_id, Job.lease_owner == owner, Job.status == JobStatus.RUNNING)
+        .values(**values)
+    )
+    return settled.rowcount == 1
+
+
+def reap_expired_leases(session: Session, settings: Settings) -> int:
+    """Requeue (or, out of attempts, fail) running jobs whose worker stopped renewing its lease."""
+
+    now = datetime.utcnow()
+    expired = session.exec(
+        select(Job).where(Job.status == JobStatus.RUNNING, Job.lease_expires_at < now)
+    ).all()
+    reaped = 0
+    for job in expired:
+        retry = job.attempts < job.max_attempts
+        error = "Synthesis worker stopped responding"
+        values = {"status": JobStatus.QUEUED if retry else JobStatus.FAILED, "lease_expires_at": None}
+        if retry:
+            values["available_at"] = _retry_at(job.attempts, settings)
+        result = session.exec(
+            update(Job)
+            .where(Job.id == job.id, Job.status == JobStatus.RUNNING, Job.lease_expires_at == job.lease_expires_at)
+            .values(**values, last_error=error, updated_at=now)
+        )
+        if result.rowcount != 1:
+            continue
+        reaped += 1
+        project = session.get(Project, job.project_id)
+        if project is not None and project.status == ProjectStatus.PROCESSING:
+            project.status = ProjectStatus.PENDING if retry else ProjectStatus.FAILED
+            project.error_message = error
+            project.updated_at = now
+            session.add(project)
+    session.commit()
+    if reaped:
+        EXPIRED_LEASES.inc(reaped)
+        logger.warning("Reclaimed %d synthesis jobs with expired leases", reaped)
+    return reaped
+
+
+def enqueue_orphans(session: Session) -> int:
+    """Queue jobs for projects left pending or processing without an active job, e.g. by older releases."""
+
+    active = select(Job.project_id).where(Job.status.in_(ACTIVE_JOB_STATUSES))
+    projects = session.exec(
+        select(Project)
+        .where(Project.status.in_([ProjectStatus.PENDING, ProjectStatus.PROCESSING]), Project.id.not_in(active))
+        .order_by(Project.created_at)
+    ).all()
+    for project in projects:
+        project.status = ProjectStatus.PENDING
+        session.add(project)
+        session.add(new_job(project.id, project.user_id))
+    session.commit()
+    return len(projects)
+
+
+@dataclass
+class _ActiveLease:
+    job_id: int
+    progress: float | None = None
+    lost: bool = False
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class SynthesisWorker:
+    """Claims synthesis jobs from the ``job`` table and renders them on per-provider process pools.
+
+    Any number of workers, embedded in API processes or started with ``python -m app.worker``, can
+    share one database: each job is claimed under a lease that a heartbeat thread renews, and jobs
+    whose worker disappears are reclaimed by the others once the lease expires. Failed attempts are
+    retried with exponential backoff up to the job's ``max_attempts``.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_jobs_per_user: int,
+        settings: Settings | None = None,
+        owner: str | None = None,
+    ) -> None:
+        self.workers = workers
+        self.max_jobs_per_user = max_jobs_per_user
+        self.settings = settings or get_settings()
+        self.owner = owner or default_worker_id()
+        self._threads: list[threading.Thread] = []
+        self._pools: ProviderPools | None = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._active: dict[int, _ActiveLease] = {}
+        self._last_reap = 0.0
+
+    @property
+    def depth(self) -> int:
+        """Jobs queued across all workers."""
+
+        with get_session() as session:
+            return session.exec(select(func.count()).select_from(Job).where(Job.status == JobStatus.QUEUED)).one()
+
+    @property
+    def running(self) -> int:
+        """Jobs this worker is rendering."""
+
+        with self._lock:
+            return len(self._active)
+
+    def start(self) -> None:
+        if self._pools is not None:
+            return
+        # The synthesis engine (NumPy and the providers) is imported once a worker starts, so API
+        # processes that only enqueue jobs never load it.
+        from .providers import ProviderPools
+
+        self._stop.clear()
+        self._pools = ProviderPools(self.workers, self.settings.tts_provider_modules)
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work_loop, name=f"synthesis-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name="synthesis-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+        logger.info("Synthesis worker %s started with %d threads", self.owner, self.workers)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout=None if wait else 0)
+        self._threads.clear()
+        if self._pools is not None:
+            self._pools.shutdown(wait=wait)
+            self._pools = None
+
+    def notify(self) -> None:
+        """Wake idle threads after jobs were queued in this process, instead of waiting for the next poll."""
+
+        self._wake.set()
+
+    def recover(self) -> int:
+        with get_session() as session:
+            recovered = enqueue_orphans(session)
+        if recovered:
+            logger.info("Queued %d synthesis jobs for unfinished projects", recovered)
+            self.notify()
+        return recovered
+
+    def _maybe_reap(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_reap < self.settings.job_lease_seconds / 2:
+                return
+            self._last_reap = now
+        with get_session() as session:
+            if reap_expired_leases(session, self.settings):
+                self.notify()
+
+    def _work_loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self._maybe_reap()
+                with get_session() as session:
+                    job = claim_job(session, self.owner, self.settings.job_lease_seconds, self.max_jobs_per_user)
+            except Exception:
+                logger.exception("Failed to claim a synthesis job")
+                job = None
+            if job is None:
+                self._wake.wait(self.settings.job_poll_seconds)
+                continue
+
+            QUEUE_WAIT.observe(max(0.0, (datetime.utcnow() - job.available_at).total_seconds()))
+            lease = _ActiveLease(job.id)
+            with self._lock:
+                self._active[job.id] = lease
+            try:
+                self._run(job, lease)
+            except Exception:  # pragma: no cover - defensive
+                logger.exception("Synthesis job for project %s crashed", job.project_id)
+            finally:
+                with self._lock:
+                    del self._active[job.id]
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(self.settings.job_heartbeat_seconds):
+            with self._lock:
+                leases = list(self._active.values())
+            if not leases:
+                continue
+            try:
+                with get_session() as session:
+                    for lease in leases:
+                        renewed = renew_lease(
+                            session, lease.job_id, self.owner, self.settings.job_lease_seconds, lease.progress
+                        )
+                        if not renewed:
+                            logger.warning("Lost the lease on synthesis job %s", lease.job_id)
+                            lease.lost = True
+            except Exception:
+                logger.exception("Failed to renew synthesis job leases")
+
+    def _run(self, job: ClaimedJob, lease: _ActiveLease) -> None:
+        from .audio_processing import resolve_processing
+        from .audio_storage import read_wav_layout
+        from .narration import NarrationTooLongError, render_narration
+        from .providers import ProviderNotFoundError, provider_class
+
+        broker = get_event_broker()
+        settings = self.settings
+
+        with get_session() as session:
+            project = session.get(Project, job.project_id)
+            if not project:
+                settle_job(session, job.id, self.owner, JobStatus.FAILED, error="Project not found")
+                return
+            source_text = load_document_text(session, job.project_id)
+            inputs = (project.voice_id, project.language, project.style)
+            audio_options = project.audio_options
+            digest = text_digest(source_text)
+            broker.publish(job.user_id, project_event(project, progress=0.0))
+
+        assert self._pools is not None
+        began = time.perf_counter()
+        permanent = False
+        try:
+            voice = get_voice_catalog().get(inputs[0])
+            if voice is None and inputs[0] is not None:
+                # Added since this process loaded the catalogue, possibly through another node.
+                invalidate_voice_catalog()
+                voice = get_voice_catalog().get(inputs[0])
+            provider_name = provider_class(voice and voice.provider).name
+            processing = resolve_processing(inputs[2], audio_options)
+            key, audio_path = render_narration(
+                source_text,
+                *inputs,
+                get_audio_cache(),
+                get_segment_cache(),
+                self._pools.executor(provider_name),
+                max_in_flight=2 * self.workers,
+                on_progress=_progress_reporter(broker, job, lease),
+                provider=provider_name,
+                processing=processing,
+            )
+            error = None
+        except LeaseLostError:
+            # Another worker reclaimed the job after our lease lapsed; its attempt owns the project now.
+            SYNTHESIS_JOBS.inc(outcome="abandoned")
+            return
+        except Exception as exc:
+            logger.exception("Synthesis failed for project %s", job.project_id)
+            key, audio_path, error = None, None, str(exc)
+            # Retrying cannot help these; the job fails on its first attempt.
+            permanent = isinstance(exc, (NarrationTooLongError, ProviderNotFoundError))
+        elapsed = time.perf_counter() - began
+        SYNTHESIS_DURATION.observe(elapsed)
+        if audio_path is not None and elapsed > 0:
+            _, frames, sample_rate = read_wav_layout(audio_path)
+            audio_seconds = frames / sample_rate
+            SYNTHESIS_REALTIME_FACTOR.observe(audio_seconds / elapsed)
+
+        retry = error is not None and not permanent and job.attempts < job.max_attempts
+        with get_session() as session:
+            project = session.get(Project, job.project_id)
+            if not project:
+                return
+            current = (project.voice_id, project.language, project.style, project.audio_options)
+            edited = current != (*inputs, audio_options)
+            if edited or document_digest(session, job.project_id) != digest:
+                # Edited while rendering; the job queued by the edit publishes the new audio.
+                if settle_job(session, job.id, self.owner, JobStatus.SUCCEEDED):
+                    session.commit()
+                    SYNTHESIS_JOBS.inc(outcome="superseded")
+                return
+
+            if error is None:
+                settled = settle_job(session, job.id, self.owner, JobStatus.SUCCEEDED)
+            elif retry:
+                retry_at = _retry_at(job.attempts, settings)
+                settled = settle_job(session, job.id, self.owner, JobStatus.QUEUED, error=error, retry_at=retry_at)
+            else:
+                settled = settle_job(session, job.id, self.owner, JobStatus.FAILED, error=error)
+            if not settled:
+                session.rollback()
+                SYNTHESIS_JOBS.inc(outcome="abandoned")
+                return
+
+            if error is None:
+                project.audio_hash = key
+                project.audio_path = str(audio_path)
+                project.status = ProjectStatus.COMPLETED
+                project.error_message = None
+            else:
+                project.status = ProjectStatus.PENDING if retry else ProjectStatus.FAILED
+                project.error_message = error
+            project.updated_at = datetime.utcnow()
+            session.add(project)
+            session.commit()
+            broker.publish(job.user_id, project_event(project, progress=1.0 if error is None else None))
+        SYNTHESIS_JOBS.inc(outcome="completed" if error is None else "retried" if retry else "failed")
+        if retry:
+            self.notify()
+
+
+def _progress_reporter(broker: EventBroker, job: ClaimedJob, lease: _ActiveLease) -> Callable[[int, int], None]:
+    """Publish throttled progress events (fraction merged, segment counts and an ETA) for ``job``.
+
+    The latest fraction is also left on ``lease`` for the heartbeat to store, which is how other
+    processes see the progress of this job.
+    """
+
+    started = time.monotonic()
+    last_published = 0.0
+
+    def report(merged: int, total: int) -> None:
+        nonlocal last_published
+        if lease.lost:
+            raise LeaseLostError(f"Lease on job {job.id} was lost")
+        lease.progress = round(merged / total, 4)
+        now = time.monotonic()
+        if merged < total and now - last_published < PROGRESS_INTERVAL_SECONDS:
+            return
+        last_published = now
+        elapsed = now - started
+        broker.publish(
+            job.user_id,
+            {
+                "project_id": job.project_id,
+                "status": ProjectStatus.PROCESSING.value,
+                "progress": lease.progress,
+                "segment": merged,
+                "segments": total,
+                "eta_seconds": round(elapsed * (total - merged) / merged, 2),
+            },
+        )
+
+    return report
+
+
+class JobEventRelay:
+    """Republish state changes of jobs run by other processes to this process's event subscribers.
+
+    Workers publish progress only in their own process; elsewhere it reaches the database through
+    lease heartbeats. The relay polls job rows changed since its last pass, which is how the SSE and
+    WebSocket endpoints of an API node follow jobs rendered on dedicated worker nodes.
+    """
+
+    def __init__(self, local_owner: str, poll_seconds: float) -> None:
+        self.local_owner = local_owner
+        self.poll_seconds = poll_seconds
+        self._since = datetime.utcnow()
+        self._seen: dict[int, datetime] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._since = datetime.utcnow()
+        self._thread = threading.Thread(target=self._loop, name="job-event-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.poll_once()
+            except Exception:
+                logger.exception("Failed to relay job events")
+
+    def poll_once(self) -> int:
+        broker = get_event_broker()
+        if not broker.subscriber_count():
+            self._since, self._seen = datetime.utcnow(), {}
+            return 0
+        window = self._since - timedelta(seconds=RELAY_OVERLAP_SECONDS)
+        events = []
+        with get_session() as session:
+            rows = session.exec(
+                select(Job, Project)
+                .join(Project, Project.id == Job.project_id)
+                # Jobs this process ran were published directly; unclaimed jobs have nothing to report yet.
+                .where(Job.updated_at > window, Job.lease_owner != self.local_owner)
+                .order_by(Job.updated_at)
+            ).all()
+            # Build the events before the session closes: committing on exit expires the rows.
+            for job, project in rows:
+                if self._seen.get(job.id) == job.updated_at:
+                    continue
+                self._seen[job.id] = job.updated_at
+                self._since = max(self._since, job.updated_at)
+                events.append((job.user_id, project_event(project, progress=job.progress)))
+        for user_id, payload in events:
+            broker.publish(user_id, payload)
+        self._seen = {job_id: seen for job_id, seen in self._seen.items() if seen > window}
+        return len(events)
+
+
+@lru_cache
+def get_synthesis_worker() -> SynthesisWorker:
+    """Return this process's synthesis worker; it only claims jobs once started."""
+
+    settings = get_settings()
+    return SynthesisWorker(workers=settings.synthesis_workers, max_jobs_per_user=settings.synthesis_max_jobs_per_user)
+
+
+@lru_cache
+def get_job_event_relay() -> JobEventRelay:
+    return JobEventRelay(get_synthesis_worker().owner, get_settings().job_poll_seconds)
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+
+from .audio import SAMPLE_WIDTH, WAV_HEADER_BYTES, wav_header
+from .audio_cache import AudioCache, normalize_text, synthesis_key
+from .audio_processing import NO_PROCESSING, ProcessingOptions
+from .audio_storage import MappedWav
+from .providers import DEFAULT_PROVIDER, SynthesisRequest, get_provider, provider_class, render_segments
+from .segmentation import split_segments
+
+
+SAMPLE_RATE = 22050
+COPY_CHUNK_BYTES = 1 << 20
+BATCH_CHARS = 4000
+ASSEMBLY_THREADS = 4
+# The RIFF size fields are 32-bit, which caps a WAV file at about 27 hours of 22.05 kHz mono audio.
+MAX_WAV_DATA_BYTES = 0xFFFFFFFF - 36
+# Streamed before the length is known: the largest size, which players treat as "until EOF".
+STREAMING_WAV_FRAMES = MAX_WAV_DATA_BYTES // SAMPLE_WIDTH
+
+
+class NarrationTooLongError(ValueError):
+    """Raised when a narration would not fit into a single WAV file."""
+
+
+@dataclass(frozen=True)
+class Segment:
+    request: SynthesisRequest
+    key: str
+    frames: int | None
+    provider: str = DEFAULT_PROVIDER
+    processing: ProcessingOptions = NO_PROCESSING
+
+    @property
+    def text(self) -> str:
+        return self.request.text
+
+
+def plan_segments(
+    text: str,
+    voice_id: int | None,
+    language: str | None,
+    style: str | None,
+    provider: str | None = None,
+    processing: ProcessingOptions = NO_PROCESSING,
+) -> list[Segment]:
+    """Split ``text`` into segments addressed by their own synthesis keys.
+
+    Segment lengths (after ``processing``) are filled in when ``provider`` can tell them without
+    rendering and the processing does not depend on the samples. Keys address the unprocessed
+    audio, so changing the processing reuses every rendered segment.
+    """
+
+    provider_type = provider_class(provider)
+    pieces = split_segments(normalize_text(text)) or ["Generated audio"]
+    segments = []
+    for piece in pieces:
+        request = SynthesisRequest(text=piece, voice_id=voice_id, language=language, style=style)
+        segments.append(
+            Segment(
+                request=request,
+                key=synthesis_key(piece, voice_id, language, style),
+                frames=processing.frames_for(provider_type.frames_for(request), SAMPLE_RATE),
+                provider=provider_type.name,
+                processing=processing,
+            )
+        )
+    return segments
+
+
+def narration_frames(segments: list[Segment]) -> int | None:
+    """Total frames of the narration, or ``None`` if some segment's length is only known once rendered."""
+
+    if any(segment.frames is None for segment in segments):
+        return None
+    total_frames = sum(segment.frames for segment in segments)
+    _check_length(total_frames)
+    return total_frames
+
+
+def _check_length(total_frames: int) -> None:
+    if total_frames * SAMPLE_WIDTH > MAX_WAV_DATA_BYTES:
+        raise NarrationTooLongError("Narration is too long for a single audio file")
+
+
+def _render_inline(segment: Segment) -> np.ndarray:
+    return get_provider(segment.provider).synthesize_batch([segment.request])[0].astype("<i2", copy=False)
+
+
+def open_cached_segment(segment: Segment, cache: AudioCache) -> Iterator[bytes] | None:
+    """Open a segment's cache entry and return an iterator of its processed PCM, or ``None`` if it is not cached.
+
+    Never renders. The iterator reads through the file opened here, so a later eviction cannot cut it short.
+    """
+
+    try:
+        fh = open(cache.path_for(segment.key), "rb")
+    except FileNotFoundError:
+        return None
+    return _iter_open_segment(segment, fh)
+
+
+def _iter_open_segment(segment: Segment, fh: BinaryIO) -> Iterator[bytes]:
+    with fh:
+        if not segment.processing.is_identity(SAMPLE_RATE):
+            yield from segment.processing.process_pcm(np.memmap(fh, dtype="<i2", mode="r"), SAMPLE_RATE)
+            return
+        while chunk := fh.read(COPY_CHUNK_BYTES):
+            yield chunk
+
+
+def iter_segment_pcm(segment: Segment, cache: AudioCache) -> Iterator[bytes]:
+    """Yield a segment's processed PCM from the cache while a narration is merged.
+
+    Runs on synthesis workers; a segment evicted since its batch stored it is rendered again inline
+    rather than failing the narration.
+    """
+
+    pcm = open_cached_segment(segment, cache)
+    if pcm is not None:
+        yield from pcm
+    elif segment.processing.is_identity(SAMPLE_RATE):
+        yield _render_inline(segment).tobytes()
+    else:
+        yield from segment.processing.process_pcm(_render_inline(segment), SAMPLE_RATE)
+
+
+def narration_rate(segments: list[Segment]) -> int:
+    return segments[0].processing.output_rate(SAMPLE_RATE)
+
+
+def narration_header(segments: list[Segment]) -> bytes:
+    """WAV header of a narration; its length is left open when some segment's length is only known once rendered."""
+
+    total_frames = narration_frames(segments)
+    return wav_header(STREAMING_WAV_FRAMES if total_frames is None else total_frames, narration_rate(segments))
+
+
+def _batch_missing(
+    missing: dict[str, tuple[SynthesisRequest, Path]], batch_chars: int
+) -> list[list[tuple[str, SynthesisRequest, Path]]]:
+    """Group missing segments, in narration order, into batches of roughly ``batch_chars`` characters."""
+
+    batches: list[list[tuple[str, SynthesisRequest, Path]]] = []
+    current: list[tuple[str, SynthesisRequest, Path]] = []
+    size = 0
+    for key, (request, path) in missing.items():
+        current.append((key, request, path))
+        size += len(request.text)
+        if size >= batch_chars:
+            batches.append(current)
+            current, size = [], 0
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _copy_segment(wav: MappedWav, frame_offset: int, segment: Segment, cache: AudioCache) -> None:
+    if segment.processing.is_identity(SAMPLE_RATE):
+        try:
+            wav.write_pcm_file(frame_offset, cache.path_for(segment.key), segment.frames)
+            return
+        except FileNotFoundError:
+            # Evicted since it was stored; render it again rather than fail the narration.
+            pass
+    for chunk in iter_segment_pcm(segment, cache):
+        wav.write_pcm(frame_offset, chunk)
+        frame_offset += len(chunk) // SAMPLE_WIDTH
+
+
+def narration_key(
+    text: str, voice_id: int | None, language: str | None, style: str | None, processing: ProcessingOptions
+) -> str:
+    """Content address of a narration in the audio cache, which is also the project's ``audio_hash``."""
+
+    return synthesis_key(text, voice_id, language, style, processing.cache_token(SAMPLE_RATE))
+
+
+def render_narration(
+    text: str,
+    voice_id: int | None,
+    language: str | None,
+    style: str | None,
+    audio_cache: AudioCache,
+    segment_cache: AudioCache,
+    executor: Executor,
+    max_in_flight: int = 4,
+    on_progress: Callable[[int, int], None] | None = None,
+    provider: str | None = None,
+    processing: ProcessingOptions = NO_PROCESSING,
+) -> tuple[str, Path]:
+    """Render a narration, synthesizing only segments missing from ``segment_cache``.
+
+    Missing segments are rendered by ``provider`` in batches across ``executor`` with at most
+    ``max_in_flight`` batches outstanding. When every segment length is known up front, the output
+    is preallocated and each batch is copied into its place through ``mmap`` as soon as it finishes,
+    in whatever order batches complete. Otherwise segments are appended in narration order and the
+    WAV header is rewritten at the end with the length actually merged.
+    Each segment is post-processed by ``processing`` on its way into the output.
+    ``on_progress(placed, total)`` is called as segments land in the output.
+    Returns the content address of the narration and its path in ``audio_cache``.
+    """
+
+    key = narration_key(text, voice_id, language, style, processing)
+    cached = audio_cache.get(key)
+    if cached is not None:
+        return key, cached
+
+    segments = plan_segments(text, voice_id, language, style, provider, processing)
+    provider_name = segments[0].provider
+    sample_rate = narration_rate(segments)
+    missing: dict[str, tuple[SynthesisRequest, Path]] = {}
+    for segment in segments:
+        if segment.key not in missing and segment_cache.get(segment.key) is None:
+            missing[segment.key] = (segment.request, segment_cache.temp_path(segment.key))
+
+    batches = deque(_batch_missing(missing, BATCH_CHARS))
+    in_flight: deque[tuple[Future, list[tuple[str, SynthesisRequest, Path]]]] = deque()
+    unrendered = set(missing)
+
+    def refill() -> None:
+        while batches and len(in_flight) < max_in_flight:
+            batch = batches.popleft()
+            items = [(request, path) for _, request, path in batch]
+            in_flight.append((executor.submit(render_segments, provider_name, items), batch))
+
+    def settle(future: Future, batch: list[tuple[str, SynthesisRequest, Path]]) -> list[str]:
+        future.result()
+        for segment_key, _, path in batch:
+            segment_cache.put(segment_key, path)
+            unrendered.discard(segment_key)
+        refill()
+        return [segment_key for segment_key, _, _ in batch]
+
+    def report(placed: int) -> None:
+        if on_progress is not None and placed:
+            on_progress(placed, len(segments))
+
+    scratch_path = audio_cache.temp_path(key)
+    try:
+        total_frames = narration_frames(segments)
+        refill()
+        if total_frames is None:
+            with open(scratch_path, "wb") as fh:
+                fh.write(wav_header(0, sample_rate))
+                # Merge in narration order while later batches are still rendering; only the
+                # current segment's chunk is ever held in memory.
+                for index, segment in enumerate(segments, start=1):
+                    while segment.key in unrendered:
+                        settle(*in_flight.popleft())
+                    for chunk in iter_segment_pcm(segment, segment_cache):
+                        fh.write(chunk)
+                    _check_length((fh.tell() - WAV_HEADER_BYTES) // SAMPLE_WIDTH)
+                    report(index)
+                total_frames = (fh.tell() - WAV_HEADER_BYTES) // SAMPLE_WIDTH
+                fh.seek(0)
+                fh.write(wav_header(total_frames, sample_rate))
+        else:
+            offsets: dict[str, list[int]] = {}
+            by_key: dict[str, Segment] = {}
+            position = 0
+            for segment in segments:
+                offsets.setdefault(segment.key, []).append(position)
+                by_key[segment.key] = segment
+                position += segment.frames
+
+            with MappedWav(scratch_path, total_frames, sample_rate) as wav, ThreadPoolExecutor(
+                max_workers=ASSEMBLY_THREADS, thread_name_prefix="narration-assembly"
+            ) as copier:
+
+                def place(keys: list[str]) -> int:
+                    copies = [
+                        copier.submit(_copy_segment, wav, offset, by_key[segment_key], segment_cache)
+                        for segment_key in keys
+                        for offset in offsets[segment_key]
+                    ]
+                    for copy in copies:
+                        copy.result()
+                    return len(copies)
+
+                placed = place([segment_key for segment_key in offsets if segment_key not in unrendered])
+                report(placed)
+                while in_flight:
+                    done, _ = wait([future for future, _ in in_flight], return_when=FIRST_COMPLETED)
+                    for entry in [entry for entry in in_flight if entry[0] in done]:
+                        in_flight.remove(entry)
+                        placed += place(settle(*entry))
+                        report(placed)
+                wav.finalize()
+        return key, audio_cache.put(key, scratch_path)
+    finally:
+        for future, _ in in_flight:
+            future.cancel()
+        scratch_path.unlink(missing_ok=True)
+        for _, path in missing.values():
+            path.unlink(missing_ok=True)
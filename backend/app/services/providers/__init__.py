@@ -0,0 +1,31 @@
+"""Text-to-speech providers, keyed by ``Voice.provider``."""
+
+from .base import SynthesisRequest, TTSProvider
+from .deterministic import DeterministicProvider
+from .placeholder import PlaceholderProvider
+from .pool import ProviderPools, render_segments
+from .registry import (
+    DEFAULT_PROVIDER,
+    ProviderNotFoundError,
+    get_provider,
+    import_provider_modules,
+    provider_class,
+    provider_names,
+    register_provider,
+)
+
+__all__ = [
+    "DEFAULT_PROVIDER",
+    "DeterministicProvider",
+    "PlaceholderProvider",
+    "ProviderNotFoundError",
+    "ProviderPools",
+    "SynthesisRequest",
+    "TTSProvider",
+    "get_provider",
+    "import_provider_modules",
+    "provider_class",
+    "provider_names",
+    "register_provider",
+    "render_segments",
+]
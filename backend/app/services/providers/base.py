@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import ClassVar
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SynthesisRequest:
+    text: str
+    voice_id: int | None = None
+    language: str | None = None
+    style: str | None = None
+
+
+class TTSProvider(ABC):
+    """A text-to-speech engine that renders batches of segments to mono 16-bit PCM.
+
+    One instance lives per worker process: :meth:`load` runs once, before the first batch, so
+    models stay warm across jobs. Output must be at the narration sample rate (22.05 kHz).
+    """
+
+    name: ClassVar[str]
+    max_batch_size: ClassVar[int] = 16
+
+    def load(self) -> None:
+        """Load models and other expensive state; the default provider has none."""
+
+    @abstractmethod
+    def synthesize_batch(self, requests: Sequence[SynthesisRequest]) -> list[np.ndarray]:
+        """Render each request, returning one ``int16`` array per request in the same order."""
+
+    @classmethod
+    def frames_for(cls, request: SynthesisRequest) -> int | None:
+        """Return the exact frame count ``request`` will render to, if known without rendering.
+
+        Knowing it lets the WAV header be sent before any audio exists (streaming playback).
+        """
+
+        return None
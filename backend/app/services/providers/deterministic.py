@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Sequence
+
+import numpy as np
+
+from .base import SynthesisRequest, TTSProvider
+
+
+class DeterministicProvider(TTSProvider):
+    """Fast, reproducible provider for tests: a square wave per character, no length known up front.
+
+    It records its loads and batch sizes, which lets tests observe warm-up and batching.
+    """
+
+    name = "deterministic"
+    max_batch_size = 4
+    FRAMES_PER_CHAR = 64
+
+    def __init__(self) -> None:
+        self.loads = 0
+        self.batch_sizes: list[int] = []
+
+    def load(self) -> None:
+        self.loads += 1
+
+    def synthesize_batch(self, requests: Sequence[SynthesisRequest]) -> list[np.ndarray]:
+        self.batch_sizes.append(len(requests))
+        rendered = []
+        for request in requests:
+            seed = hashlib.sha256(f"{request.voice_id}|{request.language}|{request.style}".encode()).digest()[0]
+            codes = np.frombuffer(request.text.encode("utf-8"), dtype=np.uint8).astype(np.int32)
+            periods = np.repeat(2 + (codes + seed) % 30, self.FRAMES_PER_CHAR)
+            phase = np.arange(len(periods)) // periods
+            rendered.append(np.where(phase % 2 == 0, 8000, -8000).astype(np.int16))
+        return rendered
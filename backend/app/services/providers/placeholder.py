@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+
+from ..audio import iter_placeholder_pcm, segment_total_frames
+from .base import SynthesisRequest, TTSProvider
+
+
+class PlaceholderProvider(TTSProvider):
+    """The built-in sine-wave stand-in for a real TTS engine."""
+
+    name = "placeholder"
+    max_batch_size = 64
+
+    def synthesize_batch(self, requests: Sequence[SynthesisRequest]) -> list[np.ndarray]:
+        return [
+            np.frombuffer(b"".join(iter_placeholder_pcm(request.text, self.frames_for(request))), dtype="<i2")
+            for request in requests
+        ]
+
+    @classmethod
+    def frames_for(cls, request: SynthesisRequest) -> int:
+        return segment_total_frames(request.text)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .base import SynthesisRequest
+from .registry import get_provider, import_provider_modules
+
+
+def _warm_worker(provider_name: str, modules: str) -> None:
+    """Process initializer: load the provider once so every batch finds its model warm."""
+
+    import_provider_modules(modules)
+    get_provider(provider_name)
+
+
+def render_segments(provider_name: str, items: list[tuple[SynthesisRequest, Path]]) -> None:
+    """Render ``(request, path)`` pairs to PCM files in provider-sized batches; runs in a worker."""
+
+    provider = get_provider(provider_name)
+    for start in range(0, len(items), provider.max_batch_size):
+        chunk = items[start : start + provider.max_batch_size]
+        for (_, path), pcm in zip(chunk, provider.synthesize_batch([request for request, _ in chunk])):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(pcm.astype("<i2", copy=False).tobytes())
+
+
+class ProviderPools:
+    """One process pool per provider, created on first use and kept for the life of the app."""
+
+    def __init__(self, workers: int, provider_modules: str = "") -> None:
+        self.workers = workers
+        self.provider_modules = provider_modules
+        self._pools: dict[str, ProcessPoolExecutor] = {}
+        self._lock = threading.Lock()
+
+    def executor(self, provider_name: str) -> ProcessPoolExecutor:
+        with self._lock:
+            pool = self._pools.get(provider_name)
+            if pool is None:
+                pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_worker,
+                    initargs=(provider_name, self.provider_modules),
+                )
+                self._pools[provider_name] = pool
+            return pool
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import importlib
+from functools import lru_cache
+
+from .base import TTSProvider
+from .deterministic import DeterministicProvider
+from .placeholder import PlaceholderProvider
+
+
+DEFAULT_PROVIDER = PlaceholderProvider.name
+
+_PROVIDERS: dict[str, type[TTSProvider]] = {
+    PlaceholderProvider.name: PlaceholderProvider,
+    DeterministicProvider.name: DeterministicProvider,
+}
+
+
+class ProviderNotFoundError(LookupError):
+    """Raised when a voice names a provider that is not registered."""
+
+
+def register_provider(provider: type[TTSProvider]) -> type[TTSProvider]:
+    """Register a provider class under its ``name``; usable as a class decorator."""
+
+    _PROVIDERS[provider.name] = provider
+    return provider
+
+
+def provider_names() -> list[str]:
+    return sorted(_PROVIDERS)
+
+
+def import_provider_modules(modules: str) -> None:
+    """Import comma-separated modules whose import registers extra providers.
+
+    Worker processes are spawned fresh, so registrations made at runtime in the API process do not
+    reach them; modules listed in ``TTS_PROVIDER_MODULES`` are imported in every process instead.
+    """
+
+    for module in filter(None, (name.strip() for name in modules.split(","))):
+        importlib.import_module(module)
+
+
+def provider_class(name: str | None) -> type[TTSProvider]:
+    try:
+        return _PROVIDERS[name or DEFAULT_PROVIDER]
+    except KeyError:
+        raise ProviderNotFoundError(f"Unknown TTS provider: {name}") from None
+
+
+@lru_cache(maxsize=None)
+def get_provider(name: str | None) -> TTSProvider:
+    """Return this process's loaded instance of provider ``name``, loading it on first use."""
+
+    provider = provider_class(name)()
+    provider.load()
+    return provider
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import re
+
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])\s+|(?<=[.!?…][\"'”’)\]])\s+")
+PARAGRAPH_BOUNDARY = re.compile(r"\s*\n\s*")
+MAX_SEGMENT_CHARS = 600
+
+
+def _wrap(sentence: str, max_chars: int) -> list[str]:
+    """Split an overlong sentence at whitespace so no piece exceeds ``max_chars``."""
+
+    pieces: list[str] = []
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(sentence[:cut].strip())
+        sentence = sentence[cut:].strip()
+    if sentence:
+        pieces.append(sentence)
+    return pieces
+
+
+def split_segments(text: str, max_chars: int = MAX_SEGMENT_CHARS) -> list[str]:
+    """Split narration text into sentence-sized segments.
+
+    Segments never cross a paragraph boundary, and each sentence stands alone, so editing one
+    sentence leaves every other segment (and its cached audio) untouched.
+    """
+
+    segments: list[str] = []
+    for paragraph in PARAGRAPH_BOUNDARY.split(text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        for sentence in SENTENCE_BOUNDARY.split(paragraph):
+            segments.extend(_wrap(sentence.strip(), max_chars))
+    return [segment for segment in segments if segment]
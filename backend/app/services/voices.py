@@ -1,10 +1,19 @@
 from __future__ import annotations
 
-from typing import Iterable
+import hashlib
+import threading
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
 
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
 from sqlmodel import Session, select
 
+from ..core.database import get_session
 from ..models.entities import Voice
+from ..schemas.voice import VoiceRead
 
 
 DEFAULT_VOICES: Iterable[Voice] = (
@@ -14,6 +23,8 @@ DEFAULT_VOICES: Iterable[Voice] = (
     Voice(name="Mateo", language="es", accent="LatAm", gender="male", style="neutral", provider="placeholder"),
 )
 
+VOICE_LIST = TypeAdapter(list[VoiceRead])
+
 
 def ensure_default_voices(session: Session) -> None:
     if session.exec(select(Voice)).first():
@@ -21,3 +32,127 @@ def ensure_default_voices(session: Session) -> None:
     for voice in DEFAULT_VOICES:
         session.add(voice)
     session.commit()
+
+
+def _key(value: str | None) -> str:
+    return (value or "").strip().lower()
+
+
+def _group(voices: tuple[VoiceRead, ...], attribute: str) -> Mapping[str, frozenset[int]]:
+    groups: dict[str, set[int]] = {}
+    for voice in voices:
+        groups.setdefault(_key(getattr(voice, attribute)), set()).add(voice.id)
+    return MappingProxyType({key: frozenset(ids) for key, ids in groups.items()})
+
+
+def render_voices(voices: Iterable[VoiceRead]) -> tuple[bytes, str]:
+    """Serialize ``voices`` as the ``GET /voices`` body and return it with its strong ETag."""
+
+    body = VOICE_LIST.dump_json(list(voices))
+    return body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+@dataclass(frozen=True)
+class VoiceCatalog:
+    """Immutable snapshot of the voice table, indexed for lookups and filtering.
+
+    The unfiltered ``GET /voices`` body and its ETag are rendered once, when the snapshot is built.
+    """
+
+    voices: tuple[VoiceRead, ...]
+    by_id: Mapping[int, VoiceRead]
+    by_language: Mapping[str, frozenset[int]]
+    by_provider: Mapping[str, frozenset[int]]
+    by_style: Mapping[str, frozenset[int]]
+    body: bytes
+    etag: str
+
+    @classmethod
+    def build(cls, voices: Iterable[Voice]) -> VoiceCatalog:
+        reads = tuple(
+            sorted((VoiceRead.model_validate(voice, from_attributes=True) for voice in voices), key=lambda v: v.id)
+        )
+        body, etag = render_voices(reads)
+        return cls(
+            voices=reads,
+            by_id=MappingProxyType({voice.id: voice for voice in reads}),
+            by_language=_group(reads, "language"),
+            by_provider=_group(reads, "provider"),
+            by_style=_group(reads, "style"),
+            body=body,
+            etag=etag,
+        )
+
+    def __contains__(self, voice_id: object) -> bool:
+        return voice_id in self.by_id
+
+    def get(self, voice_id: int | None) -> VoiceRead | None:
+        return self.by_id.get(voice_id) if voice_id is not None else None
+
+    def filter(
+        self, language: str | None = None, provider: str | None = None, style: str | None = None
+    ) -> tuple[VoiceRead, ...]:
+        """Return the voices matching every given attribute, compared case-insensitively, in id order."""
+
+        selected: frozenset[int] | None = None
+        for index, value in ((self.by_language, language), (self.by_provider, provider), (self.by_style, style)):
+            if value is None:
+                continue
+            ids = index.get(_key(value), frozenset())
+            selected = ids if selected is None else selected & ids
+        if selected is None:
+            return self.voices
+        return tuple(voice for voice in self.voices if voice.id in selected)
+
+
+_catalog: VoiceCatalog | None = None
+_generation = 0
+_catalog_lock = threading.Lock()
+
+
+def peek_voice_catalog() -> VoiceCatalog | None:
+    """Return the loaded catalog without touching the database, or ``None`` if it must be (re)loaded."""
+
+    return _catalog
+
+
+def get_voice_catalog() -> VoiceCatalog:
+    """Return the process-wide voice catalog, loading it from the database when missing or invalidated."""
+
+    global _catalog
+    catalog = _catalog
+    if catalog is not None:
+        return catalog
+    with _catalog_lock:
+        if _catalog is not None:
+            return _catalog
+        generation = _generation
+        with get_session() as session:
+            catalog = VoiceCatalog.build(session.exec(select(Voice)).all())
+        # A commit that changed voices while we were reading leaves the snapshot unpublished.
+        if generation == _generation:
+            _catalog = catalog
+        return catalog
+
+
+def invalidate_voice_catalog() -> None:
+    global _catalog, _generation
+    _generation += 1
+    _catalog = None
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _track_voice_changes(session: OrmSession, _flush_context: object) -> None:
+    if any(isinstance(obj, Voice) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info["voices_changed"] = True
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_after_commit(session: OrmSession) -> None:
+    if session.info.pop("voices_changed", False):
+        invalidate_voice_catalog()
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _forget_voice_changes(session: OrmSession) -> None:
+    session.info.pop("voices_changed", None)
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import mmap
+import os
+import secrets
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import BinaryIO
+from urllib.parse import quote
+
+import anyio
+from fastapi import Request, Response, status
+from starlette.types import Receive, Scope, Send
+
+
+SEND_CHUNK_BYTES = 1 << 20
+MAX_RANGES = 16
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+class RangeNotSatisfiableError(ValueError):
+    """Raised when none of the requested byte ranges overlaps the file."""
+
+
+def parse_range_header(header: str, size: int) -> list[tuple[int, int]] | None:
+    """Parse a ``Range: bytes=...`` header into inclusive ``(start, end)`` pairs.
+
+    Returns ``None`` when the header should be ignored (wrong unit, malformed, or too many
+    ranges), in which case the full file is served.
+    """
+
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec:
+        return None
+    parts = [part.strip() for part in spec.split(",") if part.strip()]
+    if not parts or len(parts) > MAX_RANGES:
+        return None
+
+    ranges: list[tuple[int, int]] = []
+    for part in parts:
+        first, dash, last = part.partition("-")
+        if not dash:
+            return None
+        try:
+            if not first:
+                length = int(last)
+                if length <= 0:
+                    continue
+                start, end = max(size - length, 0), size - 1
+            else:
+                start = int(first)
+                end = int(last) if last else size - 1
+        except ValueError:
+            return None
+        if start > end and last:
+            return None
+        if start >= size:
+            continue
+        ranges.append((start, min(end, size - 1)))
+
+    if not ranges:
+        raise RangeNotSatisfiableError(header)
+    return ranges
+
+
+class MappedFileResponse(Response):
+    """Serve a whole file, or byte ranges of it, with as little copying in Python as the server allows.
+
+    Servers that advertise the ASGI ``http.response.zerocopysend`` extension get the open file,
+    offset and count, which they hand to ``sendfile``. Otherwise the file is mapped once and sent in
+    large slices read in a worker thread, so page faults never stall the event loop. Everything is
+    read through ``file``, which the handler opened and which the response closes: a cache eviction
+    from then on unlinks the name, not the file being served. ``http.response.pathsend`` is not used,
+    because the server would reopen a path that may be gone by then.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        size: int,
+        media_type: str,
+        headers: dict[str, str],
+        ranges: list[tuple[int, int]] | None = None,
+        boundary: str | None = None,
+        filename: str | None = None,
+    ) -> None:
+        self.file = file
+        self.media_type = media_type
+        self.background = None
+        # ``(prefix, start, end)`` parts with inclusive ends, followed by a closing delimiter.
+        self._parts: list[tuple[bytes, int, int]]
+        self._trailer = b""
+        if ranges is None:
+            self.status_code = status.HTTP_200_OK
+            self._parts = [(b"", 0, size - 1)] if size else []
+        elif boundary is None:
+            self.status_code = status.HTTP_206_PARTIAL_CONTENT
+            start, end = ranges[0]
+            headers = {**headers, "Content-Range": f"bytes {start}-{end}/{size}"}
+            self._parts = [(b"", start, end)]
+        else:
+            self.status_code = status.HTTP_206_PARTIAL_CONTENT
+            self.media_type = f"multipart/byteranges; boundary={boundary}"
+            self._parts = []
+            for start, end in ranges:
+                # Each part's leading CRLF closes the previous part's body.
+                lead = "\r\n" if self._parts else ""
+                prefix = (
+                    f"{lead}--{boundary}\r\nContent-Type: {media_type}\r\n"
+                    f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+                )
+                self._parts.append((prefix.encode("latin-1"), start, end))
+            self._trailer = f"\r\n--{boundary}--\r\n".encode("latin-1")
+        content_length = sum(len(prefix) + end - start + 1 for prefix, start, end in self._parts) + len(self._trailer)
+        self.init_headers({**headers, "Content-Length": str(content_length)})
+        if filename is not None:
+            quoted = quote(filename)
+            if quoted != filename:
+                disposition = f"attachment; filename*=utf-8''{quoted}"
+            else:
+                disposition = f'attachment; filename="{filename}"'
+            self.headers.setdefault("content-disposition", disposition)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        extensions = scope.get("extensions") or {}
+        with self.file as fh:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            if scope["method"].upper() == "HEAD" or not self._parts:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+            elif "http.response.zerocopysend" in extensions:
+                await self._send_zerocopy(fh, send)
+            else:
+                await self._send_mapped(fh, send)
+
+    async def _send_zerocopy(self, fh: BinaryIO, send: Send) -> None:
+        for prefix, start, end in self._parts:
+            if prefix:
+                await send({"type": "http.response.body", "body": prefix, "more_body": True})
+            await send(
+                {
+                    "type": "http.response.zerocopysend",
+                    "file": fh,
+                    "offset": start,
+                    "count": end - start + 1,
+                    "more_body": True,
+                }
+            )
+        await send({"type": "http.response.body", "body": self._trailer, "more_body": False})
+
+    async def _send_mapped(self, fh: BinaryIO, send: Send) -> None:
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for prefix, start, end in self._parts:
+                if prefix:
+                    await send({"type": "http.response.body", "body": prefix, "more_body": True})
+                for offset in range(start, end + 1, SEND_CHUNK_BYTES):
+                    stop = min(offset + SEND_CHUNK_BYTES, end + 1)
+                    chunk = await anyio.to_thread.run_sync(mapped.__getitem__, slice(offset, stop))
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": self._trailer, "more_body": False})
+
+
+def not_modified(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    """Evaluate ``If-None-Match`` (preferred) or ``If-Modified-Since`` against the validators."""
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def file_response(
+    request: Request,
+    file: BinaryIO,
+    stat: os.stat_result,
+    media_type: str,
+    etag: str,
+    filename: str,
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """Serve the open ``file`` honouring conditional requests and single or multiple byte ranges.
+
+    The response takes ``file`` over and closes it, including when it answers without a body.
+    """
+
+    size = stat.st_size
+    last_modified = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+    base_headers = {
+        **(headers or {}),
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Accept-Ranges": "bytes",
+    }
+
+    if not_modified(request, etag, last_modified):
+        file.close()
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=base_headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            ranges = parse_range_header(range_header, size)
+        except RangeNotSatisfiableError:
+            file.close()
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={**base_headers, "Content-Range": f"bytes */{size}"},
+            )
+        if ranges:
+            boundary = secrets.token_hex(16) if len(ranges) > 1 else None
+            return MappedFileResponse(file, size, media_type, base_headers, ranges=ranges, boundary=boundary)
+
+    return MappedFileResponse(file, size, media_type, base_headers, filename=filename)
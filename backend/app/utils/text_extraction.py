@@ -1,37 +1,182 @@
 from __future__ import annotations
 
-from io import BytesIO
+import codecs
+import os
+import tempfile
+import zipfile
+from collections.abc import Iterator
 from pathlib import Path
 
+import aiofiles
 from fastapi import HTTPException, UploadFile, status
-from pypdf import PdfReader
-from docx import Document
+from fastapi.concurrency import run_in_threadpool
 
+from ..core.config import get_settings
+from ..core.metrics import REGISTRY
+from .pdf_extraction import extract_pdf_pages
 
-async def extract_text_from_upload(upload: UploadFile) -> str:
-    """Extract plain text from the uploaded document."""
 
-    suffix = Path(upload.filename or "").suffix.lower()
-    raw_bytes = await upload.read()
+SUPPORTED_SUFFIXES = {".txt", "", ".pdf", ".docx"}
+UPLOAD_CHUNK_BYTES = 1 << 20
+
+EXTRACTION_DURATION = REGISTRY.histogram(
+    "document_extraction_seconds", "Time to extract the text of an uploaded document.", ("format",)
+)
+
+
+async def spool_upload(upload: UploadFile, max_bytes: int) -> Path:
+    """Copy the upload to a temporary file in fixed-size chunks, enforcing ``max_bytes``."""
+
+    fd, name = tempfile.mkstemp(suffix=Path(upload.filename or "").suffix.lower())
+    os.close(fd)
+    path = Path(name)
+    written = 0
+    try:
+        async with aiofiles.open(path, "wb") as spool:
+            while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Uploaded file is too large"
+                    )
+                await spool.write(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
 
-    if not raw_bytes:
+    if not written:
+        path.unlink(missing_ok=True)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Uploaded file is empty")
+    return path
+
+
+def expand_zip(
+    path: Path, max_members: int, max_member_bytes: int, max_total_bytes: int
+) -> tuple[list[tuple[str, Path | None]], int]:
+    """Unpack the supported documents of a zip archive into temporary files.
+
+    Returns ``(member name, path)`` pairs in archive order, and the number of bytes inflated. The
+    path is ``None`` for members that exceed ``max_member_bytes``. An archive with more than
+    ``max_members`` documents, or that inflates to more than ``max_total_bytes`` in all, is
+    rejected with ``413``. Callers delete the returned files.
+    """
+
+    members: list[tuple[str, Path | None]] = []
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Archive expands beyond the size limit"
+    )
+    try:
+        with zipfile.ZipFile(path) as archive:
+            infos = [
+                info
+                for info in archive.infolist()
+                if not info.is_dir()
+                and not Path(info.filename).name.startswith(".")
+                and Path(info.filename).suffix.lower() in SUPPORTED_SUFFIXES - {""}
+            ]
+            if len(infos) > max_members:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Archive contains too many documents"
+                )
+            if sum(info.file_size for info in infos if info.file_size <= max_member_bytes) > max_total_bytes:
+                raise too_large
+            expanded = 0
+            for info in infos:
+                if info.file_size > max_member_bytes:
+                    members.append((info.filename, None))
+                    continue
+                fd, name = tempfile.mkstemp(suffix=Path(info.filename).suffix.lower())
+                members.append((info.filename, Path(name)))
+                with os.fdopen(fd, "wb") as out, archive.open(info) as member:
+                    # file_size comes from the archive and may lie; cap what is actually inflated.
+                    copied = 0
+                    while chunk := member.read(UPLOAD_CHUNK_BYTES):
+                        copied += len(chunk)
+                        if copied > max_member_bytes:
+                            break
+                        if expanded + copied > max_total_bytes:
+                            raise too_large
+                        out.write(chunk)
+                if copied > max_member_bytes:
+                    Path(name).unlink(missing_ok=True)
+                    members[-1] = (info.filename, None)
+                else:
+                    expanded += copied
+    except BaseException as exc:
+        for _, member_path in members:
+            if member_path is not None:
+                member_path.unlink(missing_ok=True)
+        if isinstance(exc, zipfile.BadZipFile):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid zip archive") from exc
+        raise
+    return members, expanded
+
+
+def iter_text_segments(path: Path, suffix: str, max_pages: int) -> Iterator[str]:
+    """Lazily yield the text of a spooled document; concatenating the pieces gives the full text."""
 
     if suffix in {".txt", ""}:
-        return raw_bytes.decode("utf-8", errors="ignore")
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        with open(path, "rb") as fh:
+            while chunk := fh.read(UPLOAD_CHUNK_BYTES):
+                yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+        return
 
     if suffix == ".pdf":
-        reader = PdfReader(BytesIO(raw_bytes))
-        text = "\n".join(page.extract_text() or "" for page in reader.pages)
-        if not text.strip():
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unable to extract text from PDF")
-        return text
+        report = extract_pdf_pages(path, max_pages)
+        for index, page in enumerate(report.pages):
+            yield ("\n" if index else "") + page.text
+        return
 
     if suffix == ".docx":
-        document = Document(BytesIO(raw_bytes))
-        text = "\n".join(paragraph.text for paragraph in document.paragraphs)
-        if not text.strip():
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unable to extract text from DOCX")
-        return text
+        # python-docx is imported by the first .docx upload, not at startup.
+        from docx import Document
+
+        document = Document(str(path))
+        for index, paragraph in enumerate(document.paragraphs):
+            yield ("\n" if index else "") + paragraph.text
+        return
 
     raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Unsupported file format")
+
+
+def extract_text_from_path(path: Path, suffix: str) -> str:
+    """Collect the text of a spooled document, enforcing the configured size limits."""
+
+    settings = get_settings()
+    pieces: list[str] = []
+    length = 0
+    with EXTRACTION_DURATION.time(format=suffix.lstrip(".") or "txt"):
+        for piece in iter_text_segments(path, suffix, settings.max_document_pages):
+            length += len(piece)
+            if length > settings.max_document_chars:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Document text is too long"
+                )
+            pieces.append(piece)
+    text = "".join(pieces)
+
+    if suffix == ".pdf" and not text.strip():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unable to extract text from PDF")
+    if suffix == ".docx" and not text.strip():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unable to extract text from DOCX")
+    return text
+
+
+async def extract_text_from_upload(upload: UploadFile) -> str:
+    """Extract plain text from the uploaded document.
+
+    The upload is spooled to disk in chunks and parsed in a worker thread, so neither the raw
+    bytes nor the parsing ever sit on the event loop.
+    """
+
+    suffix = Path(upload.filename or "").suffix.lower()
+    if suffix not in SUPPORTED_SUFFIXES:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Unsupported file format")
+
+    path = await spool_upload(upload, get_settings().max_upload_bytes)
+    try:
+        return await run_in_threadpool(extract_text_from_path, path, suffix)
+    finally:
+        path.unlink(missing_ok=True)
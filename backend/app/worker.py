@@ -0,0 +1,48 @@
+"""Standalone synthesis worker: ``python -m app.worker [--workers N]``.
+
+Runs against the same database as the API and claims jobs alongside any other workers, so
+synthesis capacity scales by starting more of these processes, on this host or others. Set
+``SYNTHESIS_EMBEDDED_WORKERS=false`` on API nodes that should not render themselves.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import signal
+import threading
+
+from .core.config import get_settings
+from .core.database import init_db
+from .services.jobs import SynthesisWorker
+from .services.providers import import_provider_modules
+from .services.voices import ensure_default_voices
+
+
+def main(argv: list[str] | None = None) -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(prog="python -m app.worker", description="Render queued narrations.")
+    parser.add_argument("--workers", type=int, default=settings.synthesis_workers, help="concurrent jobs")
+    parser.add_argument("--id", dest="owner", default=None, help="lease owner name (default: host:pid:random)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    import_provider_modules(settings.tts_provider_modules)
+    init_db(seed=ensure_default_voices, fast_boot=settings.db_fast_boot)
+
+    worker = SynthesisWorker(
+        workers=args.workers, max_jobs_per_user=settings.synthesis_max_jobs_per_user, owner=args.owner
+    )
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    worker.start()
+    stop.wait()
+    # Threads finish the job in hand before exiting; a worker killed outright loses its leases
+    # instead, and the jobs are picked up elsewhere once they expire.
+    worker.shutdown()
+
+
+if __name__ == "__main__":
+    main()
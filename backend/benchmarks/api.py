@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from .harness import Metric, percentile
+
+
+def _load(call: Callable[[], Any], requests: int, concurrency: int) -> tuple[list[float], float]:
+    """Issue ``requests`` calls from ``concurrency`` threads; return per-call latencies and wall time."""
+
+    def timed(_: int) -> float:
+        began = time.perf_counter()
+        response = call()
+        assert response.status_code < 400, response.text
+        return time.perf_counter() - began
+
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, range(requests)))
+    return latencies, time.perf_counter() - began
+
+
+def _wait_until_completed(client: Any, headers: dict[str, str], project_ids: list[int]) -> None:
+    deadline = time.monotonic() + 120
+    for project_id in project_ids:
+        while client.get(f"/projects/{project_id}", headers=headers).json()["status"] != "completed":
+            if time.monotonic() > deadline:
+                raise TimeoutError("Benchmark projects did not finish rendering")
+            time.sleep(0.1)
+
+
+def run(quick: bool = False) -> list[Metric]:
+    """p50/p99 latency and throughput of the project endpoints under concurrent in-process load."""
+
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    requests, concurrency = (100, 4) if quick else (400, 8)
+    metrics = []
+    with TestClient(app) as client:
+        credentials = {"email": "bench@example.com", "password": "benchmark"}
+        client.post("/auth/signup", json=credentials)
+        token = client.post("/auth/login", json=credentials).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        text = "Benchmark narration sentence number one. " * 20
+        project_ids = [
+            client.post("/projects", data={"title": f"Bench {index}", "text": text}, headers=headers).json()["id"]
+            for index in range(10)
+        ]
+        _wait_until_completed(client, headers, project_ids)
+        project_id = project_ids[0]
+
+        endpoints: dict[str, Callable[[], Any]] = {
+            "list_projects": lambda: client.get("/projects", headers=headers),
+            "get_project": lambda: client.get(f"/projects/{project_id}", headers=headers),
+            "download_audio": lambda: client.get(f"/projects/{project_id}/audio", headers=headers),
+            "download_audio_range": lambda: client.get(
+                f"/projects/{project_id}/audio", headers={**headers, "Range": "bytes=0-65535"}
+            ),
+            # Last: every created project also queues a render that competes for the CPU.
+            "create_project": lambda: client.post(
+                "/projects", data={"title": "Load", "text": "A short load-test script."}, headers=headers
+            ),
+        }
+        for name, call in endpoints.items():
+            latencies, wall = _load(call, requests, concurrency)
+            metrics += [
+                Metric(f"api.{name}.p50_ms", percentile(latencies, 0.5) * 1000, "ms", higher_is_better=False),
+                Metric(
+                    f"api.{name}.p99_ms", percentile(latencies, 0.99) * 1000, "ms", higher_is_better=False, gated=False
+                ),
+                Metric(f"api.{name}.requests_per_sec", requests / wall, "req/s", higher_is_better=True),
+            ]
+    return metrics
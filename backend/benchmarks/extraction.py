@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+from docx import Document
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from app.utils.text_extraction import extract_text_from_path
+
+from .harness import Metric, best_of
+
+LINE = "It was the best of times, it was the worst of times."
+
+
+def write_pdf(path: Path, pages: int, lines_per_page: int = 40) -> Path:
+    writer = PdfWriter()
+    font = writer._add_object(
+        DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject("/Helvetica"),
+            }
+        )
+    )
+    body = " ".join(f"BT /F1 9 Tf 20 {780 - 18 * line} Td ({LINE}) Tj ET" for line in range(lines_per_page))
+    for _ in range(pages):
+        page = writer.add_blank_page(width=595, height=842)
+        content = DecodedStreamObject()
+        content.set_data(body.encode())
+        page[NameObject("/Contents")] = writer._add_object(content)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})}
+        )
+    with open(path, "wb") as fh:
+        writer.write(fh)
+    return path
+
+
+def write_docx(path: Path, paragraphs: int) -> Path:
+    document = Document()
+    for _ in range(paragraphs):
+        document.add_paragraph(LINE * 4)
+    document.save(str(path))
+    return path
+
+
+def run(quick: bool = False) -> list[Metric]:
+    """Text extraction throughput, in MB of source document per second."""
+
+    metrics = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        documents = {
+            "pdf": write_pdf(root / "book.pdf", pages=10 if quick else 60),
+            "docx": write_docx(root / "book.docx", paragraphs=500 if quick else 3000),
+            "txt": root / "book.txt",
+        }
+        documents["txt"].write_text((LINE + "\n") * (20_000 if quick else 80_000))
+        for kind, path in documents.items():
+            seconds = best_of(lambda: extract_text_from_path(path, path.suffix), repeat=3)
+            throughput = path.stat().st_size / 1e6 / seconds
+            metrics.append(Metric(f"extraction.{kind}.mb_per_sec", throughput, "MB/s", higher_is_better=True))
+    return metrics
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import resource
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class Metric:
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool
+    # Tail latencies are too noisy on shared machines to fail a run; they are reported only.
+    gated: bool = True
+
+    def to_json(self) -> dict[str, Any]:
+        data = asdict(self)
+        data.pop("name")
+        return data
+
+
+@dataclass(frozen=True)
+class Comparison:
+    name: str
+    baseline: float
+    current: float
+    change: float
+    regressed: bool
+    gated: bool
+
+
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    """Return the fastest of ``repeat`` timed calls, which is the least noisy estimate."""
+
+    timings = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - began)
+    return min(timings)
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    if len(ordered) == 1:
+        return ordered[0]
+    return statistics.quantiles(ordered, n=100, method="inclusive")[round(fraction * 100) - 1]
+
+
+def max_rss_mib() -> float:
+    """Peak resident set size of this process so far."""
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def compare(
+    current: dict[str, dict[str, Any]], baseline: dict[str, dict[str, Any]], tolerance: float
+) -> list[Comparison]:
+    """Compare metrics present in both runs; a metric regresses when it is worse by more than ``tolerance``.
+
+    Only gated metrics count as regressions.
+    """
+
+    comparisons = []
+    for name, metric in sorted(current.items()):
+        reference = baseline.get(name)
+        if not reference or not reference["value"]:
+            continue
+        change = (metric["value"] - reference["value"]) / reference["value"]
+        worse = -change if metric["higher_is_better"] else change
+        gated = metric.get("gated", True)
+        regressed = gated and worse > tolerance
+        comparisons.append(Comparison(name, reference["value"], metric["value"], change, regressed, gated))
+    return comparisons
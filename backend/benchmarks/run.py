@@ -0,0 +1,125 @@
+"""Run the benchmark suites, write the results as JSON and compare them with a stored baseline.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.run [--quick] [--suite synthesis --suite api] [--update-baseline [--note TEXT]]
+
+Exits with status 1 when any metric is worse than the baseline by more than ``--tolerance``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .harness import Metric, compare, max_rss_mib
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline.json"
+DEFAULT_OUTPUT = BENCHMARK_DIR / "results" / "latest.json"
+SUITES = ("synthesis", "extraction", "api", "startup")
+
+
+def _isolate_environment(root: Path) -> None:
+    """Point the app at throwaway storage before any app module reads its settings."""
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{root / 'bench.db'}"
+    os.environ["STORAGE_DIR"] = str(root / "storage")
+    os.environ["SECRET_KEY"] = "benchmark-secret"  # noqa: S105
+    # Measure request handling, not the deliberately slow password hash or queue back-pressure.
+    os.environ["BCRYPT_ROUNDS"] = "4"
+    os.environ["SYNTHESIS_QUEUE_SIZE"] = "100000"
+    os.environ["SYNTHESIS_MAX_QUEUED_PER_USER"] = "100000"
+
+
+def _machine() -> dict[str, object]:
+    """Describe the hardware a run was recorded on; results only compare within one machine."""
+
+    cpu_model = platform.processor() or platform.machine()
+    try:
+        with open("/proc/cpuinfo") as fh:
+            cpu_model = next(line.split(":", 1)[1].strip() for line in fh if line.startswith("model name"))
+    except (OSError, StopIteration):
+        pass
+    try:
+        memory_gib = round(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 2**30, 1)
+    except (ValueError, OSError, AttributeError):
+        memory_gib = None
+    return {"machine": platform.machine(), "cpu_model": cpu_model, "cpu_count": os.cpu_count(), "memory_gib": memory_gib}
+
+
+def run_suites(suites: list[str], quick: bool) -> dict[str, dict]:
+    from . import api, extraction, startup, synthesis
+
+    modules = {"synthesis": synthesis, "extraction": extraction, "api": api, "startup": startup}
+    metrics: list[Metric] = []
+    for suite in suites:
+        print(f"running {suite} ...", file=sys.stderr)
+        metrics += modules[suite].run(quick=quick)
+        metrics.append(Metric(f"memory.max_rss_mib.after_{suite}", max_rss_mib(), "MiB", higher_is_better=False))
+    return {metric.name: metric.to_json() for metric in metrics}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suite", action="append", choices=SUITES, help="suite to run (repeatable; default: all)")
+    parser.add_argument("--quick", action="store_true", help="smaller inputs, for a fast smoke run")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed relative slowdown (default: 0.3)")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--note", help="why the baseline was re-recorded; stored with it")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _isolate_environment(Path(tmpdir))
+        results = run_suites(args.suite or list(SUITES), args.quick)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            **_machine(),
+            "quick": args.quick,
+            "note": args.note,
+        },
+        "results": results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"wrote {args.output}")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"updated {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print("no baseline to compare against")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline["meta"].get("note"):
+        print(f"baseline note: {baseline['meta']['note']}")
+    if baseline["meta"].get("quick") != args.quick:
+        print("baseline was recorded with a different --quick setting; not comparing")
+        return 0
+    comparisons = compare(results, baseline["results"], args.tolerance)
+    for item in comparisons:
+        flag = "REGRESSED" if item.regressed else "ok" if item.gated else "info"
+        print(f"{item.name:50} {item.baseline:14.2f} -> {item.current:14.2f} ({item.change:+7.1%}) {flag}")
+    regressions = [item for item in comparisons if item.regressed]
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
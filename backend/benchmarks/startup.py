@@ -0,0 +1,113 @@
+"""Cold-start cost of the API: import time, boot to the first response, and an import-time profile.
+
+Run ``python -m benchmarks.startup [--top 25]`` (from ``backend/``) to print which modules
+``app.main`` spends its import time in.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from .harness import Metric
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+# Dependencies that API processes should only load when a request needs them.
+HEAVY_MODULES = ("numpy", "pypdf", "docx", "lxml", "soundfile")
+BOOT_SCRIPT = """
+import time
+from fastapi.testclient import TestClient
+began = time.perf_counter()
+from app.main import app
+with TestClient(app) as client:
+    client.get("/")
+    print((time.perf_counter() - began) * 1000)
+"""
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    module: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+def _python(code: str, *flags: str, env: dict[str, str] | None = None) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def profile_imports(module: str = "app.main") -> list[ImportTiming]:
+    """Import ``module`` in a fresh interpreter under ``-X importtime`` and parse the timings."""
+
+    stderr = _python(f"import {module}", "-X", "importtime").stderr
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        timings.append(ImportTiming(name.strip(), depth, int(self_us), int(cumulative_us)))
+    return timings
+
+
+def _boot_ms(database_url: str) -> float:
+    env = {"DATABASE_URL": database_url, "SYNTHESIS_EMBEDDED_WORKERS": "false"}
+    return float(_python(BOOT_SCRIPT, env=env).stdout.strip().splitlines()[-1])
+
+
+def run(quick: bool = False) -> list[Metric]:
+    """Import time of ``app.main`` and boot-to-first-response time of a fresh and an initialised database.
+
+    Boots run with the synthesis workers disabled, as on API-only nodes.
+    """
+
+    repeat = 2 if quick else 5
+    imports = []
+    for _ in range(repeat):
+        timings = {timing.module: timing for timing in profile_imports()}
+        imports.append(timings["app.main"].cumulative_us / 1000)
+    metrics = [Metric("startup.import_ms.app_main", min(imports), "ms", higher_is_better=False)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database_url = f"sqlite:///{Path(tmpdir) / 'startup.db'}"
+        metrics.append(Metric("startup.boot_ms.new_database", _boot_ms(database_url), "ms", higher_is_better=False))
+        fast_boot = min(_boot_ms(database_url) for _ in range(repeat))
+        metrics.append(Metric("startup.boot_ms.fast_boot", fast_boot, "ms", higher_is_better=False))
+    return metrics
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.main", help="module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=25, help="rows per table (default: 25)")
+    args = parser.parse_args(argv)
+
+    timings = profile_imports(args.module)
+    total = next(timing for timing in timings if timing.module == args.module)
+    print(f"{args.module}: {total.cumulative_us / 1000:.1f} ms, {len(timings)} modules imported\n")
+    for title, key in (("cumulative", "cumulative_us"), ("self", "self_us")):
+        print(f"slowest by {title} time:")
+        for timing in sorted(timings, key=lambda timing: getattr(timing, key), reverse=True)[: args.top]:
+            print(f"  {getattr(timing, key) / 1000:9.1f} ms  {'  ' * timing.depth}{timing.module}")
+        print()
+    loaded = {timing.module for timing in timings}
+    heavy = [module for module in HEAVY_MODULES if module in loaded]
+    print("heavy modules loaded at import:", ", ".join(heavy) if heavy else "none")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
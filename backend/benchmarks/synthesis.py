@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from app.services.audio import iter_placeholder_pcm, placeholder_total_frames, synthesize_placeholder_audio
+from app.services.audio_processing import STYLE_PRESETS
+
+from .harness import Metric, best_of
+
+TEXT_LENGTHS = (100, 1_000, 10_000)
+SENTENCE = "The quick brown fox jumps over the lazy dog. "
+PROCESSING_SECONDS = 60
+SAMPLE_RATE = 22050
+
+
+def _processing_metrics(quick: bool) -> list[Metric]:
+    frames = SAMPLE_RATE * (PROCESSING_SECONDS // 6 if quick else PROCESSING_SECONDS)
+    samples = np.frombuffer(b"".join(iter_placeholder_pcm(SENTENCE, frames)), dtype="<i2")
+    metrics = []
+    for style in ("podcast", "broadcast"):
+        options = STYLE_PRESETS[style]
+        seconds = best_of(lambda: sum(map(len, options.process_pcm(samples, SAMPLE_RATE))), repeat=3)
+        name = f"synthesis.processing_samples_per_sec.{style}"
+        metrics.append(Metric(name, frames / seconds, "samples/s", higher_is_better=True))
+    return metrics
+
+
+def run(quick: bool = False) -> list[Metric]:
+    """Placeholder synthesis throughput by text length, its peak Python allocation, and post-processing throughput."""
+
+    metrics = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output = Path(tmpdir) / "out.wav"
+        for length in TEXT_LENGTHS[:2] if quick else TEXT_LENGTHS:
+            text = (SENTENCE * (length // len(SENTENCE) + 1))[:length]
+            seconds = best_of(lambda: synthesize_placeholder_audio(text, output), repeat=3)
+            metrics.append(
+                Metric(
+                    f"synthesis.samples_per_sec.{length}_chars",
+                    placeholder_total_frames(text) / seconds,
+                    "samples/s",
+                    higher_is_better=True,
+                )
+            )
+
+        tracemalloc.start()
+        synthesize_placeholder_audio(text, output)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        metrics.append(
+            Metric(f"synthesis.peak_alloc_mib.{length}_chars", peak / 2**20, "MiB", higher_is_better=False)
+        )
+    return metrics + _processing_metrics(quick)
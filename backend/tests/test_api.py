@@ -1,22 +1,23 @@
 from __future__ import annotations
 
+import json
 import os
+import struct
 import tempfile
 import time
+from io import BytesIO
 from pathlib import Path
 from typing import Generator
 
 import pytest
 from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
 
 from app.core.config import get_settings
 
 
 @pytest.fixture(scope="module")
 def client() -> Generator[TestClient, None, None]:
-    from importlib import reload
-    import app.core.config as config_module
-
     with tempfile.TemporaryDirectory() as tmpdir:
         tmp_path = Path(tmpdir)
         db_path = tmp_path / "test.db"
@@ -26,8 +27,7 @@ def client() -> Generator[TestClient, None, None]:
         os.environ["SECRET_KEY"] = "test-secret"  # noqa: S105
 
         # Clear cached settings to pick up new environment variables
-        config_module.get_settings.cache_clear()  # type: ignore[attr-defined]
-        reload(config_module)
+        get_settings.cache_clear()
         from app.main import app
 
         with TestClient(app) as test_client:
@@ -90,3 +90,463 @@ def test_signup_login_and_project_flow(client: TestClient) -> None:
     assert audio_response.status_code == 200
     assert audio_response.headers["content-type"] == "audio/wav"
     assert len(audio_response.content) > 0
+
+    stream_response = client.get(f"/projects/{project_id}/audio/stream", headers=headers)
+    assert stream_response.status_code == 200
+    assert stream_response.headers["content-type"] == "audio/wav"
+    assert stream_response.content == audio_response.content
+
+    compressed_response = client.get(f"/projects/{project_id}/audio", params={"format": "adpcm"}, headers=headers)
+    assert compressed_response.status_code == 200
+    assert compressed_response.headers["content-type"] == "audio/wav"
+    assert len(compressed_response.content) < len(audio_response.content) / 3
+    assert client.get(f"/projects/{project_id}/audio", params={"format": "mp3"}, headers=headers).status_code == 406
+
+    etag = audio_response.headers["etag"]
+    audio_url = detail["audio_url"]
+    assert client.get(audio_url, headers={**headers, "If-None-Match": etag}).status_code == 304
+    assert "immutable" in client.get(audio_url, headers=headers).headers["cache-control"]
+    partial = client.get(audio_url, headers={**headers, "Range": "bytes=0-43"})
+    assert partial.status_code == 206
+    assert partial.headers["content-range"] == f"bytes 0-43/{len(audio_response.content)}"
+    assert partial.content == audio_response.content[:44]
+    multi = client.get(audio_url, headers={**headers, "Range": "bytes=0-3, -4"})
+    assert multi.status_code == 206
+    assert multi.headers["content-type"].startswith("multipart/byteranges")
+    assert audio_response.content[:4] in multi.content and audio_response.content[-4:] in multi.content
+    unsatisfiable = client.get(audio_url, headers={**headers, "Range": "bytes=999999999-"})
+    assert unsatisfiable.status_code == 416
+
+
+def test_login_rehash_invalidates_cached_tokens(client: TestClient) -> None:
+    from passlib.context import CryptContext
+    from sqlmodel import select
+
+    from app.core.auth_cache import get_token_cache
+    from app.core.database import get_session
+    from app.models.entities import User
+
+    credentials = {"email": "rehash@example.com", "password": "secret123"}
+    client.post("/auth/signup", json=credentials)
+    token = client.post("/auth/login", json=credentials).json()["access_token"]
+    assert client.get("/projects", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+    assert get_token_cache().get(token) is not None
+
+    with get_session() as session:
+        user = session.exec(select(User).where(User.email == credentials["email"])).one()
+        user.password_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash(credentials["password"])
+        session.add(user)
+    # Logging in upgrades the outdated hash, which drops the user's cached tokens.
+    assert client.post("/auth/login", json=credentials).status_code == 200
+    assert get_token_cache().get(token) is None
+
+
+def test_patch_project_rerenders_changed_text(client: TestClient) -> None:
+    client.post("/auth/signup", json={"email": "editor@example.com", "password": "secret123"})
+    token = client.post("/auth/login", json={"email": "editor@example.com", "password": "secret123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    project = client.post("/projects", data={"title": "Draft", "text": "One. Two."}, headers=headers).json()
+    first = _wait_for_completion(client, headers, project["id"])
+
+    patch_response = client.patch(f"/projects/{project['id']}", json={"text": "One. Three!"}, headers=headers)
+    assert patch_response.status_code == 200, patch_response.text
+    assert patch_response.json()["source_text"] == "One. Three!"
+
+    second = _wait_for_completion(client, headers, project["id"])
+    assert second["updated_at"] != first["updated_at"]
+    audio = client.get(f"/projects/{project['id']}/audio", headers=headers)
+    stream = client.get(f"/projects/{project['id']}/audio/stream", headers=headers)
+    assert audio.content == stream.content
+
+
+def test_patch_queues_a_job_when_the_waiting_one_is_claimed_meanwhile(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from datetime import datetime, timedelta
+
+    from sqlmodel import select
+
+    import app.api.projects as projects_api
+    from app.core.database import get_session
+    from app.models.entities import Job, JobStatus, Project, ProjectStatus
+
+    client.post("/auth/signup", json={"email": "racer@example.com", "password": "secret123"})
+    token = client.post("/auth/login", json={"email": "racer@example.com", "password": "secret123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    project = client.post("/projects", data={"title": "Race", "text": "Before."}, headers=headers).json()
+    _wait_for_completion(client, headers, project["id"])
+
+    # Put the project back in the queue behind a job the embedded workers will not claim on their own.
+    with get_session() as session:
+        stored = session.get(Project, project["id"])
+        stored.status = ProjectStatus.PENDING
+        session.add(stored)
+        job = Job(project_id=project["id"], user_id=stored.user_id, available_at=datetime.utcnow() + timedelta(hours=1))
+        session.add(job)
+        session.commit()
+        waiting_id = job.id
+
+    replace_document = projects_api.replace_document
+
+    def claim_meanwhile(document, text):
+        # A worker claims the waiting job (and reads the old text) after the PATCH read the project as pending.
+        replace_document(document, text)
+        with get_session() as session:
+            claimed = session.get(Job, waiting_id)
+            claimed.status = JobStatus.RUNNING
+            session.add(claimed)
+            session.commit()
+
+    monkeypatch.setattr(projects_api, "replace_document", claim_meanwhile)
+    assert client.patch(f"/projects/{project['id']}", json={"text": "After."}, headers=headers).status_code == 200
+
+    with get_session() as session:
+        jobs = session.exec(select(Job).where(Job.project_id == project["id"], Job.id != waiting_id)).all()
+    # The job that created the project, and the one the edit queued since the waiting job was taken.
+    assert len(jobs) == 2
+    _wait_for_completion(client, headers, project["id"])
+
+
+def test_stream_waits_for_the_job_and_never_renders_in_the_api(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from app.services import narration
+    from app.services.audio_cache import get_segment_cache
+
+    def no_inline_rendering(segment):
+        raise AssertionError("the API must not synthesize segments")
+
+    monkeypatch.setattr(narration, "_render_inline", no_inline_rendering)
+    client.post("/auth/signup", json={"email": "listener@example.com", "password": "secret123"})
+    token = client.post("/auth/login", json={"email": "listener@example.com", "password": "secret123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    text = " ".join(f"Streamed sentence {index}." for index in range(12))
+    project = client.post("/projects", data={"title": "Live", "text": text}, headers=headers).json()
+    # Requested before the job finishes: segments are sent as the job stores them.
+    streamed = client.get(f"/projects/{project['id']}/audio/stream", headers=headers)
+    _wait_for_completion(client, headers, project["id"])
+    stored = client.get(f"/projects/{project['id']}/audio", headers=headers).content
+    assert streamed.status_code == 200
+    assert streamed.content == stored
+
+    # Segments evicted after the job finished: the rest comes from the stored narration.
+    evicted = list(get_segment_cache().root.glob("*/*.pcm"))
+    assert evicted
+    for path in evicted:
+        path.unlink()
+    assert client.get(f"/projects/{project['id']}/audio/stream", headers=headers).content == stored
+
+
+def test_download_of_evicted_audio_queues_a_rerender(client: TestClient) -> None:
+    from app.core.database import get_session
+    from app.models.entities import Project
+
+    client.post("/auth/signup", json={"email": "evicted@example.com", "password": "secret123"})
+    token = client.post("/auth/login", json={"email": "evicted@example.com", "password": "secret123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    project = client.post("/projects", data={"title": "Evicted", "text": "Kept. Then lost."}, headers=headers).json()
+    _wait_for_completion(client, headers, project["id"])
+    with get_session() as session:
+        Path(session.get(Project, project["id"]).audio_path).unlink()
+
+    # The cache dropped the master under a completed project: render it again rather than 410 for good.
+    missing = client.get(f"/projects/{project['id']}/audio", headers=headers)
+    assert missing.status_code == 503
+    assert missing.headers["retry-after"] == "30"
+    assert client.get(f"/projects/{project['id']}", headers=headers).json()["status"] in {"pending", "processing"}
+
+    _wait_for_completion(client, headers, project["id"])
+    assert client.get(f"/projects/{project['id']}/audio", headers=headers).status_code == 200
+
+
+def test_download_survives_eviction_after_the_handler_returns(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    import app.api.projects as projects_api
+    from app.core.database import get_session
+    from app.models.entities import Project
+
+    client.post("/auth/signup", json={"email": "late@example.com", "password": "secret123"})
+    token = client.post("/auth/login", json={"email": "late@example.com", "password": "secret123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    project = client.post("/projects", data={"title": "Late", "text": "Evicted mid-flight."}, headers=headers).json()
+    _wait_for_completion(client, headers, project["id"])
+    expected = client.get(f"/projects/{project['id']}/audio", headers=headers).content
+    with get_session() as session:
+        audio_path = Path(session.get(Project, project["id"]).audio_path)
+
+    file_response = projects_api.file_response
+
+    def evict_before_sending(*args, **kwargs):
+        response = file_response(*args, **kwargs)
+        audio_path.unlink()
+        return response
+
+    monkeypatch.setattr(projects_api, "file_response", evict_before_sending)
+    response = client.get(f"/projects/{project['id']}/audio", headers=headers)
+    assert response.status_code == 200
+    assert response.content == expected
+
+
+def _wait_for_completion(client: TestClient, headers: dict[str, str], project_id: int) -> dict:
+    for _ in range(25):
+        detail = client.get(f"/projects/{project_id}", headers=headers).json()
+        if detail["status"] == "completed":
+            return detail
+        time.sleep(0.2)
+    pytest.fail("Project did not complete in time")
+
+
+def test_document_upload_is_extracted_within_limits(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    from docx import Document
+
+    client.post("/auth/signup", json={"email": "uploader@example.com", "password": "secret123"})
+    token = client.post("/auth/login", json={"email": "uploader@example.com", "password": "secret123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    document = Document()
+    document.add_paragraph("Chapter one.")
+    document.add_paragraph("It was a dark night.")
+    buffer = BytesIO()
+    document.save(buffer)
+    response = client.post(
+        "/projects",
+        data={"title": "Docx"},
+        files={"file": ("book.docx", buffer.getvalue())},
+        headers=headers,
+    )
+    assert response.status_code == 201, response.text
+    assert response.json()["source_text"] == "Chapter one.\nIt was a dark night."
+
+    monkeypatch.setattr(get_settings(), "max_upload_bytes", 8)
+    response = client.post(
+        "/projects", data={"title": "Big"}, files={"file": ("big.txt", b"far too many bytes")}, headers=headers
+    )
+    assert response.status_code == 413
+
+
+def test_project_listing_pages_with_keyset_cursor(client: TestClient) -> None:
+    client.post("/auth/signup", json={"email": "lister@example.com", "password": "secret123"})
+    token = client.post("/auth/login", json={"email": "lister@example.com", "password": "secret123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    created = [
+        client.post(
+            "/projects", data={"title": f"Item {i}", "text": "Short.", "language": "en" if i % 2 else "de"}, headers=headers
+        ).json()["id"]
+        for i in range(5)
+    ]
+
+    seen: list[int] = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/projects", params=params, headers=headers)
+        assert response.status_code == 200
+        assert all("source_text" not in item for item in response.json())
+        seen.extend(item["id"] for item in response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    assert seen == sorted(created, reverse=True)
+
+    german = client.get("/projects", params={"language": "de"}, headers=headers).json()
+    assert [item["id"] for item in german] == [created[4], created[2], created[0]]
+    assert client.get("/projects", params={"status": "failed"}, headers=headers).json() == []
+    assert client.get("/projects", params={"cursor": "not-a-cursor"}, headers=headers).status_code == 400
+
+
+def test_progress_is_pushed_over_sse_and_websocket(client: TestClient) -> None:
+    client.post("/auth/signup", json={"email": "watcher@example.com", "password": "secret123"})
+    token = client.post("/auth/login", json={"email": "watcher@example.com", "password": "secret123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with client.websocket_connect(f"/projects/events?token={token}") as websocket:
+        text = " ".join(f"Sentence number {i} is here." for i in range(40))
+        project_id = client.post("/projects", data={"title": "Live", "text": text}, headers=headers).json()["id"]
+        pushed = []
+        while not pushed or pushed[-1]["status"] != "completed":
+            event = websocket.receive_json()
+            assert event["project_id"] == project_id
+            pushed.append(event)
+    assert pushed[0]["status"] == "processing"
+    progress = [event["progress"] for event in pushed if event.get("progress") is not None]
+    assert progress == sorted(progress) and progress[-1] == 1.0
+    assert any("eta_seconds" in event for event in pushed)
+
+    with client.stream("GET", f"/projects/{project_id}/events", headers=headers) as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        lines = [line for line in response.iter_lines() if line.startswith("data: ")]
+    assert [json.loads(line[6:])["status"] for line in lines] == ["completed"]
+
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/projects/events?token=bogus") as websocket:
+            websocket.receive_json()
+
+
+def test_batch_creates_projects_from_texts_files_and_zip(client: TestClient) -> None:
+    import zipfile
+
+    client.post("/auth/signup", json={"email": "batcher@example.com", "password": "secret123"})
+    token = client.post("/auth/login", json={"email": "batcher@example.com", "password": "secret123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    archive = BytesIO()
+    with zipfile.ZipFile(archive, "w") as bundle:
+        bundle.writestr("scripts/intro.txt", "Welcome to the show.")
+        bundle.writestr("scripts/empty.txt", "   ")
+        bundle.writestr("scripts/image.png", b"not a document")
+    response = client.post(
+        "/projects/batch",
+        data={"texts": ["First script.", "Second script."], "titles": ["One"], "language": "en"},
+        files=[
+            ("files", ("outro.txt", b"Thanks for listening.")),
+            ("files", ("bundle.zip", archive.getvalue())),
+        ],
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["queued"], body["failed"], body["rejected"]) == (4, 1, 0)
+    assert [item["title"] for item in body["items"]] == ["One", "Script 2", "outro", "intro", "empty"]
+    assert [item["status"] for item in body["items"]] == ["queued"] * 4 + ["failed"]
+
+    for item in body["items"][:4]:
+        detail = _wait_for_completion(client, headers, item["project"]["id"])
+        assert detail["language"] == "en"
+    assert _wait_for_completion(client, headers, body["items"][3]["project"]["id"])["source_text"] == "Welcome to the show."
+
+
+def test_batch_limits_apply_across_all_archives_of_a_request(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    import zipfile
+
+    client.post("/auth/signup", json={"email": "zipper@example.com", "password": "secret123"})
+    token = client.post("/auth/login", json={"email": "zipper@example.com", "password": "secret123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def archive(name: str) -> tuple[str, tuple[str, bytes]]:
+        data = BytesIO()
+        with zipfile.ZipFile(data, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+            bundle.writestr(f"{name}.txt", "Words. " * 150)
+        return ("files", (f"{name}.zip", data.getvalue()))
+
+    settings = get_settings()
+    # Each archive fits on its own; together they do not.
+    monkeypatch.setattr(settings, "max_archive_expanded_bytes", 1500)
+    response = client.post("/projects/batch", files=[archive("one"), archive("two")], headers=headers)
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Archive expands beyond the size limit"
+
+    monkeypatch.setattr(settings, "max_archive_expanded_bytes", 1 << 20)
+    monkeypatch.setattr(settings, "max_batch_items", 2)
+    response = client.post("/projects/batch", files=[archive(name) for name in ("a", "b", "c")], headers=headers)
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Too many items in batch"
+
+
+def test_metrics_endpoint_reports_routes_and_pipeline(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    assert client.get("/metrics").status_code == 404
+    settings = get_settings()
+    monkeypatch.setattr(settings, "metrics_enabled", True)
+    monkeypatch.setattr(settings, "metrics_token", "scrape-secret")
+
+    client.post("/auth/signup", json={"email": "observer@example.com", "password": "secret123"})
+    token = client.post("/auth/login", json={"email": "observer@example.com", "password": "secret123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    project_id = client.post("/projects", data={"title": "Metered", "text": "Count me."}, headers=headers).json()["id"]
+    _wait_for_completion(client, headers, project_id)
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers=headers).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/projects/{project_id}",status="200"}' in text
+    assert 'synthesis_jobs_total{outcome="completed"}' in text
+    assert "synthesis_realtime_factor_count" in text
+    assert 'db_session_duration_seconds_count{kind="async"}' in text
+    assert 'cache_hits_total{cache="auth_token"}' in text
+    assert "synthesis_queue_depth 0" in text
+
+
+def test_voice_catalog_filters_revalidates_and_tracks_changes(client: TestClient) -> None:
+    from sqlalchemy import text
+
+    from app.core.database import get_session
+    from app.models.entities import Voice
+
+    client.post("/auth/signup", json={"email": "caster@example.com", "password": "secret123"})
+    token = client.post("/auth/login", json={"email": "caster@example.com", "password": "secret123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    listing = client.get("/voices")
+    etag = listing.headers["etag"]
+    assert client.get("/voices", headers={"If-None-Match": etag}).status_code == 304
+    spanish = client.get("/voices", params={"language": "ES", "provider": "placeholder"}).json()
+    assert [voice["name"] for voice in spanish] == ["Mateo"]
+    assert client.get("/voices", params={"style": "whisper"}).json() == []
+
+    response = client.post("/projects", data={"title": "Lost", "text": "Hi.", "voice_id": 9999}, headers=headers)
+    assert response.status_code == 400
+    project = client.post("/projects", data={"title": "Found", "text": "Hi."}, headers=headers).json()
+    response = client.patch(f"/projects/{project['id']}", json={"voice_id": 9999}, headers=headers)
+    assert response.status_code == 400
+
+    with get_session() as session:
+        voice = Voice(name="Lena", language="de", provider="deterministic")
+        session.add(voice)
+        session.commit()
+        voice_id = voice.id
+    changed = client.get("/voices", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()[-1]["name"] == "Lena"
+    response = client.patch(f"/projects/{project['id']}", json={"voice_id": voice_id}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert _wait_for_completion(client, headers, project["id"])["voice_id"] == voice_id
+
+    # A voice deleted behind this process's catalog (e.g. through another node) is caught by the foreign key.
+    with get_session() as session:
+        gone = Voice(name="Gone", language="en")
+        session.add(gone)
+        session.commit()
+        gone_id = gone.id
+    assert client.get("/voices").json()[-1]["name"] == "Gone"
+    with get_session() as session:
+        session.execute(text("DELETE FROM voice WHERE id = :id"), {"id": gone_id})
+    response = client.post("/projects", data={"title": "Stale", "text": "Hi.", "voice_id": gone_id}, headers=headers)
+    assert response.status_code == 400
+    assert client.get("/voices").json()[-1]["name"] == "Lena"
+
+
+def test_audio_options_follow_style_presets_and_edits(client: TestClient) -> None:
+    client.post("/auth/signup", json={"email": "mixer@example.com", "password": "secret123"})
+    token = client.post("/auth/login", json={"email": "mixer@example.com", "password": "secret123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    rejected = client.post(
+        "/projects", data={"title": "Bad", "text": "Hi.", "audio_options": '{"speed": 9}'}, headers=headers
+    )
+    assert rejected.status_code == 400 and "speed" in rejected.json()["detail"]
+
+    project = client.post(
+        "/projects",
+        data={"title": "Show", "text": "One. Two.", "style": "podcast", "audio_options": '{"speed": 1.5}'},
+        headers=headers,
+    ).json()
+    assert project["audio_options"]["speed"] == 1.5
+    _wait_for_completion(client, headers, project["id"])
+    audio = client.get(f"/projects/{project['id']}/audio", headers=headers).content
+    # The podcast preset resamples to 44.1 kHz; the project's own option speeds it up.
+    assert struct.unpack_from("<I", audio, 24)[0] == 44100
+
+    patched = client.patch(
+        f"/projects/{project['id']}", json={"audio_options": {"sample_rate": 16000}}, headers=headers
+    ).json()
+    assert patched["status"] == "pending" and patched["audio_options"]["sample_rate"] == 16000
+    _wait_for_completion(client, headers, project["id"])
+    audio = client.get(f"/projects/{project['id']}/audio", headers=headers).content
+    stream = client.get(f"/projects/{project['id']}/audio/stream", headers=headers).content
+    assert struct.unpack_from("<I", audio, 24)[0] == 16000
+    assert audio[44:] == stream[44:]
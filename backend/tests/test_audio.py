@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import math
+import struct
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.services.audio import synthesize_placeholder_audio
+from app.services.audio_cache import AudioCache, synthesis_key
+from app.services.audio_storage import MappedWav, map_pcm, read_wav_layout
+from app.services.audio_processing import ProcessingOptions, Resample, resolve_processing
+from app.services.audio_codecs import (
+    ADPCM_BLOCK_ALIGN,
+    FORMATS,
+    IMA_INDEX_TABLE,
+    IMA_STEP_TABLE,
+    UnsupportedFormatError,
+    ensure_variant,
+    mulaw_encode,
+    negotiate_format,
+)
+from app.services import narration
+from app.services.narration import (
+    NarrationTooLongError,
+    Segment,
+    iter_segment_pcm,
+    narration_header,
+    plan_segments,
+    render_narration,
+)
+from app.services.providers import ProviderNotFoundError, get_provider
+
+
+def _narration_wav(segments: list[Segment], cache: AudioCache) -> bytes:
+    """The narration as streamed: the header, then each segment's processed PCM in order."""
+
+    return narration_header(segments) + b"".join(b"".join(iter_segment_pcm(segment, cache)) for segment in segments)
+
+
+def _reference_placeholder_audio(text: str, output_path: Path, sample_rate: int = 22050) -> Path:
+    """Original per-sample implementation (without the former 60-second cap), kept to pin the vectorized output."""
+
+    duration_seconds = max(2.0, len(text) / 25)
+    total_frames = int(sample_rate * duration_seconds)
+    with open(output_path, "wb") as fh:
+        with wave.open(fh, "w") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(sample_rate)
+            for frame in range(total_frames):
+                char = text[frame % len(text)] if text else "A"
+                frequency = 220.0 + (ord(char) % 60)
+                value = int(12000 * math.sin(2 * math.pi * frequency * frame / sample_rate))
+                wav_file.writeframesraw(struct.pack("<h", value))
+    return output_path
+
+
+def test_vectorized_synthesis_is_byte_identical(tmp_path: Path) -> None:
+    for index, text in enumerate(["Hello world", "Ünïcödé — narration ✓ " * 4, ""]):
+        expected = _reference_placeholder_audio(text, tmp_path / f"expected_{index}.wav")
+        actual = synthesize_placeholder_audio(text, tmp_path / f"actual_{index}.wav")
+        assert actual.read_bytes() == expected.read_bytes()
+
+
+def test_audio_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = AudioCache(tmp_path / "cache", max_bytes=250)
+    keys = [synthesis_key(text, None, "en", None) for text in ("one", "two", "three")]
+    assert keys[0] == synthesis_key("  one\r\n", None, "EN ", "")
+
+    for key in keys[:2]:
+        scratch = cache.temp_path(key)
+        scratch.write_bytes(b"x" * 100)
+        cache.put(key, scratch)
+    assert cache.get(keys[0]) is not None
+
+    scratch = cache.temp_path(keys[2])
+    scratch.write_bytes(b"x" * 100)
+    cache.put(keys[2], scratch)
+
+    assert cache.get(keys[1]) is None
+    assert not cache.path_for(keys[1]).exists()
+    assert cache.stats() == {"entries": 2, "size_bytes": 200, "hits": 1, "misses": 1, "evictions": 1}
+    assert AudioCache(tmp_path / "cache", max_bytes=250).size_bytes == 200
+
+
+def test_render_narration_only_synthesizes_changed_segments(tmp_path: Path) -> None:
+    audio_cache = AudioCache(tmp_path / "cache", max_bytes=1 << 30)
+    segment_cache = AudioCache(tmp_path / "segments", max_bytes=1 << 30, suffix=".pcm")
+    original = "First sentence here. Second one follows.\n\nA new paragraph."
+    edited = "First sentence here. Second one changed!\n\nA new paragraph."
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        key, path = render_narration(original, None, "en", None, audio_cache, segment_cache, executor)
+        assert segment_cache.stats()["entries"] == 3
+        edited_key, edited_path = render_narration(edited, None, "en", None, audio_cache, segment_cache, executor)
+
+    assert segment_cache.stats()["entries"] == 4
+    assert key != edited_key
+    segments = plan_segments(edited, None, "en", None)
+    assert [segment.text for segment in segments] == ["First sentence here.", "Second one changed!", "A new paragraph."]
+    assert edited_path.read_bytes() == _narration_wav(segments, segment_cache)
+    assert path.stat().st_size == edited_path.stat().st_size
+
+
+def _decode_ima_adpcm(data: bytes, frames: int) -> np.ndarray:
+    samples: list[int] = []
+    for offset in range(0, len(data), ADPCM_BLOCK_ALIGN):
+        block = data[offset : offset + ADPCM_BLOCK_ALIGN]
+        predictor, index = struct.unpack("<hB", block[:3])
+        samples.append(predictor)
+        for byte in block[4:]:
+            for code in (byte & 0x0F, byte >> 4):
+                step = int(IMA_STEP_TABLE[index])
+                delta = step >> 3
+                if code & 4:
+                    delta += step
+                if code & 2:
+                    delta += step >> 1
+                if code & 1:
+                    delta += step >> 2
+                predictor = max(-32768, min(32767, predictor - delta if code & 8 else predictor + delta))
+                index = max(0, min(88, index + int(IMA_INDEX_TABLE[code])))
+                samples.append(predictor)
+    return np.array(samples[:frames], dtype=np.float64)
+
+
+def test_render_narration_with_provider_of_unknown_lengths(tmp_path: Path) -> None:
+    audio_cache = AudioCache(tmp_path / "cache", max_bytes=1 << 30)
+    segment_cache = AudioCache(tmp_path / "segments", max_bytes=1 << 30, suffix=".pcm")
+    text = " ".join(f"Sentence number {index} is here." for index in range(10))
+    segments = plan_segments(text, 1, "en", None, "deterministic")
+    assert all(segment.frames is None for segment in segments)
+
+    provider = get_provider("deterministic")
+    provider.batch_sizes.clear()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        _, path = render_narration(text, 1, "en", None, audio_cache, segment_cache, executor, provider="deterministic")
+
+    assert provider.loads == 1
+    assert provider.batch_sizes and max(provider.batch_sizes) <= provider.max_batch_size
+    assert sum(provider.batch_sizes) == len(segments)
+    with wave.open(str(path), "rb") as wav_file:
+        frames = wav_file.getnframes()
+    assert frames == sum(len(segment.text.encode("utf-8")) for segment in segments) * provider.FRAMES_PER_CHAR
+    assert path.stat().st_size == 44 + 2 * frames
+
+    streamed = _narration_wav(segments, segment_cache)
+    assert streamed[44:] == path.read_bytes()[44:]
+
+    with pytest.raises(ProviderNotFoundError):
+        plan_segments(text, 1, "en", None, "no-such-provider")
+
+
+@pytest.mark.parametrize("provider", [None, "deterministic"])
+def test_render_narration_merges_in_order_with_more_batches_than_in_flight(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, provider: str | None
+) -> None:
+    audio_cache = AudioCache(tmp_path / "cache", max_bytes=1 << 30)
+    segment_cache = AudioCache(tmp_path / "segments", max_bytes=1 << 30, suffix=".pcm")
+    text = " ".join(f"Sentence number {index} is here." for index in range(8))
+    segments = plan_segments(text, 1, "en", None, provider)
+    render_segments = narration.render_segments
+    lock = threading.Lock()
+    in_flight = peak = 0
+
+    def slow_first_batch(name, items):
+        # The first batch finishes last, so later batches settle before the one that starts the narration.
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        try:
+            if items[0][0] == segments[0].request:
+                time.sleep(0.2)
+            return render_segments(name, items)
+        finally:
+            with lock:
+                in_flight -= 1
+
+    # One segment per batch: eight batches through a window of two.
+    monkeypatch.setattr(narration, "BATCH_CHARS", 1)
+    monkeypatch.setattr(narration, "render_segments", slow_first_batch)
+    progress: list[int] = []
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        _, path = render_narration(
+            text,
+            1,
+            "en",
+            None,
+            audio_cache,
+            segment_cache,
+            executor,
+            max_in_flight=2,
+            on_progress=lambda placed, total: progress.append(placed),
+            provider=provider,
+        )
+
+    assert peak == 2
+    assert progress == sorted(progress) and progress[-1] == len(segments)
+    assert path.read_bytes()[44:] == _narration_wav(segments, segment_cache)[44:]
+
+
+@pytest.mark.parametrize("provider", [None, "deterministic"])
+def test_render_narration_rejects_audio_too_long_for_a_wav_file(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, provider: str | None
+) -> None:
+    audio_cache = AudioCache(tmp_path / "cache", max_bytes=1 << 30)
+    segment_cache = AudioCache(tmp_path / "segments", max_bytes=1 << 30, suffix=".pcm")
+    # Without the old 60-second cap, the 32-bit RIFF size is the only limit; shrink it to a second.
+    monkeypatch.setattr(narration, "MAX_WAV_DATA_BYTES", 2 * narration.SAMPLE_RATE)
+
+    with ThreadPoolExecutor(max_workers=2) as executor, pytest.raises(NarrationTooLongError):
+        render_narration("Long enough. " * 50, 1, "en", None, audio_cache, segment_cache, executor, provider=provider)
+    assert audio_cache.stats()["entries"] == 0
+    assert not any((tmp_path / "cache" / "tmp").iterdir())
+
+
+def test_processing_stages_are_block_size_independent() -> None:
+    rate = 22050
+    tone = (8000 * np.sin(2 * np.pi * 440 * np.arange(rate) / rate)).astype(np.float32)
+
+    for up, down in ((2, 1), (320, 441), (4, 5)):
+        resampler = Resample(up, down)
+        whole = np.concatenate([resampler.process(tone), resampler.flush()])
+        pieces = [resampler.process(tone[start : start + 1000]) for start in range(0, len(tone), 1000)]
+        assert np.array_equal(np.concatenate([*pieces, resampler.flush()]), whole)
+        assert len(whole) == resampler.frames_for(len(tone))
+        spectrum = np.abs(np.fft.rfft(whole))
+        assert np.fft.rfftfreq(len(whole), down / (rate * up))[np.argmax(spectrum)] == pytest.approx(440, abs=1)
+
+    samples = np.concatenate([np.zeros(4000), tone, np.zeros(6000)]).astype("<i2")
+    options = ProcessingOptions(normalize="peak", level_db=-6.0, trim_silence=True, fade_ms=10.0)
+    pcm = np.frombuffer(b"".join(options.process_pcm(samples, rate, block_frames=3000)), dtype="<i2")
+    assert pcm.tobytes() == b"".join(options.process_pcm(samples, rate))
+    pad = int(rate * 0.05)
+    # Trimming keeps 50 ms on either side of the tone, whose first and last few samples are near silent.
+    assert abs(len(pcm) - (len(tone) + 2 * pad)) <= 8
+    assert np.max(np.abs(pcm)) == pytest.approx(32767 * 10 ** (-6 / 20), rel=0.01)
+    noise = np.random.default_rng(0).normal(0, 4000, 5 * rate).clip(-32768, 32767).astype("<i2")
+    rms = ProcessingOptions(normalize="rms", trim_silence=True)
+    outputs = {b"".join(rms.process_pcm(noise, rate, block_frames=size)) for size in (7, 100, 4096, 32768)}
+    assert len(outputs) == 1
+
+    assert resolve_processing("Podcast", {"speed": 1.5, "fade_ms": None}).speed == 1.5
+    assert resolve_processing("unknown").is_identity(rate)
+
+
+def test_render_narration_applies_processing(tmp_path: Path) -> None:
+    audio_cache = AudioCache(tmp_path / "cache", max_bytes=1 << 30)
+    segment_cache = AudioCache(tmp_path / "segments", max_bytes=1 << 30, suffix=".pcm")
+    text = "First sentence here. Second one follows.\n\nA new paragraph."
+    plain = ProcessingOptions()
+    resampled = ProcessingOptions(normalize="rms", sample_rate=44100, speed=1.25, fade_ms=5.0)
+    trimmed = ProcessingOptions(trim_silence=True, sample_rate=16000)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        paths = {}
+        for options in (plain, resampled, trimmed):
+            key, paths[options] = render_narration(
+                text, None, "en", None, audio_cache, segment_cache, executor, processing=options
+            )
+            assert key == synthesis_key(text, None, "en", None, options.cache_token(22050))
+            # Processing only changes how segments are assembled; they are synthesized once.
+            assert segment_cache.stats()["entries"] == 3
+
+            segments = plan_segments(text, None, "en", None, processing=options)
+            assert paths[options].read_bytes()[44:] == _narration_wav(segments, segment_cache)[44:]
+
+    layouts = {options: read_wav_layout(path) for options, path in paths.items()}
+    _, plain_frames, _ = layouts[plain]
+    _, frames, rate = layouts[resampled]
+    assert rate == 44100
+    assert frames == sum(-(-segment.frames * 8 // 5) for segment in plan_segments(text, None, "en", None))
+    assert frames == pytest.approx(plain_frames * 2 / 1.25, rel=0.001)
+    assert layouts[trimmed][2] == 16000
+
+
+def test_mapped_wav_fills_regions_out_of_order(tmp_path: Path) -> None:
+    pieces = [np.arange(start, start + 100, dtype="<i2") for start in (0, 100, 200)]
+    sources = []
+    for index, piece in enumerate(pieces):
+        sources.append(tmp_path / f"{index}.pcm")
+        sources[-1].write_bytes(piece.tobytes())
+
+    path = tmp_path / "out.wav"
+    with MappedWav(path, 300, 22050) as wav:
+        wav.write_pcm_file(200, sources[2], 100)
+        wav.write_pcm(0, pieces[0].tobytes())
+        wav.write_pcm_file(100, sources[1], 100)
+        with pytest.raises(ValueError):
+            wav.write_pcm_file(250, sources[0], 100)
+        wav.finalize()
+
+    assert read_wav_layout(path) == (44, 300, 22050)
+    samples, _ = map_pcm(path)
+    assert np.array_equal(samples, np.arange(300))
+    with wave.open(str(path), "rb") as wav_file:
+        assert wav_file.getnframes() == 300
+
+
+def test_compressed_variants_decode_close_to_master(tmp_path: Path) -> None:
+    frames = 22050 + 500
+    reference = np.round(10000 * np.sin(2 * np.pi * 440 * np.arange(frames) / 22050))
+    master = tmp_path / "master.wav"
+    with wave.open(str(master), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(22050)
+        wav_file.writeframes(reference.astype("<i2").tobytes())
+
+    adpcm_path, created = ensure_variant(master, FORMATS["adpcm"])
+    assert created and adpcm_path.name == "master.adpcm"
+    assert ensure_variant(master, FORMATS["adpcm"]) == (adpcm_path, False)
+    raw = adpcm_path.read_bytes()
+    assert raw[20:22] == struct.pack("<H", 0x11)
+    decoded = _decode_ima_adpcm(raw[raw.index(b"data") + 8 :], frames)
+    assert np.sqrt(np.mean((decoded - reference) ** 2)) < 0.05 * np.sqrt(np.mean(reference**2))
+
+    ulaw = mulaw_encode(reference.astype(np.int16)).astype(np.int32) ^ 0xFF
+    exponent, mantissa = (ulaw >> 4) & 0x07, ulaw & 0x0F
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    restored = np.where(ulaw & 0x80, -magnitude, magnitude)
+    assert np.max(np.abs(restored - reference)) <= 0.04 * 10000 + 8
+
+
+def test_format_negotiation() -> None:
+    assert negotiate_format("ADPCM", "audio/wav").name == "adpcm"
+    assert negotiate_format(None, None).name == "wav"
+    assert negotiate_format(None, "audio/basic, audio/x-ima-adpcm;q=0.5").name == "adpcm"
+    assert negotiate_format("ulaw", "audio/basic").name == "ulaw"
+    assert negotiate_format(None, "application/json, */*").name == "wav"
+    with pytest.raises(UnsupportedFormatError):
+        negotiate_format("mp3", None)
+    with pytest.raises(UnsupportedFormatError):
+        negotiate_format(None, "audio/basic")
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import time
+
+from app.core.auth_cache import AuthenticatedUser, TokenCache
+
+
+def test_token_cache_expires_evicts_and_invalidates() -> None:
+    cache = TokenCache(max_entries=2, ttl_seconds=60)
+    alice, bob = AuthenticatedUser(1, "alice@example.com"), AuthenticatedUser(2, "bob@example.com")
+
+    assert cache.get("a") is None
+    cache.put("a", alice)
+    cache.put("b", bob)
+    assert cache.get("a") == alice
+    cache.put("c", bob)  # evicts "b", the least recently used token
+    assert cache.get("b") is None
+    assert cache.stats() == {"entries": 2, "hits": 1, "misses": 2, "evictions": 1, "hit_rate": 1 / 3}
+
+    cache.invalidate_user(2)
+    assert cache.get("c") is None
+    assert cache.get("a") == alice
+
+    cache.put("expired", alice, expires_at=time.time() - 1)
+    assert cache.get("expired") is None
+    short = TokenCache(max_entries=10, ttl_seconds=0.01)
+    short.put("a", alice)
+    time.sleep(0.02)
+    assert short.get("a") is None
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from benchmarks.harness import compare, percentile
+
+
+def test_baseline_comparison_flags_only_gated_regressions() -> None:
+    baseline = {
+        "throughput": {"value": 100.0, "unit": "req/s", "higher_is_better": True, "gated": True},
+        "latency": {"value": 10.0, "unit": "ms", "higher_is_better": False, "gated": True},
+        "tail": {"value": 10.0, "unit": "ms", "higher_is_better": False, "gated": False},
+    }
+    current = {
+        "throughput": {**baseline["throughput"], "value": 60.0},
+        "latency": {**baseline["latency"], "value": 11.0},
+        "tail": {**baseline["tail"], "value": 100.0},
+        "new_metric": {"value": 1.0, "unit": "x", "higher_is_better": True, "gated": True},
+    }
+    results = {item.name: item.regressed for item in compare(current, baseline, tolerance=0.25)}
+    assert results == {"latency": False, "tail": False, "throughput": True}
+    assert percentile([float(value) for value in range(1, 101)], 0.5) == 50.5
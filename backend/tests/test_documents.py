@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from app.core.config import Settings
+from app.services import documents
+from app.services.documents import decode_document, encode_document, replace_document, text_digest
+
+
+@pytest.mark.parametrize(("codec", "stored"), [("zlib", "zlib"), ("none", "none")])
+def test_documents_round_trip_through_the_configured_codec(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, codec: str, stored: str
+) -> None:
+    settings = Settings(storage_dir=tmp_path, document_compression=codec, document_compression_min_bytes=64)
+    monkeypatch.setattr(documents, "get_settings", lambda: settings)
+
+    text = "It was a dark and stormy night. " * 200
+    document = encode_document(text, project_id=1)
+    assert document.codec == stored
+    assert document.size == len(text.encode())
+    assert document.digest == text_digest(text)
+    if stored == "zlib":
+        assert len(document.body) < document.size // 10
+    assert decode_document(document) == text
+
+    replace_document(document, "Short.")
+    assert (document.codec, document.project_id) == ("none", 1)
+    assert decode_document(document) == "Short."
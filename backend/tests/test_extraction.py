@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from app.core.config import Settings
+from app.utils import pdf_extraction
+from app.utils.pdf_extraction import extract_pdf_pages
+from app.utils.text_extraction import expand_zip
+
+
+def _write_pdf(path: Path, page_count: int) -> Path:
+    writer = PdfWriter()
+    font = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+        }
+    )
+    for number in range(1, page_count + 1):
+        page = writer.add_blank_page(width=300, height=300)
+        content = DecodedStreamObject()
+        content.set_data(f"BT /F1 12 Tf 20 250 Td (Page {number}) Tj ET".encode())
+        page[NameObject("/Contents")] = writer._add_object(content)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): writer._add_object(font)})}
+        )
+    with open(path, "wb") as fh:
+        writer.write(fh)
+    return path
+
+
+@pytest.mark.parametrize(("min_pages", "mode"), [(100, "serial"), (2, "parallel")])
+def test_pdf_pages_are_returned_in_order(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, min_pages: int, mode: str) -> None:
+    settings = Settings(storage_dir=tmp_path, pdf_extraction_workers=2, pdf_parallel_min_pages=min_pages)
+    monkeypatch.setattr(pdf_extraction, "get_settings", lambda: settings)
+    pdf_path = _write_pdf(tmp_path / "book.pdf", 9)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        report = extract_pdf_pages(pdf_path, max_pages=50, executor=executor)
+
+    assert report.mode == mode
+    assert [page.number for page in report.pages] == list(range(1, 10))
+    assert [page.text.strip() for page in report.pages] == [f"Page {number}" for number in range(1, 10)]
+    assert report.failed_pages == []
+
+
+def test_expand_zip_enforces_the_total_decompressed_budget(tmp_path: Path) -> None:
+    import zipfile
+
+    archive = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        for number in range(3):
+            bundle.writestr(f"script-{number}.txt", "a" * 1000)
+        bundle.writestr("huge.txt", "b" * 5000)
+
+    members, expanded = expand_zip(archive, max_members=10, max_member_bytes=2000, max_total_bytes=3000)
+    assert expanded == 3000
+    assert [name for name, _ in members] == ["script-0.txt", "script-1.txt", "script-2.txt", "huge.txt"]
+    assert members[-1][1] is None
+    for _, path in members[:-1]:
+        assert path.read_text() == "a" * 1000
+        path.unlink()
+
+    with pytest.raises(HTTPException) as excinfo:
+        expand_zip(archive, max_members=10, max_member_bytes=2000, max_total_bytes=2500)
+    assert excinfo.value.status_code == 413
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+from app.utils.file_responses import MappedFileResponse
+
+
+def _respond(path: Path, *args, **kwargs) -> MappedFileResponse:
+    """Build a response over ``path`` opened as a handler would, then unlink it, as a cache eviction would."""
+
+    response = MappedFileResponse(open(path, "rb"), *args, **kwargs)
+    path.unlink()
+    return response
+
+
+def _serve(response: MappedFileResponse, extensions: dict) -> tuple[list[dict], bytes]:
+    """Run ``response`` against a fake ASGI server that resolves zero-copy sends from the file object."""
+
+    messages: list[dict] = []
+    body = bytearray()
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+        if message["type"] == "http.response.body":
+            body.extend(message["body"])
+        elif message["type"] == "http.response.zerocopysend":
+            body.extend(os.pread(message["file"].fileno(), message["count"], message["offset"]))
+
+    scope = {"type": "http", "method": "GET", "extensions": extensions}
+    asyncio.run(response(scope, None, send))
+    assert response.file.closed
+    return messages, bytes(body)
+
+
+# Servers offering only pathsend get the mapped body: they would reopen an evicted path.
+@pytest.mark.parametrize("extensions", [{}, {"http.response.zerocopysend": {}}, {"http.response.pathsend": {}}])
+def test_mapped_file_response_serves_ranges(tmp_path: Path, extensions: dict) -> None:
+    path = tmp_path / "audio.bin"
+    payload = bytes(range(256)) * 64
+    path.write_bytes(payload)
+
+    whole = _respond(path, len(payload), "audio/wav", {}, filename="audio.wav")
+    messages, body = _serve(whole, extensions)
+    assert messages[0]["status"] == 200
+    assert body == payload
+    assert whole.headers["content-length"] == str(len(payload))
+    assert whole.headers["content-disposition"] == 'attachment; filename="audio.wav"'
+
+    path.write_bytes(payload)
+    single = _respond(path, len(payload), "audio/wav", {}, ranges=[(10, 19)])
+    _, body = _serve(single, extensions)
+    assert body == payload[10:20]
+    assert single.headers["content-range"] == f"bytes 10-19/{len(payload)}"
+
+    path.write_bytes(payload)
+    multi = _respond(path, len(payload), "audio/wav", {}, ranges=[(0, 3), (100, 103)], boundary="b")
+    _, body = _serve(multi, extensions)
+    expected = (
+        f"--b\r\nContent-Type: audio/wav\r\nContent-Range: bytes 0-3/{len(payload)}\r\n\r\n".encode()
+        + payload[0:4]
+        + f"\r\n--b\r\nContent-Type: audio/wav\r\nContent-Range: bytes 100-103/{len(payload)}\r\n\r\n".encode()
+        + payload[100:104]
+        + b"\r\n--b--\r\n"
+    )
+    assert body == expected
+    assert multi.headers["content-length"] == str(len(expected))
+    types = [m["type"] for m in messages]
+    assert "http.response.pathsend" not in types
+    assert types.count("http.response.zerocopysend") == (1 if "http.response.zerocopysend" in extensions else 0)
+
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+from passlib.context import CryptContext
+
+from app.core import security
+from app.core.hashing import HashingBusyError, PasswordHasher
+
+
+def test_hashing_pool_rejects_beyond_its_backlog() -> None:
+    hasher = PasswordHasher(workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario() -> list[object]:
+        calls = [asyncio.ensure_future(hasher._run(release.wait)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        assert hasher.stats()["running"] == 1 and hasher.stats()["queued"] == 1
+        release.set()
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert results[:2] == [True, True]
+    assert isinstance(results[2], HashingBusyError)
+    assert hasher.stats()["rejected"] == 1 and hasher.stats()["completed"] == 2
+    hasher.shutdown()
+
+
+def test_login_verification_upgrades_outdated_hashes(monkeypatch: pytest.MonkeyPatch) -> None:
+    context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5)
+    monkeypatch.setattr(security, "get_password_context", lambda: context)
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret123")
+
+    hasher = PasswordHasher(workers=1, max_queue=0)
+    verified, new_hash = asyncio.run(hasher.verify("secret123", old_hash))
+    assert verified and new_hash is not None and new_hash.startswith("$2b$05$")
+    assert asyncio.run(hasher.verify("secret123", new_hash)) == (True, None)
+    assert asyncio.run(hasher.verify("wrong", new_hash)) == (False, None)
+    hasher.shutdown()
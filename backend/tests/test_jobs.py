@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import Settings
+from app.models.entities import Job, JobStatus, Project, ProjectStatus, User
+from app.services.jobs import (
+    QueueFullError,
+    available_slots,
+    check_capacity,
+    claim_job,
+    new_job,
+    reap_expired_leases,
+    renew_lease,
+    retry_delay,
+    settle_job,
+)
+
+
+def _session() -> Session:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    return Session(engine)
+
+
+def test_claims_follow_priority_and_per_user_caps() -> None:
+    with _session() as session:
+        later = datetime.utcnow() + timedelta(hours=1)
+        session.add_all(
+            [
+                Job(project_id=1, user_id=1),
+                Job(project_id=2, user_id=1),
+                Job(project_id=3, user_id=2, priority=1),
+                Job(project_id=4, user_id=3, priority=-1, available_at=later),
+            ]
+        )
+        session.commit()
+
+        first = claim_job(session, "a", lease_seconds=30, max_jobs_per_user=1)
+        assert (first.project_id, first.attempts) == (1, 1)
+        # User 1 is at its cap, so the lower-priority job of user 2 runs next; user 3's job is not due yet.
+        assert claim_job(session, "b", lease_seconds=30, max_jobs_per_user=1).project_id == 3
+        assert claim_job(session, "b", lease_seconds=30, max_jobs_per_user=1) is None
+        assert claim_job(session, "b", lease_seconds=30, max_jobs_per_user=2).project_id == 2
+
+        claimed = session.get(Job, first.id)
+        assert claimed.status == JobStatus.RUNNING and claimed.lease_owner == "a"
+
+
+def test_leases_are_renewed_settled_and_reclaimed() -> None:
+    settings = Settings(job_retry_backoff_seconds=10, job_retry_backoff_max_seconds=25)
+    assert [retry_delay(attempt, 10, 25) for attempt in (1, 2, 3)] == [10, 20, 25]
+
+    with _session() as session:
+        session.add(Project(id=1, user_id=1, title="Book"))
+        session.add(Job(project_id=1, user_id=1, max_attempts=2))
+        session.commit()
+
+        job = claim_job(session, "a", lease_seconds=30, max_jobs_per_user=1)
+        assert session.get(Project, 1).status == ProjectStatus.PROCESSING
+        assert renew_lease(session, job.id, "a", lease_seconds=30, progress=0.5)
+        assert not renew_lease(session, job.id, "b", lease_seconds=30)
+
+        # The worker disappears: once its lease lapses the job is requeued with backoff.
+        stored = session.get(Job, job.id)
+        stored.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+        session.add(stored)
+        session.commit()
+        assert reap_expired_leases(session, settings) == 1
+        session.refresh(stored)
+        assert stored.status == JobStatus.QUEUED and stored.available_at > datetime.utcnow()
+        assert session.get(Project, 1).status == ProjectStatus.PENDING
+        assert claim_job(session, "b", lease_seconds=30, max_jobs_per_user=1) is None
+
+        stored.available_at = datetime.utcnow() - timedelta(seconds=1)
+        session.add(stored)
+        session.commit()
+        retried = claim_job(session, "b", lease_seconds=30, max_jobs_per_user=1)
+        assert retried.attempts == 2
+        # The first worker's late result no longer counts.
+        assert not settle_job(session, job.id, "a", JobStatus.SUCCEEDED)
+        assert settle_job(session, job.id, "b", JobStatus.FAILED, error="boom")
+        session.commit()
+        assert session.exec(select(Job.status)).one() == JobStatus.FAILED
+
+
+def test_capacity_counts_queued_jobs(monkeypatch: pytest.MonkeyPatch) -> None:
+    settings = Settings(synthesis_queue_size=3, synthesis_max_queued_per_user=2)
+
+    async def scenario() -> tuple[int, int]:
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+        async with AsyncSession(engine) as db:
+            db.add_all([Job(project_id=index, user_id=1) for index in (1, 2)])
+            db.add(Job(project_id=3, user_id=2, status=JobStatus.RUNNING))
+            await db.commit()
+            with pytest.raises(QueueFullError):
+                await check_capacity(db, 1)
+            await check_capacity(db, 2)
+            slots = await available_slots(db, 1), await available_slots(db, 2)
+        await engine.dispose()
+        return slots
+
+    monkeypatch.setattr("app.services.jobs.get_settings", lambda: settings)
+    assert asyncio.run(scenario()) == (0, 1)
+
+
+def test_capacity_checks_of_one_user_take_turns(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    settings = Settings(synthesis_queue_size=10, synthesis_max_queued_per_user=2, job_max_attempts=3)
+
+    async def enqueue(engine, project_id: int, started: asyncio.Event | None = None) -> bool:
+        async with AsyncSession(engine) as db:
+            try:
+                await check_capacity(db, 1)
+            except QueueFullError:
+                return False
+            if started is not None:
+                # Hold the reservation while the other request checks.
+                started.set()
+                await asyncio.sleep(0.2)
+            db.add(new_job(project_id, 1))
+            await db.commit()
+            return True
+
+    async def scenario() -> list[bool]:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'queue.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+        async with AsyncSession(engine) as db:
+            db.add(User(id=1, email="a@example.com", password_hash="x"))
+            db.add(Job(project_id=0, user_id=1))
+            await db.commit()
+        started = asyncio.Event()
+        first = asyncio.create_task(enqueue(engine, 1, started))
+        await started.wait()
+        # One slot was left: the second check waits for the first enqueue to commit, then sees the queue full.
+        results = [await enqueue(engine, 2), await first]
+        await engine.dispose()
+        return results
+
+    monkeypatch.setattr("app.services.jobs.get_settings", lambda: settings)
+    assert asyncio.run(scenario()) == [False, True]
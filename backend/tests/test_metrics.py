@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.metrics import MetricsRegistry
+
+
+def test_registry_renders_prometheus_text() -> None:
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    registry.callback("depth", "Queue depth.", "gauge", lambda: {(): 3})
+
+    requests.inc(route="/a")
+    requests.inc(2, route="/a")
+    latency.observe(0.05)
+    latency.observe(0.5)
+    with latency.time():
+        pass
+    with pytest.raises(ValueError):
+        requests.inc(path="/a")
+    assert registry.counter("requests_total", "Requests.", ("route",)) is requests
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/a"} 3' in text
+    assert 'latency_seconds_bucket{le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{le="1"} 3' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+    assert "depth 3" in text
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.core import database
+from app.core.migrations import SchemaMismatchError
+from app.models.entities import Project, ProjectDocument, SchemaVersion
+from app.services.documents import decode_document
+
+
+def _legacy_engine(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, *statements: str):
+    """A database built from the current models, then rolled back to an older schema by ``statements``."""
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for statement in statements:
+            connection.exec_driver_sql(statement)
+    monkeypatch.setattr(database, "get_engine", lambda: engine)
+    return engine
+
+
+def test_init_db_migrates_columns_and_indexes_added_since(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    engine = _legacy_engine(
+        tmp_path,
+        monkeypatch,
+        "DROP INDEX ix_project_audio_hash",
+        "ALTER TABLE project DROP COLUMN audio_hash",
+        "DROP INDEX ix_project_user_created",
+        "DROP INDEX ix_project_user_status_created",
+        "ALTER TABLE project DROP COLUMN audio_options",
+    )
+    assert database.init_db(fast_boot=True)
+
+    inspector = inspect(engine)
+    assert {"audio_hash", "audio_options"} <= {column["name"] for column in inspector.get_columns("project")}
+    assert {"ix_project_audio_hash", "ix_project_user_created", "ix_project_user_status_created"} <= {
+        index["name"] for index in inspector.get_indexes("project")
+    }
+    assert not database.init_db(fast_boot=True)
+
+
+def test_init_db_moves_project_source_text_into_documents(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    engine = _legacy_engine(
+        tmp_path,
+        monkeypatch,
+        "DROP TABLE project",
+        # The project table as it was before source texts moved out of it.
+        """CREATE TABLE project (
+            id INTEGER NOT NULL PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES user (id),
+            voice_id INTEGER REFERENCES voice (id),
+            title VARCHAR NOT NULL,
+            source_text VARCHAR NOT NULL,
+            source_filename VARCHAR,
+            language VARCHAR,
+            style VARCHAR,
+            status VARCHAR(10) NOT NULL,
+            audio_path VARCHAR,
+            audio_hash VARCHAR,
+            error_message VARCHAR,
+            created_at DATETIME NOT NULL,
+            updated_at DATETIME NOT NULL
+        )""",
+        "INSERT INTO user (id, email, password_hash, created_at) VALUES (1, 'a@example.com', 'x', '2024-01-01')",
+    )
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO project (id, user_id, title, source_text, status, created_at, updated_at) "
+                "VALUES (:id, 1, 'Old', :source_text, 'COMPLETED', '2024-01-01', '2024-01-01')"
+            ),
+            [{"id": project_id, "source_text": f"Chapter {project_id}. " * 200} for project_id in (1, 2)],
+        )
+    assert database.init_db(fast_boot=True)
+
+    assert "source_text" not in {column["name"] for column in inspect(engine).get_columns("project")}
+    with Session(engine) as session:
+        for project_id in (1, 2):
+            assert decode_document(session.get(ProjectDocument, project_id)) == f"Chapter {project_id}. " * 200
+        session.add(Project(user_id=1, title="New"))
+        session.commit()
+
+
+def test_init_db_fails_loudly_on_drift_no_migration_covers(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    engine = _legacy_engine(tmp_path, monkeypatch, "ALTER TABLE voice DROP COLUMN provider")
+    with pytest.raises(SchemaMismatchError, match="missing column voice.provider"):
+        database.init_db(fast_boot=True)
+    with Session(engine) as session:
+        assert session.get(SchemaVersion, 1) is None
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, create_engine
+
+from app.core import database
+from app.models.entities import SchemaVersion
+
+
+def test_fast_boot_skips_schema_work_until_the_models_change(monkeypatch: pytest.MonkeyPatch) -> None:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    monkeypatch.setattr(database, "get_engine", lambda: engine)
+    seeded: list[Session] = []
+
+    assert database.init_db(seed=seeded.append, fast_boot=True)
+    assert not database.init_db(seed=seeded.append, fast_boot=True)
+    assert len(seeded) == 1
+
+    # A fingerprint recorded by other models (or none at all) means the schema must be applied again.
+    with Session(engine) as session:
+        version = session.get(SchemaVersion, 1)
+        assert version.fingerprint == database.schema_fingerprint(engine.dialect)
+        version.fingerprint = "older"
+        session.add(version)
+        session.commit()
+    assert database.init_db(seed=seeded.append, fast_boot=True)
+    assert database.init_db(seed=seeded.append, fast_boot=False)
+    assert len(seeded) == 3
+
+
+def test_api_import_leaves_heavy_dependencies_unloaded() -> None:
+    code = "import sys, app.main; print(sorted(set(sys.argv[1:]) & set(sys.modules)))"
+    heavy = ["numpy", "pypdf", "docx", "app.services.narration", "app.services.providers"]
+    result = subprocess.run(
+        [sys.executable, "-c", code, *heavy],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
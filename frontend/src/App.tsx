@@ -47,7 +47,15 @@ interface ProjectFormValues {
   file?: FileList;
 }
 
-const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+interface ProjectEvent {
+  project_id: number;
+  status: ProjectStatus;
+  error_message?: string | null;
+  progress?: number | null;
+}
+
+// The API's maximum page size, so a long listing takes as few requests as possible.
+const PROJECT_PAGE_SIZE = 200;
 
 function formatDate(value: string) {
   const date = new Date(value);
@@ -87,8 +95,18 @@ const App = () => {
   const loadProjects = async () => {
     if (!token) return;
     try {
-      const response = await apiClient.get<ProjectSummary[]>("/projects", authHeaders);
-      setProjects(response.data);
+      // The listing is keyset-paginated: follow X-Next-Cursor until the last page.
+      const loaded: ProjectSummary[] = [];
+      let cursor: string | undefined;
+      do {
+        const response = await apiClient.get<ProjectSummary[]>("/projects", {
+          ...authHeaders,
+          params: { limit: PROJECT_PAGE_SIZE, cursor },
+        });
+        loaded.push(...response.data);
+        cursor = response.headers["x-next-cursor"] as string | undefined;
+      } while (cursor);
+      setProjects(loaded);
     } catch (error) {
       console.error("Failed to load projects", error);
     }
@@ -120,28 +138,44 @@ const App = () => {
     }
   };
 
-  const pollProject = async (projectId: number) => {
+  const watchProject = async (projectId: number) => {
     if (!token) return;
-    for (let attempt = 0; attempt < 20; attempt += 1) {
-      try {
-        const response = await apiClient.get<ProjectDetail>(`/projects/${projectId}`, authHeaders);
-        const detail = response.data;
-        if (detail.status !== "pending" && detail.status !== "processing") {
-          setSelectedProject(detail);
-          if (detail.status === "completed") {
-            setStatusMessage("Narration ready! Download or preview below.");
-          } else if (detail.error_message) {
-            setStatusMessage(`Generation failed: ${detail.error_message}`);
+    let last: ProjectEvent | null = null;
+    try {
+      // EventSource cannot send the bearer token, so read the SSE stream through fetch.
+      const response = await fetch(`${API_BASE_URL}/projects/${projectId}/events`, authHeaders);
+      if (!response.ok || !response.body) throw new Error(`Event stream failed: ${response.status}`);
+      const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+      let buffer = "";
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += value;
+        const messages = buffer.split("\n\n");
+        buffer = messages.pop() ?? "";
+        for (const message of messages) {
+          if (!message.startsWith("data: ")) continue;
+          last = JSON.parse(message.slice(6)) as ProjectEvent;
+          if (last.status === "processing" && last.progress != null) {
+            setStatusMessage(`Generating audio... ${Math.round(last.progress * 100)}%`);
           }
-          return;
         }
-      } catch (error) {
-        console.error("Polling failed", error);
-        break;
       }
-      await sleep(1000);
+    } catch (error) {
+      console.error("Watching project failed", error);
+    }
+
+    if (last?.status !== "completed" && last?.status !== "failed") {
+      setStatusMessage("Still working... refresh the page to update status.");
+      return;
+    }
+    const response = await apiClient.get<ProjectDetail>(`/projects/${projectId}`, authHeaders);
+    setSelectedProject(response.data);
+    if (last.status === "completed") {
+      setStatusMessage("Narration ready! Download or preview below.");
+    } else if (last.error_message) {
+      setStatusMessage(`Generation failed: ${last.error_message}`);
     }
-    setStatusMessage("Still working... refresh the page to update status.");
   };
 
   const onProjectSubmit: SubmitHandler<ProjectFormValues> = async (values) => {
@@ -169,7 +203,7 @@ const App = () => {
       setSelectedProject(response.data);
       setStatusMessage("Narration requested. Generating audio...");
       projectForm.reset();
-      await pollProject(response.data.id);
+      await watchProject(response.data.id);
       await loadProjects();
     } catch (error: any) {
       setStatusMessage(error.response?.data?.detail ?? "Failed to create project");
@@ -379,7 +413,7 @@ const App = () => {
                 {selectedProject.audio_url ? (
                   <audio
                     controls
-                    src={`${API_BASE_URL}${selectedProject.audio_url}?t=${selectedProject.updated_at}`}
+                    src={`${API_BASE_URL}${selectedProject.audio_url}`}
                   >
                     Your browser does not support the audio element.
                   </audio>